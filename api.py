@@ -0,0 +1,308 @@
+"""Local JSON API for scripts and game launchers.
+
+ApiServer serves HTTP on 127.0.0.1 from its own threads, so clients never
+block the control loop:
+
+    GET  /state                      current snapshot
+    GET  /state?since=N&timeout=30   long poll: answers once the version is past N
+    GET  /events                     server-sent events, one snapshot per update
+    POST /mode    {"mode": "Auto"}
+    POST /custom  {"cpu": 40, "gpu": 60}           (either key may be left out)
+    POST /curve   {"rules": [{"min": 0, "max": 49, "speed": 20}, ...],   (sorted, covering 0..100 without gaps)
+                   "auto_interpolate": true, "auto_hysteresis": 2, "auto_min_dwell": 5}
+    POST /target  {"target_cpu": 60, "target_kp": 4.0, ...}    (any of the target_* options)
+    POST /profile {"profile": "quiet"}              (null: back to the settings in config.json)
+
+The owner publishes snapshots with `publish()` and receives validated
+commands through `command_sink(command, future)`; it applies them on its own
+thread and resolves the future with a result dict (or an exception), which
+becomes the HTTP response. When api_token is set, requests must carry
+`Authorization: Bearer <token>`.
+
+Web pages open in a browser can reach 127.0.0.1 too. So requests with an
+Origin header, or with a Host other than 127.0.0.1:<port> or
+localhost:<port> (DNS rebinding), are refused. POST bodies must be sent as
+application/json: a browser cannot send that type cross-site without a CORS
+preflight, which this server never answers.
+"""
+import hmac
+import json
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import AUTO_OPTION_KEYS, TARGET_OPTION_KEYS, curve_problem, setting_kind, valid_setting
+from controller import MODES
+
+COMMAND_TIMEOUT = 5.0
+MAX_LONG_POLL = 60.0
+MAX_BODY = 64 * 1024
+
+
+class CommandError(ValueError):
+    pass
+
+
+def _percent(value, name):
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 100:
+        raise CommandError(f"{name} must be an integer from 0 to 100")
+    return value
+
+
+def _options(body, keys):
+    # Checked as config.json checks them, so the API cannot store what a restart would reject
+    options = {key: body[key] for key in keys if key in body}
+    for key, value in options.items():
+        if not valid_setting(key, value):
+            raise CommandError(f"{key} must be {setting_kind(key)}")
+    return options
+
+
+def validate_command(path, body):
+    """Turn a POST body into a command dict, raising CommandError when invalid."""
+    if not isinstance(body, dict):
+        raise CommandError("body must be a JSON object")
+    if path == "/mode":
+        if body.get("mode") not in MODES:
+            raise CommandError(f"mode must be one of {', '.join(MODES)}")
+        return {"command": "mode", "mode": body["mode"]}
+    if path == "/custom":
+        speeds = {fan_type: _percent(body[fan_type], fan_type) for fan_type in ("cpu", "gpu") if fan_type in body}
+        if not speeds:
+            raise CommandError("give cpu and/or gpu")
+        return {"command": "custom", "speeds": speeds}
+    if path == "/curve":
+        rules = body.get("rules")
+        # The same shape the curve editor keeps, which config.json also requires
+        problem = curve_problem(rules)
+        if problem:
+            raise CommandError(problem)
+        clean = [{"min": rule["min"], "max": rule["max"], "speed": rule["speed"]} for rule in rules]
+        options = _options(body, AUTO_OPTION_KEYS)
+        return {"command": "curve", "rules": clean, "options": options}
+    if path == "/target":
+        options = _options(body, TARGET_OPTION_KEYS)
+        if not options:
+            raise CommandError(f"give any of {', '.join(TARGET_OPTION_KEYS)}")
+        return {"command": "target", "options": options}
+    if path == "/profile":
+        name = body.get("profile")
+        if name is not None and not isinstance(name, str):
+            raise CommandError("profile must be a profile name or null")
+        return {"command": "profile", "profile": name}
+    raise CommandError(f"unknown command {path}")
+
+
+def config_commands(config, changed):
+    """Commands that apply the `changed` keys of a reloaded config.json, as the API would."""
+    commands = []
+    # First, so a profile that is active gets its new definition straight away
+    if "profiles" in changed:
+        commands.append({"command": "profiles", "profiles": config["profiles"]})
+    speeds = {fan_type: config[f"custom_{fan_type}"] for fan_type in ("cpu", "gpu")
+              if f"custom_{fan_type}" in changed}
+    if speeds:
+        commands.append({"command": "custom", "speeds": speeds})
+    if "auto_fan_config" in changed or any(key in changed for key in AUTO_OPTION_KEYS):
+        commands.append({"command": "curve", "rules": config["auto_fan_config"],
+                         "options": {key: config[key] for key in AUTO_OPTION_KEYS}})
+    # After the curve, which the target loop is rebuilt from
+    options = {key: config[key] for key in TARGET_OPTION_KEYS if key in changed}
+    if options:
+        commands.append({"command": "target", "options": options})
+    # Last, so a mode switch already acts on the new speeds and curve
+    if "mode" in changed:
+        commands.append({"command": "mode", "mode": config["mode"]})
+    return commands
+
+
+def state_snapshot(controller, temps, fans, sensors=None, profile=None, profiles=()):
+    """Snapshot dict published to clients; fans is {fan_type: {"target": %, "read": %}}."""
+    return {
+        "profile": profile,
+        "profiles": list(profiles),
+        "sensors": sensors or {},
+        "mode": controller.mode,
+        "temps": dict(zip(("cpu", "gpu"), temps)),
+        "fans": fans,
+        "custom": dict(controller.custom),
+        "curve": controller.auto_fan_config,
+        "options": controller.auto_options,
+        "target": controller.target_options,
+    }
+
+
+class ApiServer:
+    def __init__(self, command_sink, host="127.0.0.1", port=8765, token=None):
+        self.command_sink = command_sink
+        self.token = token or None
+        self._cond = threading.Condition()
+        self._snapshot = {"version": 0}
+        self._closing = False
+        self.requests = 0
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this Nagle
+                # plus delayed ACKs add ~40 ms to every keep-alive response
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _trusted(self):
+                # Browsers send Origin on cross-site requests; scripts and launchers do not
+                if self.headers.get("Origin") is not None:
+                    self.close_connection = True  # the body, if any, is never read
+                    self._send_json(403, {"error": "requests from web pages are not accepted"})
+                    return False
+                port = self.server.server_address[1]
+                if self.headers.get("Host", "").lower() not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+                    self.close_connection = True
+                    self._send_json(403, {"error": f"Host must be 127.0.0.1:{port} or localhost:{port}"})
+                    return False
+                return True
+
+            def _authorized(self):
+                if not self._trusted():
+                    return False
+                if api.token is None:
+                    return True
+                supplied = self.headers.get("Authorization", "")
+                if hmac.compare_digest(supplied, f"Bearer {api.token}"):
+                    return True
+                self._send_json(401, {"error": "missing or wrong token"})
+                return False
+
+            def do_GET(self):
+                api.requests += 1
+                if not self._authorized():
+                    return
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/state":
+                    try:
+                        since = int(query.get("since", ["-1"])[0])
+                        timeout = min(float(query.get("timeout", ["30"])[0]), MAX_LONG_POLL)
+                    except ValueError:
+                        self._send_json(400, {"error": "since and timeout must be numbers"})
+                        return
+                    self._send_json(200, api.wait(since, timeout) if since >= 0 else api.snapshot())
+                elif url.path == "/events":
+                    self._stream_events()
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                api.requests += 1
+                if not self._authorized():
+                    return
+                if self.headers.get_content_type() != "application/json":
+                    self.close_connection = True
+                    self._send_json(415, {"error": "Content-Type must be application/json"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    self.close_connection = True  # where the body ends is unknown
+                    self._send_json(400, {"error": "Content-Length must be a non-negative integer"})
+                    return
+                if length > MAX_BODY:
+                    self._send_json(413, {"error": "body too large"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    command = validate_command(urlparse(self.path).path, body)
+                except (ValueError, CommandError) as e:
+                    self._send_json(400, {"error": str(e)})
+                    return
+                future = Future()
+                api.command_sink(command, future)
+                try:
+                    result = future.result(timeout=COMMAND_TIMEOUT)
+                except FutureTimeout:
+                    self._send_json(504, {"error": "command not applied in time"})
+                except Exception as e:
+                    self._send_json(409, {"error": str(e)})
+                else:
+                    self._send_json(200, result or {"ok": True})
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                version = -1
+                try:
+                    while not api._closing:
+                        snapshot = api.wait(version, 15.0)
+                        if snapshot["version"] == version:
+                            self.wfile.write(b": keep-alive\n\n")
+                        else:
+                            version = snapshot["version"]
+                            self.wfile.write(b"data: " + json.dumps(snapshot).encode() + b"\n\n")
+                        self.wfile.flush()
+                except OSError:
+                    pass  # client went away
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, name="api", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, snapshot):
+        with self._cond:
+            self._snapshot = dict(snapshot, version=self._snapshot["version"] + 1, time=time.time())
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return self._snapshot
+
+    def wait(self, since, timeout):
+        """The snapshot once its version is past `since`, or the current one after `timeout`."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._snapshot["version"] > since or self._closing, timeout)
+            return self._snapshot
+
+    def stop(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def api_from_config(config, command_sink):
+    """The API server configured in config.json, started, or None when disabled."""
+    if not config.get("api_enabled", False):
+        return None
+    try:
+        return ApiServer(command_sink, port=config.get("api_port", 8765),
+                         token=config.get("api_token") or None).start()
+    except OSError as e:
+        print(f"Local API unavailable: {e}")
+        return None
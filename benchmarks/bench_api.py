@@ -0,0 +1,88 @@
+"""Request latency of the local JSON API.
+
+Runs an ApiServer on an ephemeral port whose commands are applied by a
+worker thread standing in for the GUI event loop, then measures a
+keep-alive GET /state, a POST /mode round trip and the delay from
+publish() to the event arriving on an /events stream:
+
+    python benchmarks/bench_api.py --requests 2000
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import ApiServer, state_snapshot  # noqa: E402
+from config import DEFAULT_CONFIG  # noqa: E402
+from controller import FanController  # noqa: E402
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6  # noqa: E731
+    return f"p50 {pick(0.5):7.0f} µs  p99 {pick(0.99):7.0f} µs  max {samples[-1] * 1e6:7.0f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    controller = FanController(dict(DEFAULT_CONFIG))
+    commands = queue.Queue()
+
+    def event_loop():
+        while True:
+            command, future = commands.get()
+            controller.mode = command["mode"]
+            server.publish(state_snapshot(controller, (60.0, 55.0), {}))
+            future.set_result(server.snapshot())
+
+    server = ApiServer(lambda command, future: commands.put((command, future)), port=0).start()
+    threading.Thread(target=event_loop, daemon=True).start()
+    server.publish(state_snapshot(controller, (60.0, 55.0), {}))
+    host, port = server.address
+
+    conn = http.client.HTTPConnection(host, port)
+    timings = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        conn.request("GET", "/state")
+        conn.getresponse().read()
+        timings.append(time.perf_counter() - started)
+    print(f"GET /state         {percentiles(timings)}")
+
+    timings = []
+    for i in range(args.requests):
+        body = json.dumps({"mode": ("Auto", "Custom")[i % 2]})
+        started = time.perf_counter()
+        conn.request("POST", "/mode", body, {"Content-Type": "application/json"})
+        conn.getresponse().read()
+        timings.append(time.perf_counter() - started)
+    print(f"POST /mode         {percentiles(timings)}")
+    conn.close()
+
+    stream = http.client.HTTPConnection(host, port)
+    stream.request("GET", "/events")
+    response = stream.getresponse()
+    response.fp.readline(), response.fp.readline()  # the current snapshot
+    timings = []
+    for _ in range(min(args.requests, 500)):
+        started = time.perf_counter()
+        server.publish(state_snapshot(controller, (60.0, 55.0), {}))
+        response.fp.readline()
+        response.fp.readline()
+        timings.append(time.perf_counter() - started)
+    print(f"publish -> /events {percentiles(timings)}")
+    stream.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-event cost of dragging a range in the Auto curve editor.
+
+Opens AutoFanConfigDialog on Qt's offscreen platform with a fine-grained
+curve (one range per degree by default), then drags the middle row's max
+handle to the top, down to the bottom and back. Every mouse move pushes the
+neighbouring ranges. Each event is timed together with the repaint it causes:
+
+    python benchmarks/bench_curve_editor.py --rows 100 --budget-ms 4
+    python benchmarks/bench_curve_editor.py --rows 50    # two degrees a row: longer pushes
+
+Exits with status 1 when the p99 event time exceeds --budget-ms, for CI.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BUDGET_MS = 4.0  # p99 per drag event, repaint included
+
+
+def fine_curve(rows):
+    bounds = [round(i * 101 / rows) for i in range(rows + 1)]
+    return [{"min": bounds[i], "max": bounds[i + 1] - 1, "speed": min(100, i)} for i in range(rows)]
+
+
+def drag(rows, passes):
+    from PyQt5.QtCore import QEvent, QPoint, Qt
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtWidgets import QApplication
+    from nitrosensual import AutoFanConfigDialog
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    dialog = AutoFanConfigDialog(config=fine_curve(rows))
+    dialog.resize(900, 700)
+    dialog.show()
+    app.processEvents()
+    slider = dialog.rows[rows // 2]["slider"]
+    y = slider.height() // 2
+
+    def send(kind, value):
+        point = QPoint(slider._value_to_pos(value), y)
+        buttons = Qt.NoButton if kind == QEvent.MouseButtonRelease else Qt.LeftButton
+        QApplication.sendEvent(slider, QMouseEvent(kind, point, Qt.LeftButton, buttons, Qt.NoModifier))
+
+    times = []
+    start = slider.high()
+    send(QEvent.MouseButtonPress, start)
+    path = list(range(start, 101)) + list(range(100, -1, -1)) + list(range(0, start + 1))
+    for _ in range(passes):
+        for value in path:
+            begun = time.perf_counter()
+            send(QEvent.MouseMove, value)
+            app.processEvents()
+            times.append(time.perf_counter() - begun)
+    send(QEvent.MouseButtonRelease, start)
+    rules = dialog.get_config()
+    dialog.close()
+    return times, rules
+
+
+def percentile_99(sorted_times):
+    return sorted_times[int(0.99 * (len(sorted_times) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--passes", type=int, default=3, help="times the drag path is repeated")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="fail when p99 per event exceeds this")
+    args = parser.parse_args()
+
+    times, rules = drag(args.rows, args.passes)
+    times.sort()
+    p50, p99 = times[len(times) // 2], percentile_99(times)
+    print(f"{args.rows} rows, {len(times)} drag events")
+    print(f"per event  p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms  max {times[-1] * 1000:6.2f} ms")
+    # The drag must leave a valid curve behind
+    contiguous = all(a["max"] + 1 == b["min"] for a, b in zip(rules, rules[1:]))
+    valid = rules[0]["min"] == 0 and rules[-1]["max"] == 100 and contiguous
+    if not valid:
+        print("FAIL: the ranges are no longer contiguous over 0-100", file=sys.stderr)
+    if p99 * 1000 > args.budget_ms:
+        print(f"FAIL: p99 {p99 * 1000:.2f} ms exceeds the {args.budget_ms:g} ms budget", file=sys.stderr)
+    return 0 if valid and p99 * 1000 <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Report resident memory and idle CPU of the window vs the headless daemon.
+
+Both are started with --simulate (the window on Qt's offscreen platform),
+left to settle, then sampled over a measurement period:
+
+    python benchmarks/bench_footprint.py --settle 5 --measure 30
+
+Uses /proc on Linux, or psutil when it is installed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def proc_sample(pid):
+    """Return (rss_bytes, cpu_seconds) for pid."""
+    try:
+        import psutil
+        p = psutil.Process(pid)
+        times = p.cpu_times()
+        return p.memory_info().rss, times.user + times.system
+    except ImportError:
+        pass
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    return rss, (int(fields[11]) + int(fields[12])) / ticks
+
+
+def measure(name, cmd, settle, period):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(settle)
+        if proc.poll() is not None:
+            print(f"{name:<9} exited early with code {proc.returncode}")
+            return
+        _, cpu_start = proc_sample(proc.pid)
+        time.sleep(period)
+        rss, cpu_end = proc_sample(proc.pid)
+        print(f"{name:<9} RSS {rss / 2**20:7.1f} MiB  idle CPU {100.0 * (cpu_end - cpu_start) / period:5.2f}%")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--settle", type=float, default=5.0)
+    parser.add_argument("--measure", type=float, default=20.0)
+    args = parser.parse_args()
+    measure("window", [sys.executable, "nitrosensual.py", "--simulate"], args.settle, args.measure)
+    measure("headless", [sys.executable, "daemon.py", "--simulate"], args.settle, args.measure)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""GUI event-loop stalls with a slow fan service, with and without the I/O executor.
+
+Runs the window in Auto mode on Qt's offscreen platform against the
+simulator. Every fan write is slowed down to mimic a sluggish PredatorSense
+service. A StallMeter records how late the GUI thread gets to a 20 ms timer:
+
+    python benchmarks/bench_gui_stall.py --delay-ms 80 --seconds 10
+
+--inline runs the hardware calls on the GUI thread, as before the executor.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import config  # noqa: E402
+from hardware import SimulatedBackend  # noqa: E402
+
+
+class SlowBackend(SimulatedBackend):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write_fans(self, speeds):
+        time.sleep(self.delay)
+        return super().write_fans(speeds)
+
+
+def run(delay, seconds, inline):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from hwio import HardwareExecutor
+    from metrics import METRICS
+    import nitrosensual
+
+    config.CONFIG_FILE = os.path.join(tempfile.mkdtemp(prefix="nitrosensual-stall-"), "config.json")
+    config.save_config(dict(config.DEFAULT_CONFIG, mode="Auto", record_telemetry=False,
+                            poll_min_interval=0.25, poll_max_interval=0.25))
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = nitrosensual.MainWindow(SlowBackend(delay))
+    if inline:
+        window.io = HardwareExecutor(inline=True)
+    window.show()
+    # The user drags a custom slider now and then: urgent writes
+    nudge = QTimer()
+    nudge.timeout.connect(lambda: window.request_fan_write("cpu", 40 + int(time.monotonic()) % 20, urgent=True))
+    nudge.start(700)
+    meter = nitrosensual.StallMeter()
+    METRICS.reset()
+    meter.start()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    meter.stop()
+    nudge.stop()
+    window.close()
+    return METRICS.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay-ms", type=float, default=80.0, help="added to every write_fans")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--inline", action="store_true", help="hardware calls on the GUI thread")
+    args = parser.parse_args()
+
+    snapshot = run(args.delay_ms / 1000.0, args.seconds, args.inline)
+    stall = snapshot.get("gui_stall")
+    wait = snapshot.get("io_queue_wait")
+    print(f"{'inline' if args.inline else 'executor'}, {args.delay_ms:.0f} ms per hardware call")
+    print(f"GUI stall      p50 ≤{stall['p50'] * 1000:6.1f} ms  p99 ≤{stall['p99'] * 1000:6.1f} ms  "
+          f"max {stall['max'] * 1000:6.1f} ms  ({stall['count']} ticks)")
+    if wait and not args.inline:
+        print(f"I/O queue wait p50 ≤{wait['p50'] * 1000:6.1f} ms  p99 ≤{wait['p99'] * 1000:6.1f} ms  "
+              f"max {wait['max'] * 1000:6.1f} ms  ({wait['count']} jobs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Per-frame cost of the history chart as the history grows.
+
+Feeds a day of simulated samples, one per second, into a DecimatedHistory
+and a HistoryChart on Qt's offscreen platform. Each frame is timed: the
+append, the incremental refresh and a synchronous repaint. Frames are
+reported per stretch of history, so a cost that grows with the history shows
+up as a rising row:
+
+    python benchmarks/bench_history_chart.py --window "24 h"
+    python benchmarks/bench_history_chart.py --window "1 min" --hours 6
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from telemetry import CHART_WINDOWS, DecimatedHistory  # noqa: E402
+
+
+def sample(t):
+    # Game-like: 2 minutes idle, 3 minutes loaded, with some noise
+    loaded = t % 300.0 >= 120.0
+    wobble = math.sin(t / 7.0)
+    return dict(cpu_temp=(72.0 if loaded else 45.0) + 2 * wobble, gpu_temp=(70.0 if loaded else 40.0) + wobble,
+                cpu_cmd=70 if loaded else 20, gpu_cmd=70 if loaded else 0)
+
+
+def run(window, hours, reports):
+    from PyQt5.QtWidgets import QApplication
+    from nitrosensual import HistoryChart
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    history = DecimatedHistory()
+    chart = HistoryChart(history, window)
+    chart.resize(600, 240)
+    chart.show()
+    app.processEvents()
+    total = int(hours * 3600)
+    stretch = max(1, total // reports)
+    frames = []
+    rows = []
+    for t in range(total):
+        started = time.perf_counter()
+        history.append(float(t), **sample(t))
+        chart.refresh()
+        chart.repaint()
+        frames.append(time.perf_counter() - started)
+        if len(frames) == stretch:
+            frames.sort()
+            rows.append((t + 1, frames[len(frames) // 2], frames[int(0.99 * (len(frames) - 1))]))
+            frames = []
+    chart.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--window", choices=CHART_WINDOWS, default="24 h")
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated history, one sample per second")
+    parser.add_argument("--reports", type=int, default=8, help="rows in the report")
+    args = parser.parse_args()
+
+    rows = run(args.window, args.hours, args.reports)
+    print(f'"{args.window}" window, {args.hours:g} h of history at 1 sample/s')
+    for samples, p50, p99 in rows:
+        print(f"after {samples:7d} samples   frame p50 {p50 * 1e6:7.1f} µs   p99 {p99 * 1e6:7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
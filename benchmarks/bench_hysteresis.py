@@ -0,0 +1,51 @@
+"""Count Auto-mode fan speed changes with and without hysteresis on a trace.
+
+The trace is a CSV with time,cpu_temp,gpu_temp columns (seconds, °C). Without
+--trace a synthetic hour of temperatures hovering around 60 °C is used:
+
+    python benchmarks/bench_hysteresis.py --hysteresis 2 --dwell 5
+    python benchmarks/bench_hysteresis.py --trace recorded.csv
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fancurve import AutoFanController, FanCurve  # noqa: E402
+from config import DEFAULT_CONFIG  # noqa: E402
+from simulate import read_trace, synthetic_trace  # noqa: E402
+
+
+def count_writes(trace, curve, hysteresis, dwell):
+    controller = AutoFanController(curve, hysteresis, dwell)
+    last = {}
+    writes = 0
+    for t, cpu_temp, gpu_temp in trace:
+        for fan_type, temp in (("cpu", cpu_temp), ("gpu", gpu_temp)):
+            speed = controller.update(fan_type, temp, t)
+            if last.get(fan_type) != speed:
+                writes += 1
+                last[fan_type] = speed
+    return writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", help="CSV trace with time,cpu_temp,gpu_temp columns")
+    parser.add_argument("--hysteresis", type=float, default=DEFAULT_CONFIG["auto_hysteresis"])
+    parser.add_argument("--dwell", type=float, default=DEFAULT_CONFIG["auto_min_dwell"])
+    args = parser.parse_args()
+
+    trace = list(read_trace(args.trace) if args.trace else synthetic_trace())
+    curve = FanCurve(DEFAULT_CONFIG["auto_fan_config"])
+    baseline = count_writes(trace, curve, 0, 0)
+    tuned = count_writes(trace, curve, args.hysteresis, args.dwell)
+    print(f"{len(trace)} samples")
+    print(f"no hysteresis        {baseline:6d} writes")
+    print(f"{args.hysteresis:g}°C / {args.dwell:g}s dwell   {tuned:6d} writes "
+          f"({100.0 * (baseline - tuned) / max(baseline, 1):.0f}% fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare per-poll cost of one-shot LHM reads against a persistent LhmSession.
+
+Windows only (needs LibreHardwareMonitorLib.dll and admin rights):
+
+    python benchmarks/bench_lhm.py --polls 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import APP_DIR  # noqa: E402
+from hardware import LHM_DLL_NAME, LhmSession, ensure_lhm_dll, get_lhm_temps  # noqa: E402
+
+
+def time_calls(fn, polls):
+    samples = []
+    for _ in range(polls):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<12} mean {statistics.mean(samples):8.2f} ms  "
+          f"median {statistics.median(samples):8.2f} ms  "
+          f"max {max(samples):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=20)
+    args = parser.parse_args()
+
+    dll_path = ensure_lhm_dll(os.path.join(APP_DIR, LHM_DLL_NAME))
+    report("one-shot", time_calls(lambda: get_lhm_temps(dll_path), args.polls))
+
+    session = LhmSession(dll_path)
+    session.read()  # open + discovery are a one-time cost, keep them out of the loop
+    try:
+        report("session", time_calls(session.read, args.polls))
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
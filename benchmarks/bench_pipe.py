@@ -0,0 +1,68 @@
+"""Measure fan-command throughput: one connection per command vs PipeClient.
+
+Runs against PipeServiceServer, the localhost stand-in for the PredatorSense
+service, so it works on any OS:
+
+    python benchmarks/bench_pipe.py --commands 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hardware import (  # noqa: E402
+    PipeClient, PipeResponse, PipeServiceServer, SimulatedPipeService, SocketTransport,
+    ThermalModel, encode_fan_packet,
+)
+
+
+def one_shot(connect, commands):
+    # What apply_fan_speed() used to do: open, write, read, close for every command
+    for i in range(commands):
+        transport = connect()
+        PipeResponse.parse(transport.transact(encode_fan_packet("cpu" if i % 2 else "gpu", i % 101)))
+        transport.close()
+    return commands
+
+
+def persistent(connect, commands):
+    client = PipeClient(connect)
+    for i in range(commands):
+        client.send("cpu" if i % 2 else "gpu", i % 101)
+    client.close()
+    return client.connects
+
+
+def paired(connect, commands):
+    client = PipeClient(connect)
+    for i in range(commands // 2):
+        client.send_many((("cpu", i % 101), ("gpu", i % 101)))
+    client.close()
+    return client.connects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = PipeServiceServer(SimulatedPipeService(ThermalModel())).start()
+
+    def connect():
+        return SocketTransport(server.address)
+
+    try:
+        for name, fn in (("one-shot", one_shot), ("persistent", persistent), ("paired", paired)):
+            t0 = time.perf_counter()
+            connects = fn(connect, args.commands)
+            elapsed = time.perf_counter() - t0
+            print(f"{name:<11} {args.commands / elapsed:9.0f} cmd/s  "
+                  f"{elapsed / args.commands * 1e6:7.1f} us/cmd  {connects} connects")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare fixed-interval and adaptive temperature polling on the thermal simulator.
+
+Runs the Auto controller in closed loop against ThermalModel on a virtual
+clock and reports wakeups per minute and how late fan-curve breakpoint
+crossings were noticed. Exits with status 1 when the adaptive poller noticed
+a crossing later than the latency target:
+
+    python benchmarks/bench_polling.py
+    python benchmarks/bench_polling.py --load desktop --minutes 60 --fixed 2 --min 0.5 --max 5 --target 2
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEFAULT_CONFIG  # noqa: E402
+from controller import FanController  # noqa: E402
+from hardware import ThermalModel  # noqa: E402
+from polling import AdaptivePoller  # noqa: E402
+from simulate import LOADS  # noqa: E402
+
+
+def run(poller, minutes, load):
+    config = dict(DEFAULT_CONFIG, mode="Auto")
+    controller = FanController(config)
+    poller.set_breakpoints(controller.breakpoints())
+    model = ThermalModel(load=load, seed=1)
+    now = 0.0
+    wakeups = 0
+    while now < minutes * 60.0:
+        cpu_temp, gpu_temp = model.read()
+        wakeups += 1
+        interval = poller.next_interval((cpu_temp, gpu_temp), now)
+        for fan_type, percent in controller.target_speeds(cpu_temp, gpu_temp, now).items():
+            model.set_fan(fan_type, percent)
+        model.advance(interval)
+        now += interval
+    return wakeups / minutes, poller.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--fixed", type=float, default=2.0, help="fixed polling interval (seconds)")
+    parser.add_argument("--min", type=float, default=DEFAULT_CONFIG["poll_min_interval"])
+    parser.add_argument("--max", type=float, default=DEFAULT_CONFIG["poll_max_interval"])
+    parser.add_argument("--target", type=float, default=DEFAULT_CONFIG["poll_latency_target"],
+                        help="latency target (seconds) the adaptive poller must meet")
+    parser.add_argument("--load", choices=LOADS, action="append",
+                        help="load profile to simulate (repeatable, default: all)")
+    args = parser.parse_args()
+
+    print(f"{args.minutes:g} simulated minutes per load, Auto mode")
+    failed = []
+    print(f"{'':<26} {'wakeups/min':>11} {'crossings':>9} {'latency mean':>12} {'latency max':>11}")
+    for load in args.load or LOADS:
+        rows = [
+            (f"fixed {args.fixed:g}s", AdaptivePoller(args.fixed, args.fixed, args.fixed)),
+            (f"adaptive {args.min:g}-{args.max:g}s", AdaptivePoller(args.min, args.max, args.target)),
+        ]
+        for label, poller in rows:
+            per_min, stats = run(poller, args.minutes, LOADS[load])
+            print(f"{load + ' ' + label:<26} {per_min:11.1f} {stats['crossings']:9d} "
+                  f"{stats['latency_mean']:11.2f}s {stats['latency_max']:10.2f}s")
+        if stats["latency_max"] > args.target:
+            failed.append(load)
+    if failed:
+        sys.exit(f"latency target of {args.target:g}s exceeded under the {', '.join(failed)} load")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Telemetry recorder costs: per-record hot-loop cost, disk use and read-back speed.
+
+    python benchmarks/bench_recorder.py
+    python benchmarks/bench_recorder.py --records 1000000
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recorder import HEADER, RECORD, TelemetryRecorder, export_csv, log_files, read_range  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="nitrosensual-bench-")
+    try:
+        recorder = TelemetryRecorder(directory, max_bytes=1024 * 1024, max_files=1000)
+        t0 = 1.7e9
+        started = time.perf_counter()
+        for i in range(args.records):
+            recorder.record_sample(t0 + i * 0.5, cpu_temp=60.0 + (i % 20) * 0.1, gpu_temp=55.0,
+                                   cpu_cmd=50, gpu_cmd=35, cpu_read=50, gpu_read=35)
+        record_cost = (time.perf_counter() - started) / args.records
+        started = time.perf_counter()
+        recorder.close()
+        drain = time.perf_counter() - started
+
+        files = log_files(directory)
+        size = sum(os.path.getsize(path) for path in files)
+        print(f"{args.records} samples, {RECORD.size}-byte records, {HEADER.size}-byte file header")
+        print(f"record_sample (caller thread)  {record_cost * 1e6:6.2f} µs/sample")
+        print(f"background drain on close      {drain * 1000:6.1f} ms, {recorder.dropped} dropped")
+        print(f"on disk                        {size / 1024:.0f} KB in {len(files)} files")
+        for interval in (0.5, 2.0, 5.0):
+            per_hour = 3600 / interval * RECORD.size
+            print(f"  sampling every {interval:g} s      {per_hour / 1024:6.1f} KB/hour")
+
+        start, end = t0 + args.records * 0.25, t0 + args.records * 0.25 + 600
+        started = time.perf_counter()
+        count = sum(1 for _ in read_range(directory, start, end))
+        print(f"10 minute range query          {(time.perf_counter() - started) * 1000:6.2f} ms ({count} records)")
+        started = time.perf_counter()
+        exported = export_csv(directory, io.StringIO())
+        elapsed = time.perf_counter() - started
+        print(f"full CSV export                {elapsed * 1000:6.0f} ms ({exported / elapsed / 1000:.0f}k records/s)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
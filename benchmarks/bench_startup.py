@@ -0,0 +1,131 @@
+"""Startup benchmark: import-time breakdown and time to the first painted frame.
+
+    python benchmarks/bench_startup.py                   # report
+    python benchmarks/bench_startup.py --budget-ms 800   # exit 1 if slower
+
+The import breakdown comes from `python -X importtime -c "import nitrosensual"`.
+Time to first frame is measured from process launch to the first paint of
+MainWindow running against the simulated backend on Qt's offscreen platform.
+Time to hand off is a whole second launch forwarding `--mode Auto` to a
+running instance, from process launch to exit.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_FRAME_CHILD = r"""
+import sys, time
+sys.path.insert(0, {root!r})
+import config, tempfile, os
+config.CONFIG_FILE = os.path.join(tempfile.mkdtemp(), "config.json")
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+import nitrosensual
+from hardware import SimulatedBackend
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(time.time(), flush=True)
+            app.quit()
+        return False
+
+app = QApplication(sys.argv[:1])
+window = nitrosensual.MainWindow(SimulatedBackend())
+probe = FirstPaint()
+window.installEventFilter(probe)
+window.show()
+app.exec_()
+window.close()
+"""
+
+
+def import_breakdown(top):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import nitrosensual"],
+                          cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self_us | cumulative_us | <indent>name", indent marks nesting
+        fields = line[len("import time:"):].split("|")
+        rows.append((int(fields[1]), int(fields[0]), fields[2].rstrip()[1:]))
+    end = next(i for i, row in enumerate(rows) if row[2] == "nitrosensual")
+    total = rows[end][0]
+    # Children are listed before their parent; keep nitrosensual's direct imports
+    direct = []
+    for cumulative, _, name in reversed(rows[:end]):
+        if not name.startswith(" "):
+            break
+        if not name.startswith("   "):
+            direct.append((cumulative, name.strip()))
+    print(f"import nitrosensual: {total / 1000:.1f} ms cumulative")
+    for cumulative, name in sorted(direct, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    return total / 1000.0
+
+
+def time_to_first_frame():
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    start = time.time()
+    proc = subprocess.run([sys.executable, "-c", FIRST_FRAME_CHILD.format(root=ROOT)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    painted = [line for line in proc.stdout.splitlines() if line.strip()]
+    if proc.returncode != 0 or not painted:
+        raise RuntimeError(f"first-frame probe failed:\n{proc.stderr}")
+    return (float(painted[0]) - start) * 1000.0
+
+
+HANDOFF_CHILD = r"""
+import sys
+sys.path.insert(0, {root!r})
+from instance import hand_off
+sys.exit(0 if hand_off(["--mode", "Auto"], port={port}) else 1)
+"""
+
+
+def time_to_hand_off(runs):
+    sys.path.insert(0, ROOT)
+    from instance import InstanceServer
+    received = []
+    server = InstanceServer(port=0).start(received.append)
+    try:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", HANDOFF_CHILD.format(root=ROOT, port=server.address[1])],
+                                  cwd=ROOT, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"hand-off failed:\n{proc.stderr}")
+            timings.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        server.stop()
+    assert len(received) == runs
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="number of imports to list")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, help="fail when time to first frame exceeds this")
+    args = parser.parse_args()
+
+    import_breakdown(args.top)
+    frames = sorted(time_to_first_frame() for _ in range(args.runs))
+    best = frames[0]
+    print(f"time to first frame: best {best:.0f} ms, median {frames[len(frames) // 2]:.0f} ms")
+    handoffs = time_to_hand_off(args.runs)
+    print(f"time to hand off:    best {handoffs[0]:.0f} ms, median {handoffs[len(handoffs) // 2]:.0f} ms")
+    if args.budget_ms is not None and best > args.budget_ms:
+        print(f"FAIL: {best:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
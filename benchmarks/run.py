@@ -0,0 +1,326 @@
+"""Benchmark suite for the code that runs on every tick.
+
+Each case is timed with the best of several auto-ranged repeats and reported
+in nanoseconds per operation. Runs on Linux without the Windows modules; the
+dialog cases use Qt's offscreen platform and are skipped without PyQt5.
+
+    python benchmarks/run.py                       # table
+    python benchmarks/run.py --json results.json   # machine-readable results
+    python benchmarks/run.py --save-baseline       # record benchmarks/baseline.json
+    python benchmarks/run.py --compare             # exit 1 on a regression
+
+A case regresses when it is more than --tolerance (default 50%) slower than
+the baseline. Baselines are machine specific: record one on the machine that
+runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Rows in the curve editor cases: one per degree, the finest curve the editor allows
+DIALOG_ROWS = 100
+CASES = {}
+
+
+def case(name):
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+@case("curve_lookup")
+def bench_curve_lookup():
+    from config import DEFAULT_CONFIG
+    from fancurve import FanCurve
+    curve = FanCurve(DEFAULT_CONFIG["auto_fan_config"])
+    return lambda: curve(67.3)
+
+
+@case("curve_lookup_interpolated")
+def bench_curve_lookup_interpolated():
+    from config import DEFAULT_CONFIG
+    from fancurve import FanCurve
+    curve = FanCurve(DEFAULT_CONFIG["auto_fan_config"], interpolate=True)
+    return lambda: curve(67.3)
+
+
+@case("auto_update")
+def bench_auto_update():
+    from config import DEFAULT_CONFIG
+    from controller import FanController
+    controller = FanController(dict(DEFAULT_CONFIG, mode="Auto"))
+    state = {"t": 0.0}
+
+    def op():
+        state["t"] += 0.5
+        return controller.target_speeds(60.0 + (state["t"] % 10.0), 55.0, state["t"])
+    return op
+
+
+@case("target_update")
+def bench_target_update():
+    from config import DEFAULT_CONFIG
+    from controller import FanController
+    controller = FanController(dict(DEFAULT_CONFIG, mode="Target"))
+    state = {"t": 0.0}
+
+    def op():
+        state["t"] += 0.5
+        return controller.target_speeds(60.0 + (state["t"] % 10.0), 55.0, state["t"])
+    return op
+
+
+@case("packet_encode")
+def bench_packet_encode():
+    from hardware import encode_fan_packet
+    return lambda: encode_fan_packet("cpu", 55)
+
+
+@case("config_load")
+def bench_config_load(directory):
+    import config
+    config.CONFIG_FILE = os.path.join(directory, "config.json")
+    config.save_config(config.DEFAULT_CONFIG)
+    return config.load_config
+
+
+@case("config_save")
+def bench_config_save(directory):
+    import config
+    config.CONFIG_FILE = os.path.join(directory, "config.json")
+    data = dict(config.DEFAULT_CONFIG)
+    return lambda: config.save_config(data)
+
+
+@case("config_reload_check")
+def bench_config_reload_check(directory):
+    from config import ConfigStore
+    # What the loops pay to notice outside edits: one stat while nothing changed
+    store = ConfigStore(os.path.join(directory, "store.json"))
+    return store.reload_if_changed
+
+
+@case("auto_tick")
+def bench_auto_tick():
+    from config import DEFAULT_CONFIG
+    from controller import FanController
+    from fanwriter import FanWriteScheduler
+    from hardware import SimulatedBackend
+    backend = SimulatedBackend()
+    controller = FanController(dict(DEFAULT_CONFIG, mode="Auto"))
+    writer = FanWriteScheduler(backend.write_fans, window=0.0, min_interval=0.0)
+
+    def op():
+        # One window tick: sample, decide, write, read back
+        cpu_temp, gpu_temp = backend.read_temps()
+        for fan_type, percent in controller.target_speeds(cpu_temp, gpu_temp, time.monotonic()).items():
+            writer.request(fan_type, percent)
+        writer.flush()
+        backend.read_fan("cpu")
+        backend.read_fan("gpu")
+    return op
+
+
+@case("profile_switch")
+def bench_profile_switch():
+    from fanwriter import FanWriteScheduler
+    from hardware import SimulatedBackend
+    from polling import AdaptivePoller
+    from profiles import compile_profiles
+    backend = SimulatedBackend()
+    profiles = list(compile_profiles({"profiles": {
+        "quiet": {"mode": "Custom", "custom_cpu": 20, "custom_gpu": 10, "poll_max_interval": 10.0},
+        "gaming": {"mode": "Target", "target_cpu": 75, "poll_min_interval": 0.25},
+    }}).values())
+    poller = AdaptivePoller()
+    writer = FanWriteScheduler(backend.write_fans, window=0.0, min_interval=0.0)
+    turn = [0]
+
+    def op():
+        # Swap in the other compiled profile and write both fans in one batch
+        turn[0] ^= 1
+        profiles[turn[0]].apply(poller, writer, (67.3, 61.0), time.monotonic())
+        writer.flush(force=True)
+    return op
+
+
+@case("sensor_aggregate")
+def bench_sensor_aggregate():
+    from array import array
+    from sensors import SensorMap
+    names = [f"cpu/cpu core #{i}" for i in range(16)] + ["cpu/cpu package", "gpu/gpu core", "gpu/gpu hot spot"]
+    sensor_map = SensorMap({"cpu": {"sensors": ["cpu/core"], "method": "percentile", "percentile": 90},
+                            "gpu": {"sensors": ["gpu/core", "gpu/hot spot"], "method": "mean", "weights": [3, 1]}})
+    sensor_map.resolve(names)
+    values = array("d", (50.0 + i for i in range(len(names))))
+    return lambda: sensor_map.aggregate(values)
+
+
+@case("metrics_timer")
+def bench_metrics_timer():
+    from metrics import Metrics
+    metrics = Metrics()
+
+    def op():
+        with metrics.time("stage"):
+            pass
+    return op
+
+
+@case("metrics_timer_disabled")
+def bench_metrics_timer_disabled():
+    from metrics import Metrics
+    metrics = Metrics(enabled=False)
+
+    def op():
+        with metrics.time("stage"):
+            pass
+    return op
+
+
+def _dialog(rows):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from nitrosensual import AutoFanConfigDialog
+    width = 100 // rows
+    rules = [{"min": i * width, "max": (i + 1) * width - 1, "speed": min(100, i)} for i in range(rows)]
+    rules[-1]["max"] = 100
+    dialog = AutoFanConfigDialog(config=rules)
+    return app, dialog
+
+
+@case("dialog_drag")
+def bench_dialog_drag():
+    app, dialog = _dialog(DIALOG_ROWS)
+    slider = dialog.rows[DIALOG_ROWS // 2]["slider"]
+    state = {"step": 1}
+
+    def op():
+        # One drag event: the handle moves a degree, neighbours get pushed
+        state["step"] = -state["step"]
+        slider.setHigh(slider.high() + state["step"])
+    op.keep = (app, dialog)
+    return op
+
+
+@case("dialog_renormalize")
+def bench_dialog_renormalize():
+    app, dialog = _dialog(DIALOG_ROWS)
+
+    def op():
+        dialog.rows[-1]["slider"].setLow(90)
+        dialog.renormalize_ranges()
+    op.keep = (app, dialog)
+    return op
+
+
+def time_case(op, repeat=5, min_time=0.2):
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeat or number >= 1 << 24:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e9, number
+
+
+def run(selected):
+    results = {}
+    directory = tempfile.mkdtemp(prefix="nitrosensual-bench-")
+    try:
+        for name, factory in CASES.items():
+            if selected and not any(pattern in name for pattern in selected):
+                continue
+            try:
+                op = factory(directory) if factory.__code__.co_argcount else factory()
+            except ImportError as e:
+                results[name] = {"skipped": str(e)}
+                continue
+            ns, number = time_case(op)
+            results[name] = {"ns_per_op": ns, "loops": number}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name, {})
+        if "ns_per_op" not in result or "ns_per_op" not in base:
+            continue
+        ratio = result["ns_per_op"] / base["ns_per_op"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="only run cases whose name contains one of these")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown before failing")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    report = run(args.cases)
+    regressions = []
+    if args.compare:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+
+    for name, result in report["results"].items():
+        if "skipped" in result:
+            print(f"{name:<30} skipped ({result['skipped']})")
+            continue
+        line = f"{name:<30} {result['ns_per_op']:12.0f} ns/op"
+        if "baseline_ratio" in result:
+            line += f"   {result['baseline_ratio']:5.2f}x baseline"
+        print(line)
+
+    for path in (args.json, args.baseline if args.save_baseline else None):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+    if regressions:
+        for name, ratio in regressions:
+            print(f"REGRESSION: {name} is {ratio:.2f}x its baseline (tolerance {args.tolerance:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,3 @@
 pyinstaller --windowed --onefile nitrosensual.py
-rm nitrosensual.spec
\ No newline at end of file
+pyinstaller --console --onefile --name nitrosensual-headless daemon.py
+rm nitrosensual.spec nitrosensual-headless.spec
\ No newline at end of file
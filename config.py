@@ -0,0 +1,293 @@
+"""config.json location, defaults and load/save helpers."""
+import copy
+import json
+import sys
+import os
+import time
+
+from rangemodel import HIGHEST, LOWEST
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    else:
+        return os.path.dirname(os.path.abspath(__file__))
+
+APP_DIR = get_app_dir()
+CONFIG_FILE = os.path.join(APP_DIR, "config.json")
+
+DEFAULT_CONFIG = {
+    "auto_fan_config": [
+        {"min": 0, "max": 39, "speed": 0},
+        {"min": 40, "max": 49, "speed": 20},
+        {"min": 50, "max": 59, "speed": 35},
+        {"min": 60, "max": 69, "speed": 50},
+        {"min": 70, "max": 79, "speed": 70},
+        {"min": 80, "max": 89, "speed": 85},
+        {"min": 90, "max": 100, "speed": 100},
+    ],
+    "auto_interpolate": False,
+    "auto_hysteresis": 2,
+    "auto_min_dwell": 5,
+    "target_cpu": 60,
+    "target_gpu": 60,
+    "target_kp": 4.0,
+    "target_ki": 0.02,
+    "target_kd": 5.0,
+    "target_feedforward": 1.0,
+    "target_smoothing": 3.0,
+    "target_slew": 30.0,
+    "target_deadband": 12,
+    "mode": "Custom",
+    "custom_cpu": 50,
+    "custom_gpu": 50,
+    "profiles": {},
+    "write_coalesce_ms": 200,
+    "write_min_interval_ms": 500,
+    "io_timeout": 2.0,
+    "fan_poll_interval": 5.0,
+    "poll_min_interval": 0.5,
+    "poll_max_interval": 5.0,
+    "poll_latency_target": 2.0,
+    "telemetry_capacity": 7200,
+    "record_telemetry": True,
+    "record_dir": "",
+    "record_max_mb": 4,
+    "record_max_files": 8,
+    "show_history": True,
+    "history_window": "10 min",
+    "metrics_enabled": True,
+    "metrics_file": "",
+    "metrics_interval": 15,
+    "fan_inputs": {
+        "cpu": {"sensors": ["cpu/package"], "method": "max"},
+        "gpu": {"sensors": ["gpu/core"], "method": "max"},
+    },
+    "api_enabled": False,
+    "api_port": 8765,
+    "api_token": "",
+    "instance_port": 8764,
+    "lhm_source": "",
+    "lhm_dll_sha256": "",
+}
+
+MODES = ("Custom", "Max", "Auto", "Target")
+AUTO_OPTION_KEYS = ("auto_interpolate", "auto_hysteresis", "auto_min_dwell")
+TARGET_OPTION_KEYS = ("target_cpu", "target_gpu", "target_kp", "target_ki", "target_kd",
+                      "target_feedforward", "target_smoothing", "target_slew", "target_deadband")
+
+SAVE_DELAY = 1.0  # seconds a save waits for more changes before writing
+CONFIG_WATCH_INTERVAL = 2.0  # least seconds between checks for outside edits
+
+def curve_problem(rules):
+    """Why rules are not a curve the editor could have made, or None when they are.
+
+    Such a curve is a list of {"min", "max", "speed"} rules with integer values,
+    sorted and covering 0..100°C without gaps or overlaps, speeds from 0 to 100.
+    """
+    if not isinstance(rules, list) or not rules:
+        return "rules must be a non-empty list"
+    expected = LOWEST
+    for rule in rules:
+        if not isinstance(rule, dict):
+            return "each rule needs min, max and speed"
+        low, high, speed = rule.get("min"), rule.get("max"), rule.get("speed")
+        # type() rather than isinstance(): bools are ints too
+        if type(low) is not int or type(high) is not int or type(speed) is not int:
+            return "rule min, max and speed must be integers"
+        if not 0 <= speed <= 100:
+            return "rule speed must be from 0 to 100"
+        if low != expected:
+            return f"rules must be sorted and contiguous from {LOWEST}°C: expected min {expected}, got {low}"
+        if not low <= high <= HIGHEST:
+            return f"rule max must be from its min to {HIGHEST}"
+        expected = high + 1
+    if expected != HIGHEST + 1:
+        return f"the last rule must end at {HIGHEST}°C"
+    return None
+
+def _valid_rules(rules):
+    return curve_problem(rules) is None
+
+def _valid(key, value, default):
+    if key == "mode":
+        return value in MODES
+    if key == "auto_fan_config":
+        return _valid_rules(value)
+    if key in ("custom_cpu", "custom_gpu"):
+        return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 100
+    if isinstance(default, bool):
+        return isinstance(value, bool)
+    if isinstance(default, int):
+        # Whole-number settings feed integer spin boxes and counts; 1.5 is not one
+        return type(value) is int and value >= 0
+    if isinstance(default, float):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+    return isinstance(value, type(default))
+
+def valid_setting(key, value):
+    """True when value may be stored under a top-level key of config.json."""
+    return _valid(key, value, DEFAULT_CONFIG[key])
+
+def setting_kind(key):
+    """How a valid value of key is described in error messages."""
+    default = DEFAULT_CONFIG[key]
+    if isinstance(default, bool):
+        return "true or false"
+    if isinstance(default, int):
+        return "a non-negative integer"
+    return "a non-negative number"
+
+def normalize_config(data):
+    """Complete, checked config from parsed JSON, as (config, problems).
+
+    Missing keys get their defaults, invalid values are replaced by the default
+    and reported, and unknown keys are kept.
+    """
+    if not isinstance(data, dict):
+        return copy.deepcopy(DEFAULT_CONFIG), ["config.json does not hold an object"]
+    config = {}
+    problems = []
+    for key, default in DEFAULT_CONFIG.items():
+        value = data.get(key, default)
+        if value is not default and not _valid(key, value, default):
+            problems.append(f"{key}: {value!r} is invalid, using {default!r}")
+            value = default
+        # Defaults are shared; only they need copying
+        config[key] = copy.deepcopy(value) if value is default and isinstance(value, (list, dict)) else value
+    for key, value in data.items():
+        config.setdefault(key, value)
+    return config, problems
+
+def _read(path):
+    """(config, text) from path; raises OSError or ValueError."""
+    with open(path, "r") as f:
+        text = f.read()
+    config, problems = normalize_config(json.loads(text))
+    for problem in problems:
+        print(f"config.json: {problem}")
+    return config, text
+
+def _write(path, config):
+    """Write atomically: a crash leaves either the old file or the new one. Returns the text."""
+    text = json.dumps(config, indent=2)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return text
+
+def _set_aside(path, error):
+    # Keep the broken file for the user instead of silently overwriting it
+    print(f"config.json is unreadable ({error}); moved to {os.path.basename(path)}.bad, using defaults")
+    try:
+        os.replace(path, path + ".bad")
+    except OSError:
+        pass
+
+def _load(path):
+    if os.path.exists(path):
+        try:
+            return _read(path)[0]
+        except (OSError, ValueError) as e:
+            _set_aside(path, e)
+    try:
+        _write(path, DEFAULT_CONFIG)
+    except OSError as e:
+        print("Failed to save config:", e)
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+def load_config():
+    return _load(CONFIG_FILE)
+
+def save_config(config):
+    try:
+        _write(CONFIG_FILE, config)
+    except Exception as e:
+        print("Failed to save config:", e)
+
+class ConfigStore:
+    """config.json parsed once and kept in `data`.
+
+    save() marks the config dirty; the write happens in flush() once
+    SAVE_DELAY has passed, so a burst of changes costs one atomic write, and
+    is skipped when the text matches the file. reload_if_changed() picks up
+    edits made by other programs when the file's mtime or size moves.
+    `data` is updated in place, so references to it stay current.
+    """
+
+    def __init__(self, path=None, delay=SAVE_DELAY, clock=time.monotonic):
+        self.path = path or CONFIG_FILE
+        self.delay = delay
+        self.clock = clock
+        self.data = _load(self.path)
+        self._disk = copy.deepcopy(self.data)  # as last read or written
+        self._text = json.dumps(self.data, indent=2)
+        self._stat = self._file_stat()
+        self._due = None
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def save(self):
+        """Write `data` soon; changes made until then go out in the same write."""
+        if self._due is None:
+            self._due = self.clock() + self.delay
+
+    def next_due(self):
+        return self._due
+
+    def flush(self, force=False):
+        """Write a pending save that is due. Returns True when the file was written."""
+        if self._due is None or not (force or self.clock() >= self._due):
+            return False
+        self._due = None
+        text = json.dumps(self.data, indent=2)
+        if text == self._text and self._stat == self._file_stat():
+            return False
+        try:
+            self._text = _write(self.path, self.data)
+        except OSError as e:
+            print("Failed to save config:", e)
+            return False
+        self._disk = copy.deepcopy(self.data)
+        self._stat = self._file_stat()
+        return True
+
+    def reload_if_changed(self):
+        """Re-read the file after an outside edit. Returns the keys whose values changed."""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return []
+        self._stat = stat
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+            if text == self._text:
+                return []
+            config, problems = normalize_config(json.loads(text))
+        except (OSError, ValueError) as e:
+            # Often an editor caught mid-save; the next change is picked up again
+            print(f"Ignoring unreadable config.json edit: {e}")
+            return []
+        for problem in problems:
+            print(f"config.json: {problem}")
+        self._text = text
+        changed = [key for key in config if config[key] != self._disk.get(key)]
+        self._disk = copy.deepcopy(config)
+        for key in changed:
+            self.data[key] = copy.deepcopy(config[key])
+        return changed
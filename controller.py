@@ -0,0 +1,78 @@
+"""Fan mode logic shared by MainWindow and the headless daemon."""
+from config import AUTO_OPTION_KEYS, DEFAULT_CONFIG, MODES, TARGET_OPTION_KEYS  # noqa: F401  (MODES re-exported)
+from fancurve import AutoFanController, FanCurve
+from metrics import METRICS
+from pid import TargetFanController
+
+CURVE_MODES = ("Auto", "Target")  # modes whose speeds follow the temperature
+
+
+def auto_options(config):
+    return {k: config.get(k, DEFAULT_CONFIG[k]) for k in AUTO_OPTION_KEYS}
+
+
+def target_options(config):
+    return {k: config.get(k, DEFAULT_CONFIG[k]) for k in TARGET_OPTION_KEYS}
+
+
+class FanController:
+    """Decides the target speed of both fans for the current mode."""
+
+    def __init__(self, config):
+        self.mode = config.get("mode", "Custom")
+        self.custom = {"cpu": config.get("custom_cpu", 50), "gpu": config.get("custom_gpu", 50)}
+        self.target_options = target_options(config)
+        self.set_auto_fan_config(config.get("auto_fan_config", DEFAULT_CONFIG["auto_fan_config"]),
+                                 auto_options(config))
+
+    def set_auto_fan_config(self, rules, options):
+        # Compile once per change; every tick then does a single bisect
+        self.auto_fan_config = rules
+        self.auto_options = dict(options)
+        self.curve = FanCurve(rules, interpolate=options["auto_interpolate"])
+        self.auto = AutoFanController(self.curve, options["auto_hysteresis"], options["auto_min_dwell"])
+        self.set_target_options(self.target_options)
+
+    def set_target_options(self, options):
+        # Target mode runs its own copy of the curve logic as feed-forward
+        self.target_options = dict(options)
+        self.target = TargetFanController(
+            AutoFanController(self.curve, self.auto_options["auto_hysteresis"], self.auto_options["auto_min_dwell"]),
+            self.target_options)
+
+    def reset(self):
+        # Forget the curve and loop history, as after a restart
+        self.auto.reset()
+        self.target.reset()
+
+    def breakpoints(self):
+        # Auto reacts to the curve's thresholds; Target to those and its targets
+        if self.mode == "Auto":
+            return self.curve.breakpoints()
+        if self.mode == "Target":
+            targets = {self.target_options["target_cpu"], self.target_options["target_gpu"]}
+            return sorted(targets.union(self.curve.breakpoints()))
+        return []
+
+    def auto_speeds(self, cpu_temp, gpu_temp, now):
+        with METRICS.time("curve_eval"):
+            return {
+                "cpu": self.auto.update("cpu", cpu_temp, now),
+                "gpu": self.auto.update("gpu", gpu_temp, now),
+            }
+
+    def pid_speeds(self, cpu_temp, gpu_temp, now):
+        with METRICS.time("curve_eval"):
+            return {
+                "cpu": self.target.update("cpu", cpu_temp, now),
+                "gpu": self.target.update("gpu", gpu_temp, now),
+            }
+
+    def target_speeds(self, cpu_temp, gpu_temp, now):
+        if self.mode == "Max":
+            return {"cpu": 100, "gpu": 100}
+        if self.mode == "Auto":
+            return self.auto_speeds(cpu_temp, gpu_temp, now)
+        if self.mode == "Target":
+            return self.pid_speeds(cpu_temp, gpu_temp, now)
+        return dict(self.custom)
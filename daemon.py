@@ -0,0 +1,282 @@
+"""Headless fan control: the window's fan modes without Qt.
+
+Loads config.json, then polls temperatures and writes fan speeds in a plain
+loop until interrupted. Edits to the mode, custom speeds, curve, target options or profiles in
+config.json are applied at the next tick. `--profile` starts in a profile, and profile hotkeys
+work here too. One status line is printed whenever a fan speed
+changes, plus a heartbeat every `--heartbeat` seconds:
+
+    python daemon.py               # real hardware (Windows, elevated)
+    python daemon.py --simulate    # in-process thermal simulator
+"""
+import argparse
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+from config import APP_DIR, CONFIG_WATCH_INTERVAL, ConfigStore
+from controller import MODES
+from fanwriter import FanWriteScheduler
+from hardware import SimulatedBackend, WindowsBackend
+from metrics import METRICS, control_counters, metrics_path
+from api import api_from_config, state_snapshot
+from instance import instance_server
+from polling import AdaptivePoller
+from profiles import ProfileSet
+from provision import LHM_DLL_NAME, default_sources
+from sensors import checked_fan_inputs
+from recorder import recorded, recorder_from_config
+
+
+def format_temp(temp):
+    return f"{temp:5.1f}°C" if temp is not None else "    ?°C"
+
+
+class FanDaemon:
+    def __init__(self, backend, config, heartbeat=60.0, log=print, recorder=None, config_store=None):
+        self.backend = backend
+        self.config_store = config_store
+        self.recorder = recorder
+        self.profiles = ProfileSet(config)
+        self.controller = self.profiles.base.controller
+        self.poller = AdaptivePoller(*self.profiles.base.poll)
+        self.poller.set_breakpoints(self.controller.breakpoints())
+        # Ticks are already spaced by the poller, so no coalescing window
+        self.writer = FanWriteScheduler(
+            recorded(backend.write_fans, recorder), window=0.0,
+            min_interval=config.get("write_min_interval_ms", 500) / 1000.0,
+        )
+        self.heartbeat = heartbeat
+        METRICS.enabled = config.get("metrics_enabled", True)
+        self.metrics_file = metrics_path(config, APP_DIR)
+        self.metrics_interval = config.get("metrics_interval", 15)
+        self._last_export = float("-inf")
+        self.log = log
+        self.stop_event = threading.Event()
+        self.api = None
+        self.commands = queue.Queue()
+        self._wake = threading.Event()
+        self._last_temps = (None, None)
+        self._last_speeds = None
+        self._last_log = float("-inf")
+
+    def tick(self, now):
+        """Sample, decide and write. Returns seconds until the next tick."""
+        cpu_temp, gpu_temp = self.backend.read_temps()
+        interval = self.poller.next_interval((cpu_temp, gpu_temp), now)
+        speeds = self.controller.target_speeds(cpu_temp, gpu_temp, now)
+        for fan_type, percent in speeds.items():
+            self.writer.request(fan_type, percent)
+        self.writer.flush()
+        self._last_temps = (cpu_temp, gpu_temp)
+        self.publish_state()
+        if self.recorder:
+            self.recorder.record_sample(time.time(), cpu_temp=cpu_temp, gpu_temp=gpu_temp,
+                                        cpu_cmd=self.writer.commanded("cpu"),
+                                        gpu_cmd=self.writer.commanded("gpu"))
+        if speeds != self._last_speeds or now - self._last_log >= self.heartbeat:
+            stats = self.writer.stats()
+            poll = self.poller.stats()
+            self.log(f"{self.controller.mode:<6} cpu {format_temp(cpu_temp)} {speeds['cpu']:3d}%  "
+                     f"gpu {format_temp(gpu_temp)} {speeds['gpu']:3d}%  "
+                     f"writes {stats['written']} sent/{stats['suppressed']} suppressed/{stats['failed']} failed  "
+                     f"poll {poll['interval']:.1f}s {poll['wakeups_per_min']}/min")
+            self._last_speeds = speeds
+            self._last_log = now
+        if METRICS.enabled and now - self._last_export >= self.metrics_interval:
+            self.export_metrics()
+            self._last_export = now
+        return interval
+
+    def export_metrics(self):
+        METRICS.write_textfile(self.metrics_file, control_counters(self.writer, self.recorder))
+
+    def publish_state(self):
+        if self.api:
+            fans = {fan_type: {"target": self.writer.commanded(fan_type), "read": None}
+                    for fan_type in ("cpu", "gpu")}
+            self.api.publish(state_snapshot(self.controller, self._last_temps, fans,
+                                            self.backend.sensor_readings(), self.profiles.active, self.profiles))
+
+    def submit(self, command, future):
+        # Called from API threads; applied by run() between ticks
+        self.commands.put((command, future))
+        self._wake.set()
+
+    def apply_command(self, command, source="API"):
+        kind = command["command"]
+        if kind == "mode":
+            self.controller.mode = command["mode"]
+            self.writer.invalidate()
+        elif kind == "custom":
+            self.controller.custom.update(command["speeds"])
+        elif kind == "curve":
+            self.controller.set_auto_fan_config(command["rules"],
+                                                dict(self.controller.auto_options, **command["options"]))
+        elif kind == "target":
+            self.controller.set_target_options(dict(self.controller.target_options, **command["options"]))
+        elif kind == "profile":
+            self.switch_profile(command["profile"])
+        elif kind == "hotkey":
+            self.switch_profile(self.profiles.hotkey_target(command["profile"]))
+        elif kind == "profiles":
+            self.load_profiles(command["profiles"])
+        self.poller.set_breakpoints(self.controller.breakpoints())
+        detail = command.get("mode") or command.get("speeds") or command.get("profile") or ""
+        self.log(f"{source}: {kind} {detail}".rstrip())
+
+    def switch_profile(self, name):
+        self.controller = self.profiles.switch(name, self.poller, self.writer, self._last_temps, time.monotonic())
+        self.writer.flush(force=True)
+
+    def load_profiles(self, profiles):
+        if self.profiles.load(profiles):
+            self.switch_profile(self.profiles.active)
+
+    def on_launch_args(self, args):
+        # A window launch while the daemon runs: its --mode and --profile apply here instead
+        if args.mode:
+            self.submit({"command": "mode", "mode": args.mode}, Future())
+        if args.profile:
+            self.submit({"command": "profile", "profile": args.profile}, Future())
+
+    def on_hotkey(self, name):
+        # Called on the hotkey thread
+        self.submit({"command": "hotkey", "profile": name}, Future())
+
+    def process_commands(self):
+        """Apply queued API commands. Returns True when any was applied."""
+        applied = False
+        while True:
+            try:
+                command, future = self.commands.get_nowait()
+            except queue.Empty:
+                return applied
+            try:
+                self.apply_command(command)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            applied = True
+            self.publish_state()
+            future.set_result(self.api.snapshot() if self.api else {"ok": True})
+
+    def apply_config_file_changes(self):
+        """Apply outside edits to config.json. Returns True when any was applied."""
+        commands = self.profiles.reload_commands(self.config_store.data, self.config_store.reload_if_changed())
+        for command in commands:
+            self.apply_command(command, source="config.json")
+        return bool(commands)
+
+    def run(self):
+        next_tick = time.monotonic()
+        next_config_check = next_tick + CONFIG_WATCH_INTERVAL
+        while not self.stop_event.is_set():
+            self._wake.clear()
+            now = time.monotonic()
+            if self.process_commands():
+                next_tick = now  # act on the new settings right away
+            # Checked when the loop wakes anyway, never a wakeup of its own
+            if self.config_store and now >= next_config_check:
+                next_config_check = now + CONFIG_WATCH_INTERVAL
+                if self.apply_config_file_changes():
+                    next_tick = now
+            if now >= next_tick:
+                next_tick = now + self.tick(now)
+            elif self.writer.next_due() is not None and self.writer.next_due() <= now:
+                self.writer.flush()
+            # Sleep until the next tick or the next rate-limited write
+            wake = next_tick
+            due = self.writer.next_due()
+            if due is not None:
+                wake = min(wake, due)
+            self._wake.wait(max(0.0, wake - time.monotonic()))
+        self.writer.flush(force=True)
+        if METRICS.enabled:
+            self.export_metrics()
+
+    def stop(self, *args):
+        self.stop_event.set()
+        self._wake.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless fan control for Acer Nitro laptops")
+    parser.add_argument("--simulate", action="store_true",
+                        help="run against the in-process thermal simulator instead of the laptop")
+    parser.add_argument("--min-interval", type=float, help="shortest seconds between temperature polls")
+    parser.add_argument("--max-interval", type=float, help="longest seconds between temperature polls")
+    parser.add_argument("--latency-target", type=float,
+                        help="longest seconds between polls while a curve breakpoint can still be crossed")
+    parser.add_argument("--heartbeat", type=float, default=60.0,
+                        help="print a status line at least this often (seconds)")
+    parser.add_argument("--mode", choices=MODES, help="override the mode stored in config.json")
+    parser.add_argument("--profile", help="start in this profile from config.json")
+    parser.add_argument("--api", action="store_true", help="serve the local JSON API even if api_enabled is off")
+    args = parser.parse_args(argv)
+
+    if not args.simulate:
+        from elevate import elevate
+        elevate()
+    # The same guard as the window: only one control loop may drive the fans
+    instance = instance_server()
+    if instance is None:
+        parser.exit(1, "Another NitroSensual window or daemon is running (instance_port is taken); "
+                       "not starting a second control loop\n")
+    config_store = ConfigStore()
+    config = config_store.data
+    fan_inputs = checked_fan_inputs(config.get("fan_inputs"))
+    if args.simulate:
+        backend = SimulatedBackend(fan_inputs=fan_inputs)
+    else:
+        backend = WindowsBackend(os.path.join(APP_DIR, LHM_DLL_NAME),
+                                 lhm_sources=default_sources(config.get("lhm_source")),
+                                 lhm_sha256=config.get("lhm_dll_sha256"), fan_inputs=fan_inputs)
+        try:
+            backend.prepare(progress=lambda message, percent: print(message, flush=True) if percent < 0 else None)
+        except Exception as e:
+            # Custom and Max still work without sensors
+            print(f"Sensor initialization failed: {e}", flush=True)
+    if args.mode:
+        config["mode"] = args.mode
+    if args.api:
+        config["api_enabled"] = True
+    if args.min_interval is not None:
+        config["poll_min_interval"] = args.min_interval
+    if args.max_interval is not None:
+        config["poll_max_interval"] = args.max_interval
+    if args.latency_target is not None:
+        config["poll_latency_target"] = args.latency_target
+    recorder = recorder_from_config(config, APP_DIR)
+    daemon = FanDaemon(backend, config, heartbeat=args.heartbeat,
+                       log=lambda line: print(line, flush=True), recorder=recorder, config_store=config_store)
+    if args.profile:
+        if args.profile not in daemon.profiles:
+            parser.error(f"no profile named {args.profile!r} in config.json")
+        daemon.switch_profile(args.profile)
+    daemon.api = api_from_config(config, daemon.submit)
+    daemon.profiles.listen(daemon.on_hotkey)
+    instance.start(daemon.on_launch_args)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    in_profile = f", profile {daemon.profiles.active}" if daemon.profiles.active else ""
+    print(f"NitroSensual headless ({backend.name} backend, {daemon.controller.mode} mode{in_profile}), "
+          "Ctrl+C to stop", flush=True)
+    try:
+        daemon.run()
+    finally:
+        instance.stop()
+        daemon.profiles.stop()
+        if daemon.api:
+            daemon.api.stop()
+        backend.close()
+        if recorder:
+            recorder.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Auto-mode fan curve compiled from the auto_fan_config rules.
+
+The rules are turned once into sorted breakpoint arrays, so a lookup is a
+single bisect no matter how many ranges the curve has. Temperatures between
+two integer ranges (59.5 with ranges 50-59 and 60-69) belong to the lower
+range, since a range covers every temperature up to the next range's min.
+"""
+from array import array
+from bisect import bisect_right
+
+FALLBACK_SPEED = 50  # used when the temperature or the curve is missing
+
+
+class FanCurve:
+    def __init__(self, rules, interpolate=False):
+        rules = sorted(rules, key=lambda r: r["min"])
+        self.interpolate = interpolate
+        self.speeds = array('d', (r["speed"] for r in rules))
+        # Step mode: rule i applies from its min up to the next rule's min
+        self.thresholds = array('d', (r["min"] for r in rules[1:]))
+        # Interpolation mode: rule i's speed is reached at its min, except the
+        # first rule, which holds its speed up to its max
+        points = [rules[0]["max"]] if rules else []
+        points.extend(r["min"] for r in rules[1:])
+        self.points = array('d', points)
+
+    def __len__(self):
+        return len(self.speeds)
+
+    def lookup(self, temp):
+        if temp is None or not self.speeds:
+            return FALLBACK_SPEED
+        if self.interpolate:
+            return int(round(self._interpolated(temp)))
+        return int(self.speeds[bisect_right(self.thresholds, temp)])
+
+    __call__ = lookup
+
+    def _interpolated(self, temp):
+        points, speeds = self.points, self.speeds
+        i = bisect_right(points, temp)
+        if i == 0:
+            return speeds[0]
+        if i == len(points):
+            return speeds[-1]
+        t0, t1 = points[i - 1], points[i]
+        s0, s1 = speeds[i - 1], speeds[i]
+        if t1 <= t0:
+            return s1
+        return s0 + (s1 - s0) * (temp - t0) / (t1 - t0)
+
+    def breakpoints(self):
+        """Temperatures at which the curve changes behaviour."""
+        return list(self.points if self.interpolate else self.thresholds)
+
+    def evaluate_many(self, temps):
+        """Speeds for a sequence of temperatures, as an array of ints."""
+        if not self.speeds:
+            return array('i', [FALLBACK_SPEED] * len(temps))
+        if self.interpolate:
+            interpolated = self._interpolated
+            return array('i', (int(round(interpolated(t))) for t in temps))
+        thresholds, speeds = self.thresholds, self.speeds
+        return array('i', (int(speeds[bisect_right(thresholds, t)]) for t in temps))
+
+
+class AutoFanController:
+    """Auto-mode decisions with hysteresis and a minimum dwell time.
+
+    Speeds follow the curve upwards at once. They only come down once the
+    curve, evaluated `hysteresis` °C above the current temperature, is below
+    the current speed, and at least `min_dwell` seconds after the last change.
+    A temperature hovering on a breakpoint therefore keeps the higher speed.
+    """
+
+    def __init__(self, curve, hysteresis=0.0, min_dwell=0.0):
+        self.curve = curve
+        self.hysteresis = hysteresis
+        self.min_dwell = min_dwell
+        self.state = {}  # fan_type -> [speed, time of last change]
+
+    def update(self, fan_type, temp, now):
+        up = self.curve.lookup(temp)
+        if temp is None:
+            # Fallback speed while the sensor is missing, not a real decision
+            self.state.pop(fan_type, None)
+            return up
+        state = self.state.get(fan_type)
+        if state is None:
+            self.state[fan_type] = [up, now]
+            return up
+        current, changed_at = state
+        if up >= current:
+            if up != current:
+                state[0], state[1] = up, now
+            return up
+        down = self.curve.lookup(temp + self.hysteresis)
+        if down < current and now - changed_at >= self.min_dwell:
+            state[0], state[1] = down, now
+            return down
+        return current
+
+    def reset(self):
+        self.state.clear()
@@ -0,0 +1,123 @@
+"""Write scheduler between the fan controller and the hardware backend.
+
+Every fan change request goes through FanWriteScheduler, which
+
+* drops requests equal to the last value the hardware acknowledged,
+* coalesces a burst of requests per fan into its latest value, written once
+  the burst's window has elapsed,
+* keeps successive writes to one fan at least `min_interval` apart,
+
+and counts everything it did not send.
+
+`flush()` writes synchronously. A caller that runs the write elsewhere (the
+window's I/O executor) uses `take_due()` and reports back with `complete()`;
+meanwhile the batch counts as in flight.
+"""
+import time
+
+
+class FanWriteScheduler:
+    def __init__(self, write, window=0.2, min_interval=0.5, clock=time.monotonic):
+        # write({fan_type: percent}) -> {fan_type: (ok, detail)}, e.g. backend.write_fans
+        self.write = write
+        self.window = window
+        self.min_interval = min_interval
+        self.clock = clock
+        self.acked = {}
+        self.pending = {}  # fan_type -> [percent, due_time]
+        self.inflight = {}  # fan_type -> percent taken by take_due(), not yet complete()d
+        self.last_write = {}
+        self.counters = {
+            "requested": 0,
+            "written": 0,
+            "duplicate": 0,   # equal to the acknowledged value
+            "coalesced": 0,   # replaced by a newer request before being written
+            "failed": 0,
+        }
+
+    def request(self, fan_type, percent, urgent=False):
+        """Queue a fan change. Urgent requests skip the window and rate limit."""
+        now = self.clock()
+        self.counters["requested"] += 1
+        if percent == self.inflight.get(fan_type, self.acked.get(fan_type)):
+            if self.pending.pop(fan_type, None) is not None:
+                self.counters["coalesced"] += 1
+            self.counters["duplicate"] += 1
+            return
+        entry = self.pending.get(fan_type)
+        if entry is not None:
+            self.counters["coalesced"] += 1
+            entry[0] = percent
+            if urgent:
+                entry[1] = now
+            return
+        if urgent:
+            due = now
+        else:
+            due = max(now + self.window, self.last_write.get(fan_type, float("-inf")) + self.min_interval)
+        self.pending[fan_type] = [percent, due]
+
+    def next_due(self):
+        """Time at which flush() has something to write, None when idle."""
+        if not self.pending:
+            return None
+        return min(due for _, due in self.pending.values())
+
+    def take_due(self, force=False):
+        """Move every pending fan that is due in flight and return {fan_type: percent}."""
+        if not self.pending:
+            return {}
+        now = self.clock()
+        batch = {fan_type: percent for fan_type, (percent, due) in self.pending.items()
+                 if force or due <= now}
+        for fan_type, percent in batch.items():
+            del self.pending[fan_type]
+            self.last_write[fan_type] = now
+            self.inflight[fan_type] = percent
+        return batch
+
+    def flush(self, force=False):
+        """Write every pending fan that is due. Returns the backend results."""
+        batch = self.take_due(force)
+        if not batch:
+            return {}
+        try:
+            results = self.write(batch)
+        except Exception as e:
+            results = {fan_type: (False, str(e)) for fan_type in batch}
+        self.complete(batch, results)
+        return results
+
+    def complete(self, batch, results):
+        """Record the backend results for a batch from take_due()."""
+        for fan_type, percent in batch.items():
+            if self.inflight.get(fan_type) == percent:
+                del self.inflight[fan_type]
+            ok, _ = results.get(fan_type, (False, None))
+            if ok:
+                self.acked[fan_type] = percent
+                self.counters["written"] += 1
+            else:
+                # Unknown hardware state: the next request must go out again
+                self.acked.pop(fan_type, None)
+                self.counters["failed"] += 1
+
+    def commanded(self, fan_type):
+        """Latest speed asked of a fan: the pending value, else the one in flight, else the acknowledged one."""
+        entry = self.pending.get(fan_type)
+        return entry[0] if entry is not None else self.inflight.get(fan_type, self.acked.get(fan_type))
+
+    def invalidate(self, fan_type=None):
+        """Forget acknowledged and in-flight values so the next request is always written."""
+        if fan_type is None:
+            self.acked.clear()
+            self.inflight.clear()
+        else:
+            self.acked.pop(fan_type, None)
+            self.inflight.pop(fan_type, None)
+
+    def suppressed(self):
+        return self.counters["duplicate"] + self.counters["coalesced"]
+
+    def stats(self):
+        return dict(self.counters, suppressed=self.suppressed())
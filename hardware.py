@@ -0,0 +1,797 @@
+"""Hardware backends for sensor reads, fan writes and fan readback.
+
+WindowsBackend talks to the real laptop (LibreHardwareMonitor, the NitroSense
+registry key and the PredatorSense named pipe). SimulatedBackend replaces all
+three with an in-process thermal model so the control loop can run anywhere.
+"""
+import math
+import os
+import random
+import struct
+import threading
+import time
+from array import array
+
+from metrics import METRICS
+from sensors import SensorMap, sensor_kind
+from provision import LHM_DLL_NAME, default_sources, ensure_lhm_dll
+
+FAN_TYPES = ("cpu", "gpu")
+
+REGISTRY_KEY = r"SOFTWARE\\OEM\\NitroSense\\FanControl"
+REGISTRY_VALUES = {"cpu": "CPUFanPercentage", "gpu": "GPU1FanPercentage"}
+
+PIPE_NAME = r"\\.\pipe\PredatorSense_service_namedpipe"
+FAN_GROUPS = {"cpu": 1, "gpu": 4}
+
+# Request: total size, command, payload length, payload ((percent << 8) | fan group)
+PACKET_FORMAT = "<HBIQ"
+PACKET_SIZE = struct.calcsize(PACKET_FORMAT)
+CMD_SET_FAN = 1
+# Response: status byte followed by a 64-bit payload
+RESPONSE_FORMAT = "<BQ"
+RESPONSE_SIZE = struct.calcsize(RESPONSE_FORMAT)
+
+
+def encode_fan_packet(fan_type: str, percent: int) -> bytes:
+    data = (percent << 8) | FAN_GROUPS[fan_type]
+    return struct.pack(PACKET_FORMAT, 16, CMD_SET_FAN, 8, data)
+
+
+def decode_fan_packet(packet: bytes):
+    """Return (fan_type, percent) for a set-fan packet, raise ValueError otherwise."""
+    if len(packet) != PACKET_SIZE:
+        raise ValueError(f"bad packet size {len(packet)}")
+    _, command, length, data = struct.unpack(PACKET_FORMAT, packet)
+    if command != CMD_SET_FAN or length != 8:
+        raise ValueError(f"unsupported command {command}/{length}")
+    group = data & 0xFF
+    percent = (data >> 8) & 0xFF
+    for fan_type, fan_group in FAN_GROUPS.items():
+        if fan_group == group:
+            return fan_type, percent
+    raise ValueError(f"unknown fan group {group}")
+
+
+def unblock_file_if_needed(filepath):
+    # Unblock file if it has a zone identifier (Windows only)
+    if os.name == 'nt' and os.path.exists(filepath):
+        ads = filepath + ":Zone.Identifier"
+        if os.path.exists(ads):
+            try:
+                os.remove(ads)
+            except Exception as e:
+                print(f"Could not remove Zone.Identifier: {e}")
+
+
+# Helper to read current fan percentage from registry
+def read_fan_percentage(fan_type: str) -> int:
+    import winreg
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, REGISTRY_KEY, 0, winreg.KEY_READ | winreg.KEY_WOW64_64KEY) as key:
+            value, _ = winreg.QueryValueEx(key, REGISTRY_VALUES[fan_type])
+            return int(value)
+    except Exception:
+        return -1  # Could not read
+
+
+# Helper to write fan percentage to registry
+def write_registry(fan_type: str, percent: int):
+    import winreg
+    with METRICS.time("registry_write"):
+        with winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, REGISTRY_KEY, 0, winreg.KEY_SET_VALUE | winreg.KEY_WOW64_64KEY) as key:
+            winreg.SetValueEx(key, REGISTRY_VALUES[fan_type], 0, winreg.REG_DWORD, percent)
+
+
+class RegistryFanWatch:
+    """Fan readback from the NitroSense key, woken by RegNotifyChangeKeyValue.
+
+    The key handle stays open, both values are read in one pass, and wait()
+    blocks until a value is set. Notifications belong to the thread that
+    armed them, so create, wait on and close the watch from one thread;
+    stop() may be called from any thread.
+    """
+
+    notifies = True
+
+    def __init__(self):
+        import win32api
+        import win32con
+        import win32event
+        self._win32api = win32api
+        self._win32con = win32con
+        self._win32event = win32event
+        self.key = win32api.RegOpenKeyEx(win32con.HKEY_LOCAL_MACHINE, REGISTRY_KEY, 0,
+                                         win32con.KEY_READ | win32con.KEY_NOTIFY | win32con.KEY_WOW64_64KEY)
+        self.changed = win32event.CreateEvent(None, False, False, None)
+        self.stopped = win32event.CreateEvent(None, True, False, None)
+        self._arm()
+
+    def _arm(self):
+        self._win32api.RegNotifyChangeKeyValue(self.key, False, self._win32con.REG_NOTIFY_CHANGE_LAST_SET,
+                                               self.changed, True)
+
+    def read(self):
+        values = {}
+        for fan_type, name in REGISTRY_VALUES.items():
+            try:
+                values[fan_type] = int(self._win32api.RegQueryValueEx(self.key, name)[0])
+            except Exception:
+                values[fan_type] = -1
+        return values
+
+    def wait(self, timeout=None):
+        """Block until the key changes or `timeout` passes; False once stop() was called."""
+        ms = self._win32event.INFINITE if timeout is None else int(timeout * 1000)
+        result = self._win32event.WaitForMultipleObjects([self.changed, self.stopped], False, ms)
+        if result == self._win32event.WAIT_OBJECT_0 + 1:
+            return False
+        if result == self._win32event.WAIT_OBJECT_0:
+            # Re-arm before the caller reads, so a change during the read is not lost
+            self._arm()
+        return True
+
+    def stop(self):
+        self._win32event.SetEvent(self.stopped)
+
+    def close(self):
+        self.key.Close()
+
+
+class PollingFanWatch:
+    """Fallback readback that re-reads every `interval` seconds."""
+
+    notifies = False
+
+    def __init__(self, read_fan, interval=5.0):
+        self.read_fan = read_fan
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def read(self):
+        return {fan_type: self.read_fan(fan_type) for fan_type in FAN_TYPES}
+
+    def wait(self, timeout=None):
+        return not self._stopped.wait(self.interval if timeout is None else min(timeout, self.interval))
+
+    def stop(self):
+        self._stopped.set()
+
+    def close(self):
+        pass
+
+
+class PipeError(Exception):
+    pass
+
+
+class PipeResponse:
+    """Parsed reply from the fan service."""
+
+    __slots__ = ("status", "payload")
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+    @property
+    def ok(self):
+        return self.status == 0
+
+    @classmethod
+    def parse(cls, raw: bytes):
+        if len(raw) != RESPONSE_SIZE:
+            raise PipeError(f"short response ({len(raw)} of {RESPONSE_SIZE} bytes)")
+        return cls(*struct.unpack(RESPONSE_FORMAT, raw))
+
+    def __repr__(self):
+        return f"PipeResponse(status={self.status}, payload=0x{self.payload:x})"
+
+
+class Win32PipeTransport:
+    """One open connection to the PredatorSense named pipe."""
+
+    def __init__(self, name=PIPE_NAME):
+        import win32file
+        self._win32file = win32file
+        self.handle = win32file.CreateFile(
+            name,
+            win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+            0,
+            None,
+            win32file.OPEN_EXISTING,
+            0,
+            None
+        )
+
+    def transact(self, packet: bytes) -> bytes:
+        with METRICS.time("pipe_write"):
+            self._win32file.WriteFile(self.handle, packet)
+        with METRICS.time("pipe_read"):
+            return self._win32file.ReadFile(self.handle, RESPONSE_SIZE)[1]
+
+    def close(self):
+        self._win32file.CloseHandle(self.handle)
+
+
+class SocketTransport:
+    """Connection to a PipeServiceServer, the local stand-in for the service."""
+
+    def __init__(self, address, timeout=2.0):
+        import socket
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def transact(self, packet: bytes) -> bytes:
+        with METRICS.time("pipe_write"):
+            self.sock.sendall(packet)
+        with METRICS.time("pipe_read"):
+            return _recv_exact(self.sock, RESPONSE_SIZE)
+
+    def close(self):
+        self.sock.close()
+
+
+def _recv_exact(sock, size):
+    buf = b""
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return buf
+
+
+class PipeClient:
+    """Persistent, reconnecting client for fan commands.
+
+    The connection made by `connect()` is kept open between commands. When a
+    command fails the connection is dropped, reopened once and the command
+    retried. If the service cannot be reached, further connects are refused
+    with PipeError until an exponentially growing backoff has elapsed, so
+    callers never block on a service that is restarting.
+    """
+
+    def __init__(self, connect=Win32PipeTransport, backoff_initial=0.25, backoff_max=8.0,
+                 clock=time.monotonic):
+        self.connect = connect
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.transport = None
+        self.connects = 0
+        self.commands = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _ensure_connected(self):
+        if self.transport is not None:
+            return self.transport
+        now = self.clock()
+        if now < self._retry_at:
+            raise PipeError(f"fan service unavailable, retrying in {self._retry_at - now:.1f}s")
+        try:
+            self.transport = self.connect()
+        except Exception as e:
+            self._backoff = min(self.backoff_max, self._backoff * 2 or self.backoff_initial)
+            self._retry_at = now + self._backoff
+            raise PipeError(f"cannot connect to fan service: {e}") from e
+        self._backoff = 0.0
+        self.connects += 1
+        return self.transport
+
+    def _drop(self):
+        if self.transport is not None:
+            try:
+                self.transport.close()
+            except Exception:
+                pass
+            self.transport = None
+
+    def _transact(self, packet):
+        for attempt in (0, 1):
+            transport = self._ensure_connected()
+            try:
+                response = PipeResponse.parse(transport.transact(packet))
+                self.commands += 1
+                return response
+            except PipeError:
+                self._drop()
+                if attempt:
+                    raise
+            except Exception as e:
+                # Stale handle after a service restart: reconnect once and retry
+                self._drop()
+                if attempt:
+                    raise PipeError(str(e)) from e
+
+    def send(self, fan_type: str, percent: int) -> PipeResponse:
+        with self._lock:
+            return self._transact(encode_fan_packet(fan_type, percent))
+
+    def send_many(self, commands):
+        """Send several (fan_type, percent) commands back to back on one connection."""
+        packets = [encode_fan_packet(fan_type, percent) for fan_type, percent in commands]
+        with self._lock:
+            return [self._transact(packet) for packet in packets]
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+
+class PipeServiceServer:
+    """Serves a SimulatedPipeService over localhost TCP.
+
+    Stand-in for the named pipe when measuring PipeClient throughput on a
+    machine without PredatorSense. `address` is valid after construction.
+    """
+
+    def __init__(self, service, host="127.0.0.1", port=0):
+        import socketserver
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(handler):
+                import socket
+                handler.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                while True:
+                    packet = _recv_exact(handler.request, PACKET_SIZE)
+                    if len(packet) < PACKET_SIZE:
+                        return
+                    with self._lock:
+                        reply = service.handle(packet)
+                    handler.request.sendall(reply)
+
+        self._lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def get_lhm_temps(dll_path):
+    # One-shot read: opens and closes a full session (use LhmSession for polling)
+    session = LhmSession(ensure_lhm_dll(dll_path))
+    try:
+        return session.read()
+    finally:
+        session.close()
+
+
+REDISCOVER_MIN = 5.0    # seconds before the first rediscovery for lost sensors
+REDISCOVER_MAX = 300.0  # the interval doubles up to this while they stay lost
+
+
+class LhmSession:
+    """Long-lived LibreHardwareMonitor session.
+
+    The Computer is opened once and every temperature sensor is resolved
+    once into cached handles, named "<kind>/<sensor name>". Each read calls
+    Update() only on the hardware owning those sensors and sweeps all of
+    them into one array, which the SensorMap reduces to the two fan inputs.
+    Discovery is repeated when LHM reports a hardware change or when a read
+    fails. A fan input whose sensors all stopped reporting is rediscovered
+    too, but at growing intervals: a dGPU asleep on battery reports nothing
+    for hours, and a full discovery on every tick would wake it each time.
+    """
+
+    def __init__(self, dll_path, sensor_map=None, clock=time.monotonic):
+        self.dll_path = dll_path
+        self.sensor_map = sensor_map or SensorMap()
+        self.clock = clock
+        self.computer = None
+        self.sensors = []
+        self.values = array("d")
+        self._owners = []
+        self._stale = True
+        self._hw = None
+        self._rediscover_at = 0.0
+        self._rediscover_delay = REDISCOVER_MIN
+
+    def open(self):
+        import clr
+        unblock_file_if_needed(self.dll_path)
+        clr.AddReference(self.dll_path)
+        from LibreHardwareMonitor import Hardware  # type: ignore
+        self._hw = Hardware
+
+        computer = Hardware.Computer()
+        computer.IsCpuEnabled = True
+        computer.IsGpuEnabled = True
+        computer.IsMemoryEnabled = True
+        computer.IsMotherboardEnabled = True
+        computer.IsStorageEnabled = True
+        computer.Open()
+        try:
+            computer.HardwareAdded += self._on_hardware_changed
+            computer.HardwareRemoved += self._on_hardware_changed
+        except Exception:
+            pass  # Older LHM builds: rely on read failures for rediscovery
+        self.computer = computer
+        self._stale = True
+
+    def _on_hardware_changed(self, *args):
+        self._stale = True
+
+    def discover(self):
+        temperature = self._hw.SensorType.Temperature
+        sensors = []
+        names = []
+        owners = []
+
+        def visit(hardware, kind):
+            hardware.Update()
+            for sensor in hardware.Sensors:
+                if sensor.SensorType == temperature:
+                    sensors.append(sensor)
+                    names.append(f"{kind}/{sensor.Name.lower()}")
+                    if hardware not in owners:
+                        owners.append(hardware)
+            for sub in hardware.SubHardware:
+                visit(sub, kind)
+
+        for hardware in self.computer.Hardware:
+            visit(hardware, sensor_kind(hardware.HardwareType))
+        self.sensors = sensors
+        self.values = array("d", [math.nan]) * len(sensors)
+        self._owners = owners
+        self.sensor_map.resolve(names)
+        self._stale = False
+
+    def sweep(self):
+        """Update the owning hardware and read every temperature into self.values."""
+        with METRICS.time("lhm_update"):
+            if self._stale:
+                self.discover()
+            else:
+                for hardware in self._owners:
+                    hardware.Update()
+        values = self.values
+        with METRICS.time("sensor_lookup"):
+            for i, sensor in enumerate(self.sensors):
+                value = sensor.Value
+                values[i] = math.nan if value is None else value
+        # A fan input whose sensors all stopped reporting: its hardware went away, or sleeps
+        if self.sensor_map.lost(values):
+            now = self.clock()
+            if now >= self._rediscover_at:
+                self._stale = True
+                self._rediscover_at = now + self._rediscover_delay
+                self._rediscover_delay = min(self._rediscover_delay * 2, REDISCOVER_MAX)
+        else:
+            self._rediscover_delay = REDISCOVER_MIN
+        return values
+
+    def readings(self):
+        """{sensor name: °C} from the last sweep."""
+        return {name: None if math.isnan(value) else value
+                for name, value in zip(self.sensor_map.names, self.values)}
+
+    def read(self):
+        try:
+            if self.computer is None:
+                self.open()
+            values = self.sweep()
+            with METRICS.time("sensor_aggregate"):
+                return self.sensor_map.aggregate(values)
+        except Exception as e:
+            print(e)
+            self._stale = True
+            return None, None
+
+    def close(self):
+        if self.computer is not None:
+            try:
+                self.computer.Close()
+            except Exception:
+                pass
+        self.computer = None
+        self.sensors = []
+        self._owners = []
+        self._stale = True
+
+
+class HardwareBackend:
+    """Interface between the fan controller and the machine."""
+
+    name = "base"
+
+    def read_temps(self):
+        """Return (cpu_temp, gpu_temp) in °C, None for unavailable sensors."""
+        raise NotImplementedError
+
+    def sensor_readings(self):
+        """{sensor name: °C} for every temperature seen by the last read_temps()."""
+        return {}
+
+    def read_fan(self, fan_type: str) -> int:
+        """Return the fan percentage last stored for fan_type, -1 if unknown."""
+        raise NotImplementedError
+
+    def fan_watch(self, poll_interval=5.0):
+        """A watch for fan readback: read() -> {fan_type: percent}, wait() until it may have changed.
+
+        Backends without change notification poll every `poll_interval` seconds.
+        """
+        return PollingFanWatch(self.read_fan, poll_interval)
+
+    def write_fan(self, fan_type: str, percent: int):
+        """Store and apply a fan percentage. Returns (ok, detail)."""
+        raise NotImplementedError
+
+    def write_fans(self, speeds):
+        """Apply {fan_type: percent} together. Returns {fan_type: (ok, detail)}."""
+        return {fan_type: self.write_fan(fan_type, percent) for fan_type, percent in speeds.items()}
+
+    def prepare(self, progress=None):
+        """Slow one-time setup, safe to run on a worker thread.
+
+        progress(message, percent) reports status; percent is -1 when unknown.
+        """
+
+    def close(self):
+        pass
+
+
+class WindowsBackend(HardwareBackend):
+    name = "windows"
+
+    def __init__(self, dll_path, pipe=None, lhm_sources=None, lhm_sha256=None, fan_inputs=None):
+        self.sensors = LhmSession(dll_path, SensorMap(fan_inputs))
+        self.pipe = pipe or PipeClient()
+        self.lhm_sources = lhm_sources or default_sources()
+        self.lhm_sha256 = lhm_sha256
+
+    def prepare(self, progress=None):
+        ensure_lhm_dll(self.sensors.dll_path, self.lhm_sources, self.lhm_sha256, progress)
+        if progress:
+            progress("Starting .NET runtime and LibreHardwareMonitor...", -1)
+        # Boots the CLR and opens the Computer; the first read then only discovers sensors
+        self.sensors.open()
+
+    def read_temps(self):
+        return self.sensors.read()
+
+    def sensor_readings(self):
+        return self.sensors.readings()
+
+    def read_fan(self, fan_type):
+        return read_fan_percentage(fan_type)
+
+    def fan_watch(self, poll_interval=5.0):
+        try:
+            return RegistryFanWatch()
+        except Exception as e:
+            print(f"Registry change notification unavailable, polling fan readback: {e}")
+            return PollingFanWatch(self.read_fan, poll_interval)
+
+    def write_fan(self, fan_type, percent):
+        write_registry(fan_type, percent)
+        try:
+            response = self.pipe.send(fan_type, percent)
+        except PipeError as e:
+            return False, str(e)
+        return response.ok, response
+
+    def write_fans(self, speeds):
+        for fan_type, percent in speeds.items():
+            write_registry(fan_type, percent)
+        try:
+            responses = self.pipe.send_many(speeds.items())
+        except PipeError as e:
+            return {fan_type: (False, str(e)) for fan_type in speeds}
+        return {fan_type: (response.ok, response) for fan_type, response in zip(speeds, responses)}
+
+    def close(self):
+        self.sensors.close()
+        self.pipe.close()
+
+
+class ThermalModel:
+    """First-order thermal model of the CPU and GPU.
+
+    Each zone relaxes towards ambient + load * heat / (1 + cooling * fan%/100)
+    with its own time constant, so more fan means a lower steady state.
+    """
+
+    ZONES = {
+        # heat: °C above ambient at full load with fans off
+        # cooling: how strongly 100% fan divides that rise
+        # tau: seconds to cover ~63% of a step change
+        "cpu": {"heat": 95.0, "cooling": 1.4, "tau": 8.0},
+        "gpu": {"heat": 80.0, "cooling": 1.2, "tau": 15.0},
+    }
+
+    def __init__(self, ambient=30.0, load=None, noise=0.3, seed=0):
+        self.ambient = ambient
+        # load(t) -> (cpu_load, gpu_load) in 0..1, t in seconds since start
+        self.load = load or default_load
+        self.noise = noise
+        self.rng = random.Random(seed)
+        self.fans = {fan_type: 0 for fan_type in FAN_TYPES}
+        self.temps = {fan_type: ambient + 10.0 for fan_type in FAN_TYPES}
+        self.elapsed = 0.0
+
+    def set_fan(self, fan_type, percent):
+        self.fans[fan_type] = max(0, min(100, percent))
+
+    def steady_state(self, fan_type, load):
+        zone = self.ZONES[fan_type]
+        return self.ambient + load * zone["heat"] / (1.0 + zone["cooling"] * self.fans[fan_type] / 100.0)
+
+    def advance(self, dt):
+        if dt <= 0:
+            return
+        self.elapsed += dt
+        loads = dict(zip(FAN_TYPES, self.load(self.elapsed)))
+        for fan_type, zone in self.ZONES.items():
+            target = self.steady_state(fan_type, loads[fan_type])
+            # Exact step of the first-order response, stable for any dt
+            k = 1.0 - math.exp(-dt / zone["tau"])
+            self.temps[fan_type] += (target - self.temps[fan_type]) * k
+
+    def read(self):
+        return tuple(
+            self.temps[fan_type] + self.rng.gauss(0.0, self.noise) if self.noise else self.temps[fan_type]
+            for fan_type in FAN_TYPES
+        )
+
+
+def default_load(t):
+    # Alternate 2 minutes idle with 3 minutes of a game-like load
+    phase = t % 300.0
+    if phase < 120.0:
+        return 0.15, 0.05
+    return 0.75, 0.9
+
+
+class SimulatedPipeService:
+    """In-process stand-in for the PredatorSense pipe service.
+
+    Accepts the same PACKET_FORMAT requests as the real service and answers
+    with a RESPONSE_FORMAT reply, applying fan changes to the thermal model.
+    """
+
+    STATUS_OK = 0
+    STATUS_ERROR = 1
+
+    def __init__(self, model):
+        self.model = model
+        self.requests = 0
+
+    def handle(self, packet: bytes) -> bytes:
+        self.requests += 1
+        try:
+            fan_type, percent = decode_fan_packet(packet)
+        except ValueError:
+            return struct.pack(RESPONSE_FORMAT, self.STATUS_ERROR, 0)
+        self.model.set_fan(fan_type, percent)
+        data = struct.unpack(PACKET_FORMAT, packet)[3]
+        return struct.pack(RESPONSE_FORMAT, self.STATUS_OK, data)
+
+
+class SimulatedRegistry:
+    """Fan values of the NitroSense key, with change notification for SimulatedFanWatch."""
+
+    def __init__(self):
+        self.values = {fan_type: 0 for fan_type in FAN_TYPES}
+        self.version = 0
+        self.cond = threading.Condition()
+
+    def __getitem__(self, fan_type):
+        with self.cond:
+            return self.values[fan_type]
+
+    def __setitem__(self, fan_type, percent):
+        with self.cond:
+            self.values[fan_type] = percent
+            self.version += 1
+            self.cond.notify_all()
+
+
+class SimulatedFanWatch:
+    """RegistryFanWatch for a SimulatedRegistry: wakes on every value set."""
+
+    notifies = True
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._seen = registry.version
+        self._stopped = False
+
+    def read(self):
+        with self.registry.cond:
+            self._seen = self.registry.version
+            return dict(self.registry.values)
+
+    def wait(self, timeout=None):
+        with self.registry.cond:
+            self.registry.cond.wait_for(lambda: self.registry.version != self._seen or self._stopped, timeout)
+            return not self._stopped
+
+    def stop(self):
+        with self.registry.cond:
+            self._stopped = True
+            self.registry.cond.notify_all()
+
+    def close(self):
+        pass
+
+
+class SimulatedBackend(HardwareBackend):
+    """Backend that runs entirely in-process on top of a ThermalModel.
+
+    The model advances with `clock`, so passing a virtual clock lets callers
+    run faster than real time.
+    """
+
+    name = "simulated"
+
+    # Sensor names as LhmSession reports them, derived from the two model zones
+    SENSORS = (
+        "cpu/cpu package", "cpu/cpu core #1", "cpu/cpu core #2", "cpu/cpu core #3", "cpu/cpu core #4",
+        "gpu/gpu core", "gpu/gpu hot spot", "gpu/gpu memory junction", "storage/composite temperature",
+    )
+
+    def __init__(self, model=None, clock=time.monotonic, fan_inputs=None):
+        self.model = model or ThermalModel()
+        self.sensor_map = SensorMap(fan_inputs)
+        self.sensor_map.resolve(self.SENSORS)
+        self.values = array("d", [math.nan]) * len(self.SENSORS)
+        self.service = SimulatedPipeService(self.model)
+        self.registry = SimulatedRegistry()
+        self.clock = clock
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        now = self.clock()
+        self.model.advance(now - self._last)
+        self._last = now
+
+    def _sweep(self, cpu, gpu):
+        ambient = self.model.ambient
+        values = self.values
+        values[0] = cpu
+        for i, offset in enumerate((-1.5, 0.5, -0.5, 1.5)):
+            values[1 + i] = cpu + offset
+        values[5] = gpu
+        values[6] = gpu + 0.15 * (gpu - ambient)
+        values[7] = gpu + 0.1 * (gpu - ambient) + 4.0
+        values[8] = ambient + 0.3 * (cpu - ambient)
+        return values
+
+    def read_temps(self):
+        with self._lock:
+            self._advance()
+            values = self._sweep(*self.model.read())
+            return self.sensor_map.aggregate(values)
+
+    def sensor_readings(self):
+        with self._lock:
+            return {name: None if math.isnan(value) else value for name, value in zip(self.SENSORS, self.values)}
+
+    def read_fan(self, fan_type):
+        return self.registry[fan_type]
+
+    def fan_watch(self, poll_interval=5.0):
+        return SimulatedFanWatch(self.registry)
+
+    def write_fan(self, fan_type, percent):
+        with self._lock:
+            self._advance()
+            with METRICS.time("registry_write"):
+                self.registry[fan_type] = percent
+            with METRICS.time("pipe_write"):
+                reply = self.service.handle(encode_fan_packet(fan_type, percent))
+            response = PipeResponse.parse(reply)
+        return response.ok, response
@@ -0,0 +1,95 @@
+"""Global hotkeys on Windows, so a profile can be switched from inside a game.
+
+HotkeyListener registers each hotkey with RegisterHotKey on a thread of its
+own, which then waits in GetMessage. A press calls `on_hotkey(name)` on that
+thread, so the owner hands it on to its own thread. Elsewhere the listener
+does nothing:
+
+    listener = HotkeyListener({parse_hotkey("Ctrl+Alt+Q"): "quiet"}, on_hotkey).start()
+"""
+import sys
+import threading
+
+MODIFIERS = {"alt": 0x0001, "ctrl": 0x0002, "control": 0x0002, "shift": 0x0004, "win": 0x0008}
+MOD_NOREPEAT = 0x4000  # holding the keys down fires once
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+WM_USER = 0x0400
+PM_NOREMOVE = 0x0000
+NAMED_KEYS = {
+    "space": 0x20, "pageup": 0x21, "pagedown": 0x22, "end": 0x23, "home": 0x24,
+    "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28, "insert": 0x2D, "delete": 0x2E,
+    "pause": 0x13, "scrolllock": 0x91,
+}
+
+
+def parse_hotkey(text):
+    """"Ctrl+Alt+F9" as (modifiers, virtual key code); raises ValueError when invalid."""
+    if not isinstance(text, str):
+        raise ValueError(f"{text!r} is not a key combination")
+    *mods, key = [part.strip().lower() for part in text.split("+")]
+    modifiers = 0
+    for mod in mods:
+        if mod not in MODIFIERS:
+            raise ValueError(f"unknown modifier {mod!r} in {text!r}")
+        modifiers |= MODIFIERS[mod]
+    if not modifiers:
+        # A bare key would be taken from every other program
+        raise ValueError(f"{text!r} needs Ctrl, Alt, Shift or Win")
+    if len(key) == 1 and key.isalnum() and key.isascii():
+        return modifiers, ord(key.upper())
+    if key[:1] == "f" and key[1:].isdigit() and 1 <= int(key[1:]) <= 24:
+        return modifiers, 0x70 + int(key[1:]) - 1
+    if key.startswith("num") and key[3:].isdigit() and len(key) == 4:
+        return modifiers, 0x60 + int(key[3:])
+    if key in NAMED_KEYS:
+        return modifiers, NAMED_KEYS[key]
+    raise ValueError(f"unknown key {key!r} in {text!r}")
+
+
+class HotkeyListener:
+    def __init__(self, bindings, on_hotkey):
+        self.bindings = dict(bindings)  # {(modifiers, virtual key): name}
+        self.on_hotkey = on_hotkey
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+
+    def start(self):
+        if sys.platform == "win32" and self.bindings:
+            self._thread = threading.Thread(target=self._run, name="hotkeys", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        msg = wintypes.MSG()
+        names = {}
+        try:
+            # Creates the message queue, so stop() can post WM_QUIT to it from now on
+            user32.PeekMessageW(ctypes.byref(msg), None, WM_USER, WM_USER, PM_NOREMOVE)
+            # With no window, WM_HOTKEY is posted to this thread's queue
+            for hotkey_id, ((modifiers, key), name) in enumerate(self.bindings.items(), 1):
+                if user32.RegisterHotKey(None, hotkey_id, modifiers | MOD_NOREPEAT, key):
+                    names[hotkey_id] = name
+                else:
+                    print(f"Hotkey for profile {name!r} is already taken by another program")
+        finally:
+            self._ready.set()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_HOTKEY and msg.wParam in names:
+                self.on_hotkey(names[msg.wParam])
+        for hotkey_id in names:
+            user32.UnregisterHotKey(None, hotkey_id)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        import ctypes
+        self._ready.wait()
+        ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(timeout=2.0)
+        self._thread = None
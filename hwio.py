@@ -0,0 +1,162 @@
+"""Hardware I/O executor: one thread owns every registry and pipe call.
+
+The window submits jobs instead of calling the backend, so a slow
+PredatorSense service stalls this thread and never the GUI:
+
+    io.submit(lambda: backend.write_fans(batch), done)
+
+Jobs run one at a time in order of submission, so two writes to the same
+fan always land in the order they were made. Each job finishes exactly once
+with `done(result, error)`, called on the executor thread (the window turns
+it into a Qt signal). A job's error is the exception it raised, or one of
+
+* TimeoutError when it was not finished `timeout` seconds after submission.
+  A running call cannot be interrupted. Its late result is dropped, and the
+  jobs behind it wait.
+* QueueFull when the bounded queue had no room.
+
+With inline=True jobs run synchronously in submit(), which reproduces the
+old behaviour for comparison.
+"""
+import threading
+import time
+from collections import deque
+
+from metrics import METRICS
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class _Job:
+    __slots__ = ("fn", "done", "submitted", "started", "deadline", "finished")
+
+    def __init__(self, fn, done, submitted, deadline):
+        self.fn = fn
+        self.done = done
+        self.submitted = submitted
+        self.started = None
+        self.deadline = deadline
+        self.finished = False
+
+
+class HardwareExecutor:
+    def __init__(self, maxsize=16, timeout=2.0, inline=False, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.inline = inline
+        self.clock = clock
+        self._queue = deque()
+        self._running = None
+        self._cond = threading.Condition()
+        self._closing = False
+        self.counters = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0}
+        self._threads = []
+        if not inline:
+            for target, name in ((self._work, "hardware-io"), (self._watch, "hardware-io-watchdog")):
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, done=None, timeout=None):
+        """Queue fn() to run on the executor thread; done(result, error) reports how it ended."""
+        now = self.clock()
+        job = _Job(fn, done, now, now + (self.timeout if timeout is None else timeout))
+        if self.inline:
+            self._run(job)
+            return
+        error = None
+        with self._cond:
+            if self._closing:
+                error = RuntimeError("hardware I/O is shut down")
+            elif len(self._queue) >= self.maxsize:
+                self.counters["rejected"] += 1
+                error = QueueFull("hardware I/O queue is full")
+            else:
+                self._queue.append(job)
+                self._cond.notify_all()
+        if error is not None:
+            self._finish(job, None, error)
+
+    def _finish(self, job, result, error):
+        # The worker and the watchdog may both finish a job; the first one wins
+        with self._cond:
+            if job.finished:
+                return
+            job.finished = True
+            if error is None:
+                self.counters["completed"] += 1
+            elif isinstance(error, TimeoutError):
+                self.counters["timed_out"] += 1
+            elif not isinstance(error, QueueFull):
+                self.counters["failed"] += 1
+        if job.done is not None:
+            job.done(result, error)
+
+    def _run(self, job):
+        job.started = self.clock()
+        if METRICS.enabled:
+            METRICS.observe("io_queue_wait", job.started - job.submitted)
+        try:
+            result = job.fn()
+        except Exception as e:
+            self._finish(job, None, e)
+        else:
+            self._finish(job, result, None)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closing)
+                if not self._queue:
+                    return
+                job = self._queue.popleft()
+                if job.finished:
+                    continue
+                self._running = job
+                self._cond.notify_all()
+            self._run(job)
+            with self._cond:
+                self._running = None
+                self._cond.notify_all()
+
+    def _watch(self):
+        while True:
+            expired = []
+            with self._cond:
+                if self._closing and not self._queue and self._running is None:
+                    return
+                now = self.clock()
+                jobs = list(self._queue) + ([self._running] if self._running is not None else [])
+                for job in jobs:
+                    if not job.finished and job.deadline <= now:
+                        expired.append(job)
+                for job in expired:
+                    if job is not self._running:
+                        self._queue.remove(job)
+                pending = [job.deadline for job in jobs if not job.finished and job not in expired]
+                if not expired:
+                    self._cond.wait(min(pending) - now if pending else None)
+            for job in expired:
+                self._finish(job, None, TimeoutError("hardware I/O timed out"))
+
+    def busy_for(self):
+        """Seconds the current call has been running, 0 when idle."""
+        running = self._running
+        return self.clock() - running.started if running is not None and running.started else 0.0
+
+    def queued(self):
+        return len(self._queue)
+
+    def stats(self):
+        return dict(self.counters, queued=self.queued())
+
+    def close(self, timeout=2.0):
+        """Finish the queued jobs, then stop; gives up on a stuck call after `timeout`."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,150 @@
+"""One window at a time: a second launch hands its arguments to the first.
+
+The running window listens on 127.0.0.1:<instance_port>. A later launch
+runs `hand_off()` before Qt, .NET or elevate are imported. It sends its command
+line there, the window comes to the front and applies it, and the launch exits.
+If nobody answers, it starts up normally.
+
+This uses loopback TCP rather than a named pipe because the window runs elevated.
+A pipe created by the window would not be writable from the unelevated second
+launch. Connections are authenticated with a random key written next to
+config.json on every start, and messages are JSON, never pickles.
+"""
+import argparse
+import json
+import os
+import secrets
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from config import APP_DIR, CONFIG_FILE, DEFAULT_CONFIG
+from controller import MODES
+
+KEY_FILE = os.path.join(APP_DIR, "instance.key")
+HOST = "127.0.0.1"
+MAX_MESSAGE = 16 * 1024
+ASFW_ANY = -1
+
+
+def parse_args(argv=None):
+    """Launch options as (args, leftover Qt arguments), for both the first and later launches."""
+    parser = argparse.ArgumentParser(description="Fan control for Acer Nitro laptops")
+    parser.add_argument("--simulate", action="store_true",
+                        help="run against the in-process thermal simulator instead of the laptop")
+    parser.add_argument("--mode", choices=MODES, help="switch to this mode")
+    parser.add_argument("--profile", help="switch to this profile from config.json")
+    return parser.parse_known_args(argv)
+
+
+def configured_port():
+    # Read config.json directly: load_config() would write defaults, and this
+    # runs unelevated where the app folder may not be writable
+    try:
+        with open(CONFIG_FILE) as f:
+            return int(json.load(f).get("instance_port", DEFAULT_CONFIG["instance_port"]))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return DEFAULT_CONFIG["instance_port"]
+
+
+def _allow_foreground():
+    # Windows only lets the process the user just launched take the foreground;
+    # pass that right on so the running window can raise itself
+    if sys.platform == "win32":
+        import ctypes
+        ctypes.windll.user32.AllowSetForegroundWindow(ASFW_ANY)
+
+
+def hand_off(argv, port=None, timeout=2.0):
+    """Send argv to the running instance. False when there is none to take it."""
+    parse_args(argv)  # bad arguments are reported here, not by the running window
+    try:
+        with open(KEY_FILE, "rb") as f:
+            key = f.read()
+    except OSError:
+        return False
+    try:
+        conn = Client((HOST, port or configured_port()), authkey=key)
+    except (OSError, AuthenticationError, EOFError):
+        return False
+    with conn:
+        try:
+            _allow_foreground()
+            conn.send_bytes(json.dumps(list(argv)).encode())
+            return conn.poll(timeout) and conn.recv_bytes(16) == b"ok"
+        except (OSError, EOFError):
+            return False
+
+
+class InstanceServer:
+    """Holds the single-instance port from construction on; `start(on_args)` begins
+    passing forwarded launch args to `on_args(args)`, called on the listener thread.
+    """
+
+    def __init__(self, port=None):
+        self.on_args = None
+        self._key = secrets.token_bytes(32)
+        # Raises OSError when another instance already holds the port
+        self.listener = Listener((HOST, DEFAULT_CONFIG["instance_port"] if port is None else port),
+                                 family="AF_INET", authkey=self._key)
+        self.address = self.listener.address
+        self._closing = False
+        self._thread = threading.Thread(target=self._serve, name="instance", daemon=True)
+        try:
+            fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._key)
+        except OSError:
+            self.listener.close()
+            raise
+
+    def start(self, on_args):
+        self.on_args = on_args
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        while not self._closing:
+            try:
+                conn = self.listener.accept()
+            except (OSError, AuthenticationError, EOFError):
+                continue  # a client with the wrong key, or one that hung up
+            with conn:
+                if self._closing:
+                    return
+                try:
+                    if not conn.poll(1.0):
+                        continue
+                    argv = json.loads(conn.recv_bytes(MAX_MESSAGE))
+                    args, _ = parse_args([str(arg) for arg in argv])
+                except (OSError, EOFError, ValueError, TypeError, SystemExit):
+                    continue
+                self.on_args(args)
+                try:
+                    conn.send_bytes(b"ok")
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._closing = True
+        if self._thread.is_alive():
+            try:
+                # accept() does not notice the socket closing on every platform
+                Client(self.address, authkey=self._key).close()
+            except (OSError, AuthenticationError, EOFError):
+                pass
+            self._thread.join(1.0)
+        self.listener.close()
+        try:
+            os.remove(KEY_FILE)
+        except OSError:
+            pass
+
+
+def instance_server(port=None):
+    """Take the single-instance port, or None when another process holds it."""
+    try:
+        return InstanceServer(configured_port() if port is None else port)
+    except OSError:
+        return None
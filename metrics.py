@@ -0,0 +1,203 @@
+"""Low-overhead timing histograms for the stages of a control tick.
+
+Code under measurement wraps a stage in `with METRICS.time("pipe_write"):`.
+The elapsed time lands in a fixed-bucket histogram (one array of counts per
+stage, no per-sample storage) and an exception escaping the block counts as
+a failure of that stage. With `METRICS.enabled = False` the timer is a
+shared no-op, so instrumentation can stay in place.
+
+Stages recorded by the app: lhm_update, sensor_lookup, sensor_aggregate,
+curve_eval, registry_write, pipe_write, pipe_read, refresh_speeds,
+io_queue_wait (submission to start of a hardware I/O job) and, while the
+diagnostics panel is open, gui_stall (how late the GUI event loop ran).
+
+`render()` produces the Prometheus text exposition format and
+`write_textfile()` writes it atomically, e.g. for node_exporter's textfile
+collector.
+
+Stages are timed on the I/O, sensor and GUI threads at once. A lock guards
+every update, and snapshot() and render() work from a copy taken under it,
+so an export never sees a half-recorded sample.
+"""
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# Upper bounds in seconds; the last bucket (+Inf) catches the rest
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5)
+PREFIX = "nitrosensual"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * (len(BUCKETS) + 1)))
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def copy(self):
+        other = Histogram()
+        other.counts = array("Q", self.counts)
+        other.total, other.count, other.max = self.total, self.count, self.max
+        return other
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.fail(self.stage)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def time(self, stage):
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def fail(self, stage, n=1):
+        if self.enabled:
+            with self._lock:
+                self.failures[stage] = self.failures.get(stage, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.failures.clear()
+
+    def _copy(self):
+        # Consistent ({stage: Histogram}, {stage: failures}) to read without the lock
+        with self._lock:
+            return ({stage: histogram.copy() for stage, histogram in self.histograms.items()},
+                    dict(self.failures))
+
+    def snapshot(self):
+        """{stage: {count, mean, p50, p99, max, failures}}, times in seconds."""
+        histograms, failures = self._copy()
+        result = {}
+        for stage in sorted(set(histograms) | set(failures)):
+            histogram = histograms.get(stage) or Histogram()
+            result[stage] = {
+                "count": histogram.count,
+                "mean": histogram.mean(),
+                "p50": histogram.quantile(0.5),
+                "p99": histogram.quantile(0.99),
+                "max": histogram.max,
+                "failures": failures.get(stage, 0),
+            }
+        return result
+
+    def render(self, counters=None):
+        """Prometheus text exposition; `counters` adds extra {name: value} totals."""
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent in each stage of a control tick.",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        histograms, failures = self._copy()
+        for stage, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += n
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.9f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        lines.append(f"# HELP {PREFIX}_stage_failures_total Stages that raised an error.")
+        lines.append(f"# TYPE {PREFIX}_stage_failures_total counter")
+        for stage, n in sorted(failures.items()):
+            lines.append(f'{PREFIX}_stage_failures_total{{stage="{stage}"}} {n}')
+        for name, value in sorted((counters or {}).items()):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            lines.append(f"{PREFIX}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path, counters=None):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(self.render(counters))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write metrics: {e}")
+
+
+METRICS = Metrics()
+
+
+def metrics_path(config, app_dir):
+    return config.get("metrics_file") or os.path.join(app_dir, "metrics.prom")
+
+
+def control_counters(writer, recorder=None, io=None):
+    """Counters exported next to the timings: fan writes, and I/O trouble and dropped telemetry when given."""
+    stats = writer.stats()
+    counters = {"fan_writes": stats["written"], "fan_writes_suppressed": stats["suppressed"],
+                "fan_writes_failed": stats["failed"]}
+    if io is not None:
+        io_stats = io.stats()
+        counters["io_timeouts"] = io_stats["timed_out"]
+        counters["io_rejected"] = io_stats["rejected"]
+    if recorder:
+        counters["telemetry_dropped"] = recorder.dropped
+    return counters
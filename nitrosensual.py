@@ -1,214 +1,48 @@
+import sys
+
+if __name__ == "__main__":
+    # A second launch only hands its arguments to the running window, before
+    # Qt, .NET or elevate are loaded
+    from instance import hand_off
+    if hand_off(sys.argv[1:]):
+        sys.exit(0)
+
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
-    QSlider, QPushButton, QGroupBox, QDialog, QComboBox, QSpinBox, QScrollArea, QSizePolicy
+    QSlider, QPushButton, QGroupBox, QDialog, QComboBox, QSpinBox, QScrollArea, QSizePolicy, QCheckBox, QMessageBox,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QRect, QPoint, QSize
-from PyQt5.QtGui import QPainter, QColor
-from elevate import elevate
-import urllib.request
-import win32file
-import tempfile
-import zipfile
-import winreg
-import struct
-import json
-import clr
-import sys
+from PyQt5.QtCore import Qt, QObject, QTimer, QThread, pyqtSignal, QRect, QRectF, QPoint, QPointF, QSize
+from PyQt5.QtGui import QPainter, QColor, QPixmap
+from hardware import SimulatedBackend, WindowsBackend
+from provision import LHM_DLL_NAME, default_sources
+from sensors import checked_fan_inputs
+from fanwriter import FanWriteScheduler
+from hwio import HardwareExecutor
+from controller import CURVE_MODES, MODES, auto_options
+from polling import AdaptivePoller
+from telemetry import CHART_WINDOWS, DecimatedHistory, TelemetryBuffer
+from recorder import recorded, recorder_from_config
+from metrics import METRICS, control_counters, metrics_path
+from api import CommandError, api_from_config, state_snapshot
+from profiles import ProfileSet
+from instance import configured_port, hand_off, instance_server, parse_args
+from fancurve import FanCurve
+from rangemodel import RangeModel
+from config import APP_DIR, CONFIG_WATCH_INTERVAL, DEFAULT_CONFIG, ConfigStore
+import math
+import threading
+from concurrent.futures import Future
+import time
 import os
 
-LHM_DLL_PATH = None
-
-elevate()
-
-def get_app_dir():
-    if getattr(sys, 'frozen', False):
-        return os.path.dirname(sys.executable)
-    else:
-        return os.path.dirname(os.path.abspath(__file__))
-
-APP_DIR = get_app_dir()
-CONFIG_FILE = os.path.join(APP_DIR, "config.json")
-
-DEFAULT_CONFIG = {
-    "auto_fan_config": [
-        {"min": 0, "max": 39, "speed": 0},
-        {"min": 40, "max": 49, "speed": 20},
-        {"min": 50, "max": 59, "speed": 35},
-        {"min": 60, "max": 69, "speed": 50},
-        {"min": 70, "max": 79, "speed": 70},
-        {"min": 80, "max": 89, "speed": 85},
-        {"min": 90, "max": 100, "speed": 100},
-    ],
-    "mode": "Custom",
-    "custom_cpu": 50,
-    "custom_gpu": 50,
-}
-
-def load_config():
-    if not os.path.exists(CONFIG_FILE):
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            data = json.load(f)
-        for k, v in DEFAULT_CONFIG.items():
-            if k not in data:
-                data[k] = v
-        return data
-    except Exception:
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
-
-def save_config(config):
-    try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        print("Failed to save config:", e)
-
-# Helper to read current fan percentage from registry
-def read_fan_percentage(fan_type: str) -> int:
-    key_path = r"SOFTWARE\\OEM\\NitroSense\\FanControl"
-    value_name = "CPUFanPercentage" if fan_type == "cpu" else "GPU1FanPercentage"
-    try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_READ | winreg.KEY_WOW64_64KEY) as key:
-            value, _ = winreg.QueryValueEx(key, value_name)
-            return int(value)
-    except Exception:
-        return -1  # Could not read
-
-# Helper to write fan percentage to registry
-def write_registry(fan_type: str, percent: int):
-    key_path = r"SOFTWARE\\OEM\\NitroSense\\FanControl"
-    value_name = "CPUFanPercentage" if fan_type == "cpu" else "GPU1FanPercentage"
-    with winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_SET_VALUE | winreg.KEY_WOW64_64KEY) as key:
-        winreg.SetValueEx(key, value_name, 0, winreg.REG_DWORD, percent)
-
-# Helper to apply fan speed via named pipe
-def apply_fan_speed(fan_type: str, percent: int):
-    fan_group_type = 1 if fan_type == "cpu" else 4
-    data = (percent << 8) | fan_group_type
-    packet = struct.pack("<HBIQ", 16, 1, 8, data)
-    try:
-        handle = win32file.CreateFile(
-            r"\\.\pipe\PredatorSense_service_namedpipe",
-            win32file.GENERIC_READ | win32file.GENERIC_WRITE,
-            0,
-            None,
-            win32file.OPEN_EXISTING,
-            0,
-            None
-        )
-        win32file.WriteFile(handle, packet)
-        resp = win32file.ReadFile(handle, 9)[1]
-        win32file.CloseHandle(handle)
-        return True, resp.hex()
-    except Exception as e:
-        return False, str(e)
-
-def unblock_file_if_needed(filepath):
-    # Unblock file if it has a zone identifier (Windows only)
-    if os.name == 'nt' and os.path.exists(filepath):
-        ads = filepath + ":Zone.Identifier"
-        if os.path.exists(ads):
-            try:
-                os.remove(ads)
-            except Exception as e:
-                print(f"Could not remove Zone.Identifier: {e}")
-
-class ProgressDialog(QDialog):
-    def __init__(self, message):
-        super().__init__()
-        self.setWindowTitle("Please Wait")
-        self.setModal(True)
-        self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
-        layout = QVBoxLayout()
-        label = QLabel(message)
-        layout.addWidget(label)
-        self.setLayout(layout)
-        self.setFixedSize(350, 80)
-
-def ensure_lhm_dll(show_progress=False):
-    global LHM_DLL_PATH
-    if LHM_DLL_PATH is not None:
-        return LHM_DLL_PATH
-    dll_name = "LibreHardwareMonitorLib.dll"
-    dll_path = os.path.join(APP_DIR, dll_name)
-    print(f"Checking for DLL at {dll_path}")
-    progress = None
-    app = QApplication.instance()
-    if not os.path.exists(dll_path):
-        print("DLL not found, starting download...")
-        if show_progress and app is not None:
-            progress = ProgressDialog("Resolving LibreHardwareMonitorLib.dll, please wait...")
-            progress.show()
-            app.processEvents()
-        url = "https://github.com/LibreHardwareMonitor/LibreHardwareMonitor/releases/download/v0.9.4/LibreHardwareMonitor-net472.zip"
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                zip_path = os.path.join(tmpdir, "lhm.zip")
-                print(f"Downloading {url} ...")
-                urllib.request.urlretrieve(url, zip_path)
-                print("Download complete. Extracting DLL...")
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    for member in zip_ref.namelist():
-                        if member.endswith(dll_name):
-                            zip_ref.extract(member, tmpdir)
-                            src = os.path.join(tmpdir, member)
-                            # Copy DLL to current directory
-                            with open(src, 'rb') as fsrc, open(dll_path, 'wb') as fdst:
-                                fdst.write(fsrc.read())
-                            print(f"Extracted {dll_name} to current directory.")
-                            break
-        except Exception as e:
-            print(f"Failed to download DLL: {e}")
-            if progress:
-                progress.close()
-            raise
-        if progress:
-            progress.close()
-    else:
-        print("DLL already present.")
-    LHM_DLL_PATH = dll_path
-    return dll_path
-
-def get_lhm_temps():
-    try:
-        dll_path = ensure_lhm_dll(show_progress=True)
-        unblock_file_if_needed(dll_path)
-        clr.AddReference(dll_path)
-        from LibreHardwareMonitor import Hardware  # type: ignore
-
-        computer = Hardware.Computer()
-        computer.IsCpuEnabled = True
-        computer.IsGpuEnabled = True
-        computer.Open()
-
-        cpu_temp = None
-        gpu_temp = None
-
-        for hardware in computer.Hardware:
-            hardware.Update()
-            if hardware.HardwareType == Hardware.HardwareType.Cpu:
-                for sensor in hardware.Sensors:
-                    if sensor.SensorType == Hardware.SensorType.Temperature and "package" in sensor.Name.lower():
-                        cpu_temp = sensor.Value
-            if hardware.HardwareType == Hardware.HardwareType.GpuNvidia or hardware.HardwareType == Hardware.HardwareType.GpuAmd:
-                for sensor in hardware.Sensors:
-                    if sensor.SensorType == Hardware.SensorType.Temperature and "core" in sensor.Name.lower():
-                        gpu_temp = sensor.Value
-
-        computer.Close()
-        return cpu_temp, gpu_temp
-    except Exception as e:
-        print(e)
-        return None, None
+NO_PROFILE = "(none)"  # the profile list's entry for the settings in config.json
 
 class FanControlWidget(QWidget):
-    def __init__(self, fan_type: str, refresh_callback=None):
+    def __init__(self, fan_type: str, write_callback=None):
         super().__init__()
         self.fan_type = fan_type
-        self.refresh_callback = refresh_callback
+        self.write_callback = write_callback
         self.init_ui()
         self.last_custom_value = self.slider.value()  # Track last custom value
 
@@ -217,7 +51,6 @@ class FanControlWidget(QWidget):
         self.label = QLabel(f"{self.fan_type.upper()} Fan Speed:")
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setRange(0, 100)
-        self.slider.setValue(read_fan_percentage(self.fan_type))
         self.value_label = QLabel(f"{self.slider.value()}%")
         self.slider.valueChanged.connect(self.on_slider_changed)
         self.apply_btn = QPushButton("Apply")
@@ -236,10 +69,10 @@ class FanControlWidget(QWidget):
         while main and not isinstance(main, MainWindow):
             main = main.parentWidget()
         if main and main.current_mode == "Custom":
-            if self.fan_type == "cpu":
-                main.config["custom_cpu"] = v
-            elif self.fan_type == "gpu":
-                main.config["custom_gpu"] = v
+            main.controller.custom[self.fan_type] = v
+            # A profile's speeds stay out of config.json
+            if main.profiles.active is None:
+                main.config[f"custom_{self.fan_type}"] = v
 
     def set_custom_mode(self, enabled: bool):
         self.slider.setEnabled(enabled)
@@ -255,23 +88,13 @@ class FanControlWidget(QWidget):
 
     def apply_fan_speed(self, show_message=True):
         percent = self.slider.value()
-        try:
-            write_registry(self.fan_type, percent)
-            apply_fan_speed(self.fan_type, percent)
-            if self.refresh_callback:
-                self.refresh_callback()
-        except Exception:
-            pass
+        if self.write_callback:
+            self.write_callback(self.fan_type, percent, urgent=True)
 
     def apply_fan_speed_direct(self, percent):
         """Set fan speed without changing slider or last_custom_value."""
-        try:
-            write_registry(self.fan_type, percent)
-            apply_fan_speed(self.fan_type, percent)
-            if self.refresh_callback:
-                self.refresh_callback()
-        except Exception:
-            pass
+        if self.write_callback:
+            self.write_callback(self.fan_type, percent, urgent=True)
 
 class RangeSlider(QSlider):
     rangeChanged = pyqtSignal(int, int)
@@ -311,6 +134,12 @@ class RangeSlider(QSlider):
         self.setLow(low)
         self.setHigh(high)
 
+    def setSpan(self, low, high):
+        """Show low..high without emitting rangeChanged, for values the caller already knows."""
+        if (low, high) != (self._low, self._high):
+            self._low, self._high = low, high
+            self.update()
+
     def mousePressEvent(self, event):
         pos = event.pos().x() if self.orientation() == Qt.Horizontal else event.pos().y()
         low_pos = self._value_to_pos(self._low)
@@ -415,28 +244,249 @@ class RangeSliderWidget(QWidget):
             "speed": self.speed_spin.value()
         }
 
+class HistoryChart(QWidget):
+    """Temperatures and fan % over one of the CHART_WINDOWS, drawn from a DecimatedHistory.
+
+    The plot lives in a ring pixmap with one pixel column per bucket. refresh()
+    after a sample redraws only the columns that sample touched. paintEvent
+    blits the ring in two pieces, scaled to the plot, over a cached
+    background with the grid and legend. A frame therefore costs the same
+    however much history there is.
+    """
+    SERIES = (
+        ("cpu_temp", "CPU °C", QColor(220, 60, 60)),
+        ("gpu_temp", "GPU °C", QColor(50, 150, 50)),
+        ("cpu_cmd", "CPU fan %", QColor(245, 160, 60)),
+        ("gpu_cmd", "GPU fan %", QColor(70, 140, 230)),
+    )
+    MAX_GAP = 60.0  # seconds without samples after which the lines break
+
+    def __init__(self, history, window="10 min", parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.window = window
+        self._background = None
+        self._ring = None
+        self._drawn = None  # newest bucket on the ring
+        self._points = {}  # field -> [(bucket, y) before the last one, (bucket, y) of the last one]
+        font = self.font()
+        font.setPointSizeF(font.pointSizeF() * 0.8)
+        self.setFont(font)
+        self.setMinimumHeight(140)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def set_window(self, window):
+        self.window = window
+        self._background = None
+        self._ring = None
+        self.update()
+
+    def plot_rect(self):
+        # Room for the value labels on the left, the legend above and the time span below
+        metrics = self.fontMetrics()
+        left, top, right, bottom = metrics.width("100") + 6, metrics.height() + 4, 8, metrics.height() + 2
+        return QRect(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+
+    def resizeEvent(self, event):
+        self._background = None
+        self._ring = None
+        super().resizeEvent(event)
+
+    def refresh(self):
+        """Draw the buckets changed since the last call; call it after appending to the history."""
+        buckets = self.history[self.window]
+        if self._ring is None or buckets.newest is None:
+            self.update()
+            return
+        oldest = buckets.newest - buckets.columns + 1
+        first = self._drawn if self._drawn is not None and self._drawn >= oldest else oldest
+        self._draw_buckets(buckets, first)
+        self.update(self.plot_rect())
+
+    def _y(self, value):
+        height = self._ring.height()
+        return (1.0 - min(max(value, 0.0), 100.0) / 100.0) * (height - 1)
+
+    def _draw_buckets(self, buckets, first):
+        """Redraw ring columns for buckets first..newest."""
+        columns, last = buckets.columns, buckets.newest
+        painter = QPainter(self._ring)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        start, count = first % columns, last - first + 1
+        painter.fillRect(start, 0, min(count, columns - start), self._ring.height(), Qt.transparent)
+        if start + count > columns:
+            painter.fillRect(0, 0, start + count - columns, self._ring.height(), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        for field, _, color in self.SERIES:
+            painter.setPen(color)
+            points = self._points.setdefault(field, [None, None])
+            if points[1] is not None and points[1][0] >= first:
+                # The last bucket is being redrawn: connect from the point before it
+                points[1] = points[0]
+            for bucket in range(first, last + 1):
+                low, high = buckets.get(field, bucket)
+                if low != low:
+                    continue
+                x = bucket % columns
+                y_low, y_high = self._y(low), self._y(high)
+                painter.drawLine(QPointF(x, y_high), QPointF(x, y_low))
+                y = (y_low + y_high) / 2
+                previous = points[1]
+                if previous is not None and (bucket - previous[0] - 1) * buckets.span <= self.MAX_GAP:
+                    x0 = previous[0] % columns
+                    x1 = x0 + bucket - previous[0]
+                    painter.drawLine(QPointF(x0, previous[1]), QPointF(x1, y))
+                    if x1 >= columns:  # the segment crosses the ring's seam
+                        painter.drawLine(QPointF(x0 - columns, previous[1]), QPointF(x1 - columns, y))
+                points[0], points[1] = previous, (bucket, y)
+        painter.end()
+        self._drawn = last
+
+    def _paint_background(self):
+        background = QPixmap(self.size())
+        background.fill(self.palette().color(self.backgroundRole()))
+        painter = QPainter(background)
+        painter.setFont(self.font())  # a pixmap painter does not take the widget's font
+        plot = self.plot_rect()
+        painter.fillRect(plot, QColor(255, 255, 255))
+        painter.setPen(QColor(225, 225, 225))
+        for value in (25, 50, 75):
+            y = plot.top() + round((1.0 - value / 100.0) * (plot.height() - 1))
+            painter.drawLine(plot.left(), y, plot.right(), y)
+        painter.setPen(QColor(120, 120, 120))
+        painter.drawRect(plot.adjusted(0, 0, -1, -1))
+        painter.setPen(self.palette().color(self.foregroundRole()))
+        for value in (0, 50, 100):
+            y = plot.top() + round((1.0 - value / 100.0) * (plot.height() - 1))
+            painter.drawText(QRect(0, y - plot.top(), plot.left() - 4, 2 * plot.top()), Qt.AlignRight | Qt.AlignVCenter, str(value))
+        below = QRect(plot.left(), plot.bottom() + 1, plot.width(), self.height() - plot.bottom() - 1)
+        painter.drawText(below, Qt.AlignLeft | Qt.AlignVCenter, f"-{self.window}")
+        painter.drawText(below, Qt.AlignRight | Qt.AlignVCenter, "now")
+        x = plot.left()
+        metrics = painter.fontMetrics()
+        for _, label, color in self.SERIES:
+            painter.fillRect(x, (plot.top() - 8) // 2, 10, 8, color)
+            painter.drawText(QRect(x + 13, 0, metrics.width(label) + 2, plot.top()), Qt.AlignLeft | Qt.AlignVCenter, label)
+            x += 24 + metrics.width(label)
+        painter.end()
+        return background
+
+    def paintEvent(self, event):
+        if self._background is None:
+            self._background = self._paint_background()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        buckets = self.history[self.window]
+        plot = self.plot_rect()
+        if self._ring is None:
+            self._ring = QPixmap(buckets.columns, plot.height())
+            self._ring.fill(Qt.transparent)
+            self._drawn = None
+            self._points = {}
+            if buckets.newest is not None:
+                self._draw_buckets(buckets, buckets.newest - buckets.columns + 1)
+        if buckets.newest is None:
+            return
+        # The oldest bucket sits in the slot after the newest; show it on the left
+        columns, height = buckets.columns, self._ring.height()
+        split = (buckets.newest + 1) % columns
+        width = plot.width() * (columns - split) / columns
+        painter.drawPixmap(QRectF(plot.left(), plot.top(), width, plot.height()),
+                           self._ring, QRectF(split, 0, columns - split, height))
+        if split:
+            painter.drawPixmap(QRectF(plot.left() + width, plot.top(), plot.width() - width, plot.height()),
+                               self._ring, QRectF(0, 0, split, height))
+
 class TempWorker(QThread):
+    """Samples temperatures at the interval chosen by an AdaptivePoller.
+
+    The window runs the Auto and Target modes, and its periodic work, from
+    the temps_updated slot. It is emitted on every tick, with None for both
+    temperatures when the read failed, so that work never stops with the sensors.
+    Fan readback is not tied to these samples: FanReadbackWorker rereads the
+    fans when the backend's fan_watch reports a registry change, or every
+    fan_poll_interval seconds where change notification is unavailable.
+    """
     temps_updated = pyqtSignal(object, object)  # cpu_temp, gpu_temp
 
-    def __init__(self, poll_interval=2):
+    def __init__(self, backend, poller):
         super().__init__()
-        self.poll_interval = poll_interval
-        self._running = True
+        self.backend = backend
+        self.poller = poller
+        self._stop_event = threading.Event()
 
     def run(self):
-        import time
-        while self._running:
-            cpu_temp, gpu_temp = get_lhm_temps()
+        failing = False
+        while not self._stop_event.is_set():
+            try:
+                cpu_temp, gpu_temp = self.backend.read_temps()
+                failing = False
+            except Exception as e:
+                if not failing:
+                    print(f"Reading temperatures failed: {e}")
+                failing = True
+                cpu_temp = gpu_temp = None
+            interval = self.poller.next_interval((cpu_temp, gpu_temp), time.monotonic())
             self.temps_updated.emit(cpu_temp, gpu_temp)
-            time.sleep(self.poll_interval)
+            self._stop_event.wait(interval)
 
     def stop(self):
-        self._running = False
+        self._stop_event.set()
+
+class FanReadbackWorker(QThread):
+    """Reports fan readback whenever the backend's fan watch signals a change."""
+    fans_read = pyqtSignal(int, int)  # cpu_percent, gpu_percent (-1 when unknown)
+
+    def __init__(self, backend, poll_interval):
+        super().__init__()
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.watch = None
+        self._stopped = False
+
+    def run(self):
+        # Created here: registry notifications belong to the thread that arms them
+        self.watch = self.backend.fan_watch(self.poll_interval)
+        try:
+            last = None
+            while not self._stopped:
+                with METRICS.time("refresh_speeds"):
+                    values = self.watch.read()
+                if values != last:
+                    last = values
+                    self.fans_read.emit(values["cpu"], values["gpu"])
+                if not self.watch.wait():
+                    break
+        finally:
+            self.watch.close()
+
+    def stop(self):
+        self._stopped = True
+        if self.watch is not None:
+            self.watch.stop()
+
+class BackendInitWorker(QThread):
+    """Runs the backend's slow setup (DLL download, CLR boot) off the GUI thread."""
+    status = pyqtSignal(str, int)  # message, percent (-1 when unknown)
+    ready = pyqtSignal(bool, str)  # ok, error message
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def run(self):
+        try:
+            self.backend.prepare(progress=self.status.emit)
+        except Exception as e:
+            print(f"Sensor initialization failed: {e}")
+            self.ready.emit(False, str(e))
+        else:
+            self.ready.emit(True, "")
 
 class AutoFanConfigDialog(QDialog):
     configChanged = pyqtSignal(list)
 
-    def __init__(self, parent=None, config=None):
+    def __init__(self, parent=None, config=None, options=None):
         super().__init__(parent)
         self.setWindowTitle("Auto Mode Fan Configuration")
         self.setModal(True)
@@ -445,6 +495,7 @@ class AutoFanConfigDialog(QDialog):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
         self.rows = []
+        self.model = RangeModel([])
 
         label = QLabel("Set fan speed for each temperature range:")
         self.layout.addWidget(label)
@@ -469,12 +520,37 @@ class AutoFanConfigDialog(QDialog):
                 {"min": 80, "max": 89, "speed": 85},
                 {"min": 90, "max": 100, "speed": 100},
             ]
+        self.add_btn = QPushButton("Add Range")
+        self.add_btn.clicked.connect(lambda: self.add_row())
         for entry in config:
             self.add_row(entry["min"], entry["max"], entry["speed"])
-
-        add_btn = QPushButton("Add Range")
-        add_btn.clicked.connect(self.add_row)
-        self.layout.addWidget(add_btn)
+        self.layout.addWidget(self.add_btn)
+
+        if options is None:
+            options = auto_options(DEFAULT_CONFIG)
+        options_layout = QHBoxLayout()
+        self.interpolate_check = QCheckBox("Interpolate between ranges")
+        self.interpolate_check.setChecked(options["auto_interpolate"])
+        self.interpolate_check.toggled.connect(self.emit_config)
+        self.hysteresis_spin = QSpinBox()
+        self.hysteresis_spin.setRange(0, 20)
+        self.hysteresis_spin.setValue(options["auto_hysteresis"])
+        self.hysteresis_spin.setSuffix("°C")
+        self.hysteresis_spin.setToolTip("Slow down only once the temperature is this far below a range's min")
+        self.hysteresis_spin.valueChanged.connect(self.emit_config)
+        self.dwell_spin = QSpinBox()
+        self.dwell_spin.setRange(0, 600)
+        self.dwell_spin.setValue(options["auto_min_dwell"])
+        self.dwell_spin.setSuffix(" s")
+        self.dwell_spin.setToolTip("Minimum time at a speed before it may drop again")
+        self.dwell_spin.valueChanged.connect(self.emit_config)
+        options_layout.addWidget(self.interpolate_check)
+        options_layout.addStretch()
+        options_layout.addWidget(QLabel("Hysteresis:"))
+        options_layout.addWidget(self.hysteresis_spin)
+        options_layout.addWidget(QLabel("Min. dwell:"))
+        options_layout.addWidget(self.dwell_spin)
+        self.layout.addLayout(options_layout)
 
         btn_layout = QHBoxLayout()
         save_btn = QPushButton("Save")
@@ -486,6 +562,16 @@ class AutoFanConfigDialog(QDialog):
         self.layout.addLayout(btn_layout)
 
     def add_row(self, minv=None, maxv=None, speed=50):
+        index = len(self.rows)
+        if minv is None or maxv is None:
+            # Add Range: a new top row, taking its degrees from the rows below
+            changed = self.model.append(speed)
+        else:
+            self.model.lows.append(minv)
+            self.model.highs.append(max(minv, maxv))
+            self.model.speeds.append(speed)
+            changed = (index, index)
+
         row_widget = QWidget()
         row_widget.setMinimumHeight(48)
         row_widget.setMaximumHeight(48)
@@ -493,23 +579,9 @@ class AutoFanConfigDialog(QDialog):
         row_layout.setContentsMargins(0, 0, 0, 0)
         row_widget.setLayout(row_layout)
 
-        # --- Default to 99-100 for new rows if not specified ---
-        if minv is None or maxv is None:
-            # Find the highest max in current rows
-            if self.rows:
-                last_max = self.rows[-1]["slider"].high()
-                minv = min(last_max + 1, 99)
-                maxv = 100
-            else:
-                minv, maxv = 99, 100
-
         slider = RangeSlider(Qt.Horizontal)
         slider.setMinimum(0)
         slider.setMaximum(100)
-        if maxv <= minv:
-            maxv = minv + 1
-        slider.setLow(minv)
-        slider.setHigh(maxv)
         slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
         min_label = QLabel()
@@ -519,25 +591,6 @@ class AutoFanConfigDialog(QDialog):
         max_label.setFixedWidth(56)
         max_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
 
-        def update_labels():
-            idx = None
-            for i, row in enumerate(self.rows):
-                if row["slider"] is slider:
-                    idx = i
-                    break
-            low = slider.low()
-            high = slider.high()
-            if idx == 0:
-                min_label.setText("≤0°C")
-            else:
-                min_label.setText(f"{low}°C")
-            if high == 100:
-                max_label.setText("100+°C")
-            else:
-                max_label.setText(f"{high}°C")
-
-        slider.rangeChanged.connect(lambda low, high: update_labels())
-
         speed_spin = QSpinBox()
         speed_spin.setRange(0, 100)
         speed_spin.setValue(speed)
@@ -546,26 +599,6 @@ class AutoFanConfigDialog(QDialog):
         remove_btn = QPushButton("Remove")
         remove_btn.setFixedWidth(60)
 
-        def update_remove_buttons():
-            enable = len(self.rows) > 1
-            for row in self.rows:
-                row["remove_btn"].setEnabled(enable)
-
-        def remove():
-            self.rules_layout.removeWidget(row_widget)
-            row_widget.setParent(None)
-            row_widget.deleteLater()
-            # Remove from rows, then renormalize
-            self.rows = [r for r in self.rows if r["widget"] != row_widget]
-            self.renormalize_ranges()
-            self.rules_layout.update()
-            # Update all labels after removal
-            for row in self.rows:
-                row["update_labels"]()
-            update_remove_buttons()
-
-        remove_btn.clicked.connect(remove)
-
         row_layout.addWidget(QLabel("Range:"))
         row_layout.addWidget(min_label)
         row_layout.addWidget(slider, stretch=1)
@@ -575,139 +608,257 @@ class AutoFanConfigDialog(QDialog):
         row_layout.addWidget(remove_btn)
 
         self.rules_layout.insertWidget(self.rules_layout.count() - 1, row_widget)
-        # Store update_labels so we can call it after row removal
-        self.rows.append({
+        # "index" is the row's slot in self.model, kept current when rows are removed
+        row = {
+            "index": index,
             "widget": row_widget,
             "slider": slider,
             "speed": speed_spin,
             "min_label": min_label,
             "max_label": max_label,
-            "update_labels": update_labels,
             "remove_btn": remove_btn,
-        })
+        }
+        self.rows.append(row)
+        self.sync_rows(*changed)
 
-        def on_range_changed(low, high, slider=slider):
-            for i, row in enumerate(self.rows):
-                if row["slider"] is slider:
-                    self.push_neighbors(i, low, high)
-                    break
+        slider.rangeChanged.connect(lambda low, high: self.on_range_changed(row, low, high))
+        speed_spin.valueChanged.connect(lambda value: self.on_speed_changed(row, value))
+        remove_btn.clicked.connect(lambda: self.remove_row(row))
+        self.update_remove_buttons()
+        if minv is None or maxv is None:
             self.emit_config()
-            # Update all labels after a change
-            for row in self.rows:
-                row["update_labels"]()
-        slider.rangeChanged.connect(on_range_changed)
 
-        speed_spin.valueChanged.connect(self.emit_config)
+    def update_labels(self, row):
+        i = row["index"]
+        high = self.model.highs[i]
+        row["min_label"].setText("≤0°C" if i == 0 else f"{self.model.lows[i]}°C")
+        row["max_label"].setText("100+°C" if high == 100 else f"{high}°C")
+
+    def sync_rows(self, first, last):
+        """Show the model's ranges for rows first..last; the only widgets an edit touches."""
+        for i in range(first, last + 1):
+            row = self.rows[i]
+            row["slider"].setSpan(self.model.lows[i], self.model.highs[i])
+            self.update_labels(row)
+
+    def update_remove_buttons(self):
+        enable = len(self.rows) > 1
+        for row in self.rows:
+            row["remove_btn"].setEnabled(enable)
+        self.add_btn.setEnabled(not self.model.full())
+
+    def on_range_changed(self, row, low, high):
+        # A handle was dragged: move that bound and push only the neighbours it reaches
+        i = row["index"]
+        if low != self.model.lows[i]:
+            first, last = self.model.set_low(i, low)
+        else:
+            first, last = self.model.set_high(i, high)
+        # The dragged row too: the model may have clamped the handle
+        self.sync_rows(min(first, i), max(last, i))
+        self.emit_config()
 
-        # Initial label update
-        update_labels()
+    def on_speed_changed(self, row, value):
+        self.model.set_speed(row["index"], value)
+        self.emit_config()
 
-        update_remove_buttons()
+    def remove_row(self, row):
+        i = row["index"]
+        row_widget = row["widget"]
+        self.rules_layout.removeWidget(row_widget)
+        row_widget.setParent(None)
+        row_widget.deleteLater()
+        del self.rows[i]
+        for later in self.rows[i:]:
+            later["index"] -= 1
+        self.sync_rows(*self.model.remove(i))
+        if i == 0 and self.rows:
+            # The new first row shows "≤0°C" even if its range did not move
+            self.update_labels(self.rows[0])
+        self.update_remove_buttons()
+        self.emit_config()
 
     def renormalize_ranges(self):
         """Ensure all ranges are contiguous, min=0, max=100, and at least 1 unit wide."""
-        n = len(self.rows)
-        if n == 0:
-            self.emit_config()
-            return
-        # Evenly distribute the available range
-        min_val = 0
-        available = 101  # 0..100 inclusive
-        widths = []
-        # Try to keep previous widths, but at least 1
-        for row in self.rows:
-            slider = row["slider"]
-            width = max(slider.high() - slider.low(), 1)
-            widths.append(width)
-        total_width = sum(widths)
-        # Scale widths to fit exactly 101 units
-        if total_width != available:
-            scale = available / total_width
-            widths = [max(1, int(round(w * scale))) for w in widths]
-            # Fix rounding errors
-            while sum(widths) > available:
-                for i in range(len(widths)):
-                    if widths[i] > 1 and sum(widths) > available:
-                        widths[i] -= 1
-            while sum(widths) < available:
-                for i in range(len(widths)):
-                    if sum(widths) < available:
-                        widths[i] += 1
-        # Now set the sliders
-        for i, row in enumerate(self.rows):
-            slider = row["slider"]
-            slider.setLow(min_val)
-            max_val = min_val + widths[i] - 1
-            if i == n - 1:
-                max_val = 100
-            slider.setHigh(max_val)
-            min_val = max_val + 1
+        self.sync_rows(*self.model.renormalize())
         self.emit_config()
 
-    def push_neighbors(self, idx, low, high):
-        # Enforce: first min is 0, last max is 100, and min < max for all, and no gaps, and at least 1 unit wide
-        # Push right neighbor if overlap or gap
-        if idx < len(self.rows) - 1:
-            next_slider = self.rows[idx+1]["slider"]
-            # Always set next min to our max+1 (magnetic, at least 1 unit wide)
-            new_min = min(high + 1, 99)  # 99 so next max can be at least new_min+1
-            if new_min > next_slider.high() - 1:
-                next_slider.setHigh(min(new_min + 1, 100))
-            if next_slider.low() != new_min:
-                next_slider.setLow(new_min)
-                self.push_neighbors(idx+1, next_slider.low(), next_slider.high())
-        else:
-            # Last max always 100, and at least 1 unit wide
-            if high > 99:
-                self.rows[idx]["slider"].setHigh(100)
-                if self.rows[idx]["slider"].low() > 99:
-                    self.rows[idx]["slider"].setLow(99)
-            else:
-                if self.rows[idx]["slider"].high() != 100:
-                    self.rows[idx]["slider"].setHigh(100)
-        # Push left neighbor if overlap or gap
-        if idx > 0:
-            prev_slider = self.rows[idx-1]["slider"]
-            # Always set prev max to our min-1 (magnetic, at least 1 unit wide)
-            new_max = max(low - 1, 1)  # 1 so prev min can be at most new_max-1
-            if new_max < prev_slider.low() + 1:
-                prev_slider.setLow(max(new_max - 1, 0))
-            if prev_slider.high() != new_max:
-                prev_slider.setHigh(new_max)
-                self.push_neighbors(idx-1, prev_slider.low(), prev_slider.high())
-        else:
-            # First min always 0, and at least 1 unit wide
-            if low < 1:
-                self.rows[idx]["slider"].setLow(0)
-                if self.rows[idx]["slider"].high() < 1:
-                    self.rows[idx]["slider"].setHigh(1)
-            else:
-                if self.rows[idx]["slider"].low() != 0:
-                    self.rows[idx]["slider"].setLow(0)
-
     def get_config(self):
-        config = []
-        for row in self.rows:
-            config.append({
-                "min": row["slider"].low(),
-                "max": row["slider"].high(),
-                "speed": row["speed"].value()
-            })
-        return config
+        return self.model.rules()
+
+    def get_options(self):
+        return {
+            "auto_interpolate": self.interpolate_check.isChecked(),
+            "auto_hysteresis": self.hysteresis_spin.value(),
+            "auto_min_dwell": self.dwell_spin.value(),
+        }
 
     def emit_config(self):
         self.configChanged.emit(self.get_config())
 
+class StallMeter(QObject):
+    """Times how late a short timer fires on the GUI thread, i.e. how long the event loop was blocked.
+
+    Lateness lands in the gui_stall stage; it only runs while someone is looking.
+    """
+    INTERVAL_MS = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.on_tick)
+        self._last = 0.0
+
+    def start(self):
+        self._last = time.perf_counter()
+        self.timer.start(self.INTERVAL_MS)
+
+    def stop(self):
+        self.timer.stop()
+
+    def on_tick(self):
+        now = time.perf_counter()
+        if METRICS.enabled:
+            METRICS.observe("gui_stall", max(0.0, now - self._last - self.INTERVAL_MS / 1000.0))
+        self._last = now
+
+class DiagnosticsDialog(QDialog):
+    COLUMNS = ("Stage", "Calls", "Mean", "p50", "p99", "Max", "Failures")
+
+    def __init__(self, parent, counters):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(560, 320)
+        self.counters = counters  # () -> {name: value}, extra totals shown below the table
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.enabled_check = QCheckBox("Collect timings")
+        self.enabled_check.setChecked(METRICS.enabled)
+        self.enabled_check.toggled.connect(self.on_enabled_toggled)
+        layout.addWidget(self.enabled_check)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        btn_layout = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.on_reset)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        btn_layout.addStretch()
+        btn_layout.addWidget(reset_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.stall_meter = StallMeter(self)
+        self.stall_meter.start()
+        self.refresh()
+
+    def on_enabled_toggled(self, enabled):
+        METRICS.enabled = enabled
+        self.parent().config["metrics_enabled"] = enabled
+        self.parent().save_settings()
+
+    def on_reset(self):
+        METRICS.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = METRICS.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (stage, stats) in enumerate(snapshot.items()):
+            cells = (stage, str(stats["count"]), f"{stats['mean'] * 1000:.2f} ms",
+                     f"≤{stats['p50'] * 1000:.2f} ms", f"≤{stats['p99'] * 1000:.2f} ms",
+                     f"{stats['max'] * 1000:.2f} ms", str(stats["failures"]))
+            for col, text in enumerate(cells):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+        self.counters_label.setText(", ".join(f"{name.replace('_', ' ')}: {value}"
+                                              for name, value in self.counters().items()))
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.stall_meter.stop()
+        event.accept()
+
 class MainWindow(QWidget):
-    def __init__(self):
+    # (command, future) from the API thread, handled on the GUI thread
+    apiCommand = pyqtSignal(object, object)
+    # Parsed arguments of a later launch, from the instance listener thread
+    launchArgs = pyqtSignal(object)
+    # (handler, result, error) of a hardware I/O job, from the executor thread
+    ioDone = pyqtSignal(object, object, object)
+    # Profile name of a global hotkey, from the hotkey thread
+    hotkeyPressed = pyqtSignal(str)
+
+    def __init__(self, backend, instance=None, config_store=None):
         super().__init__()
-        self.config = load_config()
+        self.backend = backend
+        self.instance = instance
+        # Parsed once; edits to self.config are written by save_settings()
+        self.config_store = config_store or ConfigStore()
+        self.config = self.config_store.data
         self.cpu_temp = None
         self.gpu_temp = None
-        self.auto_fan_config = self.config.get("auto_fan_config", DEFAULT_CONFIG["auto_fan_config"])
-        self.current_mode = self.config.get("mode", "Custom")
+        self.profiles = ProfileSet(self.config)
+        self.controller = self.profiles.base.controller
+        self.poller = AdaptivePoller(*self.profiles.base.poll)
+        self.telemetry = TelemetryBuffer(
+            self.config.get("telemetry_capacity", DEFAULT_CONFIG["telemetry_capacity"]))
+        self.history = DecimatedHistory()
+        self.set_auto_fan_config(self.controller.auto_fan_config, self.controller.auto_options)
+        self.current_mode = self.controller.mode
+        self.recorder = recorder_from_config(self.config, APP_DIR)
+        self.write_fans = recorded(self.backend.write_fans, self.recorder)
+        # Registry and pipe calls run here; handlers get their results through ioDone
+        self.ioDone.connect(lambda handler, result, error: handler(result, error))
+        self.io = HardwareExecutor(timeout=self.config.get("io_timeout", DEFAULT_CONFIG["io_timeout"]))
+        self.fan_reads = (-1, -1)
+        # Fan values waiting for the I/O thread, newest per fan; one write job at a time takes them
+        self._io_fans = {}
+        self._io_job = None
+        self._io_lock = threading.Lock()
+        self.fan_writer = FanWriteScheduler(
+            self.write_fans,
+            window=self.config.get("write_coalesce_ms", 200) / 1000.0,
+            min_interval=self.config.get("write_min_interval_ms", 500) / 1000.0,
+        )
+        self.write_timer = QTimer(self)
+        self.write_timer.setSingleShot(True)
+        self.write_timer.timeout.connect(self.flush_fan_writes)
+        self._next_config_check = 0.0
+        METRICS.enabled = self.config.get("metrics_enabled", True)
+        self._diagnostics = None
+        self._next_metrics_export = 0.0
+        # Until the sensors deliver a tick, or for good when they never start
+        self.periodic_timer = QTimer(self)
+        self.periodic_timer.timeout.connect(lambda: self.run_periodic_work(time.monotonic()))
+        self.periodic_timer.start(int(CONFIG_WATCH_INTERVAL * 1000))
         self.init_ui()
-        self.start_temp_worker()
+        self.apiCommand.connect(self.on_api_command)
+        self.api = api_from_config(self.config, self.apiCommand.emit)
+        self.readback_worker = FanReadbackWorker(
+            self.backend, self.config.get("fan_poll_interval", DEFAULT_CONFIG["fan_poll_interval"]))
+        self.readback_worker.fans_read.connect(self.on_fans_read)
+        self.readback_worker.start()
+        self.launchArgs.connect(self.on_launch_args)
+        self.hotkeyPressed.connect(self.on_hotkey)
+        self.profiles.listen(self.hotkeyPressed.emit)
+        if self.instance:
+            self.instance.start(self.launchArgs.emit)
+        self.start_backend_init()
 
     def init_ui(self):
         self.setWindowTitle("NitroSensual 1.1")
@@ -717,21 +868,48 @@ class MainWindow(QWidget):
         mode_layout = QHBoxLayout()
         mode_label = QLabel("Mode:")
         self.mode_combo = QComboBox()
-        self.mode_combo.addItems(["Custom", "Max", "Auto"])
+        self.mode_combo.addItems(MODES)
         self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
         mode_layout.addWidget(mode_label)
         mode_layout.addWidget(self.mode_combo)
 
+        self.profile_label = QLabel("Profile:")
+        self.profile_combo = QComboBox()
+        self.profile_combo.currentTextChanged.connect(self.on_profile_selected)
+        mode_layout.addWidget(self.profile_label)
+        mode_layout.addWidget(self.profile_combo)
+        self.fill_profile_combo()
+
         mode_layout.addStretch()  # Pushes the button to the right
 
         self.graph_btn = QPushButton("📈")
         self.graph_btn.setFixedWidth(32)
-        self.graph_btn.setToolTip("Configure Auto Mode")
-        self.graph_btn.clicked.connect(self.open_auto_config)
+        self.graph_btn.setCheckable(True)
+        self.graph_btn.setToolTip("Show history")
         mode_layout.addWidget(self.graph_btn)
 
+        self.curve_btn = QPushButton("⚙")
+        self.curve_btn.setFixedWidth(32)
+        self.curve_btn.setToolTip("Configure Auto Mode")
+        self.curve_btn.clicked.connect(self.open_auto_config)
+        mode_layout.addWidget(self.curve_btn)
+
+        self.diagnostics_btn = QPushButton("🩺")
+        self.diagnostics_btn.setFixedWidth(32)
+        self.diagnostics_btn.setToolTip("Diagnostics")
+        self.diagnostics_btn.clicked.connect(self.open_diagnostics)
+        mode_layout.addWidget(self.diagnostics_btn)
+
         self.layout.addLayout(mode_layout)
 
+        self.sensor_status_label = QLabel("Sensors: starting...")
+        self.sensor_progress = QProgressBar()
+        self.sensor_progress.setRange(0, 0)  # busy until a percentage is known
+        self.sensor_progress.setMaximumHeight(12)
+        self.sensor_progress.setTextVisible(False)
+        self.layout.addWidget(self.sensor_status_label)
+        self.layout.addWidget(self.sensor_progress)
+
         self.cpu_temp_label = QLabel("CPU Temp: ?")
         self.gpu_temp_label = QLabel("GPU Temp: ?")
         self.cpu_speed_label = QLabel()
@@ -741,6 +919,30 @@ class MainWindow(QWidget):
         self.layout.addWidget(self.cpu_speed_label)
         self.layout.addWidget(self.gpu_speed_label)
 
+        window = self.config.get("history_window", DEFAULT_CONFIG["history_window"])
+        if window not in CHART_WINDOWS:
+            window = DEFAULT_CONFIG["history_window"]
+        self.history_chart = HistoryChart(self.history, window)
+        self.history_window_combo = QComboBox()
+        self.history_window_combo.addItems(CHART_WINDOWS)
+        self.history_window_combo.setCurrentText(window)
+        self.history_window_combo.currentTextChanged.connect(self.on_history_window_changed)
+        self.history_panel = QWidget()
+        history_layout = QVBoxLayout()
+        history_layout.setContentsMargins(0, 0, 0, 0)
+        window_layout = QHBoxLayout()
+        window_layout.addWidget(QLabel("History:"))
+        window_layout.addWidget(self.history_window_combo)
+        window_layout.addStretch()
+        history_layout.addLayout(window_layout)
+        history_layout.addWidget(self.history_chart)
+        self.history_panel.setLayout(history_layout)
+        self.layout.addWidget(self.history_panel, stretch=1)
+        show_history = self.config.get("show_history", True)
+        self.history_panel.setVisible(show_history)
+        self.graph_btn.setChecked(show_history)
+        self.graph_btn.toggled.connect(self.on_history_toggled)
+
         notice = QLabel(
             '<b>Notice:</b> Please enable <span style="color:red">"Custom"</span> mode in NitroSense for fan control to work!'
         )
@@ -749,26 +951,21 @@ class MainWindow(QWidget):
 
         cpu_group = QGroupBox("CPU Fan")
         cpu_layout = QVBoxLayout()
-        self.cpu_fan_widget = FanControlWidget("cpu", refresh_callback=self.refresh_speeds)
+        self.cpu_fan_widget = FanControlWidget("cpu", write_callback=self.request_fan_write)
         cpu_layout.addWidget(self.cpu_fan_widget)
         cpu_group.setLayout(cpu_layout)
         self.layout.addWidget(cpu_group)
 
         gpu_group = QGroupBox("GPU Fan")
         gpu_layout = QVBoxLayout()
-        self.gpu_fan_widget = FanControlWidget("gpu", refresh_callback=self.refresh_speeds)
+        self.gpu_fan_widget = FanControlWidget("gpu", write_callback=self.request_fan_write)
         gpu_layout.addWidget(self.gpu_fan_widget)
         gpu_group.setLayout(gpu_layout)
         self.layout.addWidget(gpu_group)
 
         self.setLayout(self.layout)
         self.resize(400, 200)
-
-        # Timer for refreshing current speeds and temperature
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.refresh_speeds)
-        self.timer.start(1000)
-        self.refresh_speeds()
+        self.on_fans_read(-1, -1)
 
         # Set dropdown state
         idx = self.mode_combo.findText(self.current_mode)
@@ -778,18 +975,83 @@ class MainWindow(QWidget):
         self.cpu_fan_widget.slider.setValue(self.config.get("custom_cpu", 50))
         self.gpu_fan_widget.slider.setValue(self.config.get("custom_gpu", 50))
 
+    def start_backend_init(self):
+        # The window is usable right away; temperatures start once sensors are up
+        self.init_worker = BackendInitWorker(self.backend)
+        self.init_worker.status.connect(self.on_backend_status)
+        self.init_worker.ready.connect(self.on_backend_ready)
+        self.init_worker.start()
+
+    def on_backend_status(self, message, percent):
+        self.sensor_status_label.setText(f"Sensors: {message}")
+        if percent < 0:
+            self.sensor_progress.setRange(0, 0)
+        else:
+            self.sensor_progress.setRange(0, 100)
+            self.sensor_progress.setValue(percent)
+
+    def on_backend_ready(self, ok, error):
+        self.sensor_progress.hide()
+        if ok:
+            self.sensor_status_label.hide()
+            self.start_temp_worker()
+        else:
+            self.sensor_status_label.setText(f"Sensors unavailable: {error}")
+
     def start_temp_worker(self):
-        self.temp_worker = TempWorker()
+        self.periodic_timer.stop()
+        self.temp_worker = TempWorker(self.backend, self.poller)
         self.temp_worker.temps_updated.connect(self.on_temps_updated)
         self.temp_worker.start()
 
     def on_temps_updated(self, cpu_temp, gpu_temp):
         self.cpu_temp = cpu_temp
         self.gpu_temp = gpu_temp
+        self.run_periodic_work(time.monotonic())
         self.update_temp_labels()
-        # If in auto mode, update fan speeds
-        if getattr(self, "current_mode", None) == "Auto":
+        cpu_read, gpu_read = self.fan_reads
+        # If in auto or target mode, update fan speeds
+        if getattr(self, "current_mode", None) in CURVE_MODES:
             self.apply_auto_fan_speeds()
+        sample = dict(
+            cpu_temp=cpu_temp, gpu_temp=gpu_temp,
+            cpu_cmd=self.fan_writer.commanded("cpu"), gpu_cmd=self.fan_writer.commanded("gpu"),
+            cpu_read=cpu_read if cpu_read >= 0 else None, gpu_read=gpu_read if gpu_read >= 0 else None,
+        )
+        now = time.monotonic()
+        self.telemetry.append(now, **sample)
+        self.history.append(now, **sample)
+        if self.history_panel.isVisible():
+            self.history_chart.refresh()
+        if self.recorder:
+            self.recorder.record_sample(time.time(), **sample)
+        stats = self.poller.stats()
+        polling = (f"Sampling every {stats['interval']:.1f} s, {stats['wakeups_per_min']} wakeups/min\n"
+                   f"Breakpoint crossings noticed after {stats['latency_mean']:.2f} s on average "
+                   f"({stats['latency_max']:.2f} s max, {stats['crossings']} crossings)")
+        self.cpu_temp_label.setToolTip(self.telemetry_summary("cpu_temp") + polling)
+        self.gpu_temp_label.setToolTip(self.telemetry_summary("gpu_temp") + polling)
+        self.publish_state(sample)
+
+    def on_history_toggled(self, shown):
+        self.history_panel.setVisible(shown)
+        if shown:
+            self.history_chart.refresh()
+        self.config["show_history"] = shown
+        self.save_settings()
+
+    def on_history_window_changed(self, window):
+        self.history_chart.set_window(window)
+        self.config["history_window"] = window
+        self.save_settings()
+
+    def telemetry_summary(self, field, seconds=60):
+        stats = self.telemetry.stats(field, seconds)
+        if stats["mean"] is None:
+            return ""
+        slope = stats["slope"] or 0.0
+        return (f"Last {seconds} s: min {stats['min']:.1f}°C, max {stats['max']:.1f}°C, "
+                f"mean {stats['mean']:.1f}°C, trend {slope * 60:+.1f}°C/min\n")
 
     def update_temp_labels(self):
         cpu_temp_text = f"CPU Temp: {self.cpu_temp:.1f}°C" if self.cpu_temp is not None else "CPU Temp: ?"
@@ -799,103 +1061,334 @@ class MainWindow(QWidget):
 
     def on_mode_changed(self, mode):
         self.current_mode = mode  # Track current mode
-        self.config["mode"] = mode
+        self.controller.mode = mode
+        self.poller.set_breakpoints(self.controller.breakpoints())
+        settings = {"mode": mode}
         # Save custom values if in custom mode
         if mode == "Custom":
             self.cpu_fan_widget.set_custom_mode(True)
             self.gpu_fan_widget.set_custom_mode(True)
             self.cpu_fan_widget.apply_fan_speed(show_message=False)
             self.gpu_fan_widget.apply_fan_speed(show_message=False)
-            self.config["custom_cpu"] = self.cpu_fan_widget.slider.value()
-            self.config["custom_gpu"] = self.gpu_fan_widget.slider.value()
+            settings["custom_cpu"] = self.cpu_fan_widget.slider.value()
+            settings["custom_gpu"] = self.gpu_fan_widget.slider.value()
         elif mode == "Max":
             self.cpu_fan_widget.set_custom_mode(False)
             self.gpu_fan_widget.set_custom_mode(False)
             self.cpu_fan_widget.apply_fan_speed_direct(100)
             self.gpu_fan_widget.apply_fan_speed_direct(100)
-        elif mode == "Auto":
+        elif mode in CURVE_MODES:
             self.cpu_fan_widget.set_custom_mode(False)
             self.gpu_fan_widget.set_custom_mode(False)
+            # Re-assert the curve even if it matches what was last written
+            self.fan_writer.invalidate()
             self.apply_auto_fan_speeds()
-        save_config(self.config)
-
-    def refresh_speeds(self):
-        cpu_percent = read_fan_percentage("cpu")
-        gpu_percent = read_fan_percentage("gpu")
+        self.store_settings(**settings)
+
+    def fill_profile_combo(self):
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItems([NO_PROFILE, *self.profiles])
+        self.profile_combo.setCurrentText(self.profiles.active or NO_PROFILE)
+        self.profile_combo.blockSignals(False)
+        self.profile_label.setVisible(bool(self.profiles))
+        self.profile_combo.setVisible(bool(self.profiles))
+
+    def on_profile_selected(self, text):
+        self.switch_profile(None if text == NO_PROFILE else text)
+
+    def on_hotkey(self, name):
+        self.switch_profile(self.profiles.hotkey_target(name))
+
+    def switch_profile(self, name):
+        self.controller = self.profiles.switch(name, self.poller, self.fan_writer,
+                                               (self.cpu_temp, self.gpu_temp), time.monotonic())
+        self.auto_fan_config = self.controller.auto_fan_config
+        self.auto_options = self.controller.auto_options
+        # Both fans in one batch, without waiting for the write timer
+        self.flush_fan_writes(force=True)
+        self.show_live_settings()
+        self.publish_state()
+
+    def show_live_settings(self):
+        # The widgets follow the controller without writing back to it
+        mode = self.current_mode = self.controller.mode
+        for combo, text in ((self.mode_combo, mode), (self.profile_combo, self.profiles.active or NO_PROFILE)):
+            combo.blockSignals(True)
+            combo.setCurrentText(text)
+            combo.blockSignals(False)
+        for widget in (self.cpu_fan_widget, self.gpu_fan_widget):
+            widget.last_custom_value = self.controller.custom[widget.fan_type]
+            widget.slider.setValue(widget.last_custom_value)
+            widget.set_custom_mode(mode == "Custom")
+
+    def load_profiles(self, profiles):
+        if self.profiles.load(profiles):
+            self.switch_profile(self.profiles.active)
+        self.fill_profile_combo()
+
+    def store_settings(self, **settings):
+        """Keep edited settings in config.json; a profile's edits stay in memory."""
+        if self.profiles.active is None:
+            self.config.update(settings)
+            self.save_settings()
+
+    def run_io(self, fn, handler):
+        """Run fn() on the I/O executor; handler(result, error) is called on the GUI thread."""
+        self.io.submit(fn, lambda result, error: self.ioDone.emit(handler, result, error))
+
+    def on_fans_read(self, cpu_percent, gpu_percent):
+        self.fan_reads = (cpu_percent, gpu_percent)
         # Only update fan speed labels, not temps
         cpu_text = f"CPU Fan Current Speed: {cpu_percent if cpu_percent >= 0 else '?'}%"
         gpu_text = f"GPU Fan Current Speed: {gpu_percent if gpu_percent >= 0 else '?'}%"
         self.cpu_speed_label.setText(cpu_text)
         self.gpu_speed_label.setText(gpu_text)
 
+    def request_fan_write(self, fan_type, percent, urgent=False):
+        # Urgent writes are explicit user actions: always sent, no coalescing delay
+        if urgent:
+            self.fan_writer.invalidate(fan_type)
+        self.fan_writer.request(fan_type, percent, urgent=urgent)
+        self.schedule_fan_writes()
+
+    def schedule_fan_writes(self):
+        due = self.fan_writer.next_due()
+        if due is None:
+            return
+        # Timer even for due-now writes so requests from one handler share a batch
+        delay = max(0.0, due - time.monotonic())
+        self.write_timer.start(math.ceil(delay * 1000))
+
+    def flush_fan_writes(self, force=False):
+        batch = self.fan_writer.take_due(force)
+        if batch:
+            with self._io_lock:
+                # A write job still queued picks these up too, so a stale value never lands last
+                self._io_fans.update(batch)
+                job = None
+                if self._io_job is None or "batch" in self._io_job:
+                    job = self._io_job = {}
+            if job is not None:
+                self.run_io(lambda: self.write_fans(self.take_io_fans(job)),
+                            lambda results, error: self.on_fans_written(self.take_io_fans(job), results, error))
+        self.schedule_fan_writes()
+
+    def take_io_fans(self, job):
+        # The job's batch: whatever was waiting when it ran, or when it failed without running
+        with self._io_lock:
+            if "batch" not in job:
+                job["batch"], self._io_fans = self._io_fans, {}
+            return job["batch"]
+
+    def on_fans_written(self, batch, results, error):
+        if error is not None:
+            results = {fan_type: (False, str(error)) for fan_type in batch}
+        self.fan_writer.complete(batch, results)
+        stats = self.fan_writer.stats()
+        tooltip = f"Fan writes: {stats['written']} sent, {stats['suppressed']} suppressed, {stats['failed']} failed"
+        self.cpu_speed_label.setToolTip(tooltip)
+        self.gpu_speed_label.setToolTip(tooltip)
+
+    def publish_state(self, sample=None):
+        if not self.api:
+            return
+        sample = sample or {}
+        fans = {fan_type: {"target": self.fan_writer.commanded(fan_type), "read": sample.get(f"{fan_type}_read")}
+                for fan_type in ("cpu", "gpu")}
+        self.api.publish(state_snapshot(self.controller, (self.cpu_temp, self.gpu_temp), fans,
+                                        self.backend.sensor_readings(), self.profiles.active, self.profiles))
+
+    def on_api_command(self, command, future):
+        try:
+            kind = command["command"]
+            if kind == "mode":
+                self.mode_combo.setCurrentText(command["mode"])
+            elif kind == "custom":
+                widgets = {"cpu": self.cpu_fan_widget, "gpu": self.gpu_fan_widget}
+                for fan_type, percent in command["speeds"].items():
+                    self.controller.custom[fan_type] = percent
+                    widgets[fan_type].last_custom_value = percent
+                    if self.current_mode == "Custom":
+                        widgets[fan_type].set_fan_speed(percent)
+                self.store_settings(**{f"custom_{fan_type}": percent
+                                       for fan_type, percent in command["speeds"].items()})
+            elif kind == "curve":
+                if getattr(self, "_auto_config_dialog", None) is not None:
+                    raise RuntimeError("the curve editor is open")
+                self.set_auto_fan_config(command["rules"], dict(self.auto_options, **command["options"]))
+                self.store_settings(auto_fan_config=self.auto_fan_config, **self.auto_options)
+                if self.current_mode in CURVE_MODES:
+                    self.apply_auto_fan_speeds()
+            elif kind == "target":
+                self.controller.set_target_options(dict(self.controller.target_options, **command["options"]))
+                self.poller.set_breakpoints(self.controller.breakpoints())
+                self.store_settings(**self.controller.target_options)
+                if self.current_mode == "Target":
+                    self.apply_auto_fan_speeds()
+            elif kind == "profile":
+                self.switch_profile(command["profile"])
+            elif kind == "profiles":
+                self.load_profiles(command["profiles"])
+            self.publish_state()
+            future.set_result(self.api.snapshot() if self.api else {"ok": True})
+        except Exception as e:
+            future.set_exception(e)
+
+    def metrics_counters(self):
+        return control_counters(self.fan_writer, self.recorder, self.io)
+
+    def run_periodic_work(self, now):
+        """Saves, config.json checks and metrics export, run on the poll tick rather than timers of their own."""
+        self.config_store.flush()
+        # Outside edits to config.json are noticed by mtime
+        if now >= self._next_config_check:
+            self._next_config_check = now + CONFIG_WATCH_INTERVAL
+            self.apply_config_file_changes()
+        if now >= self._next_metrics_export:
+            self._next_metrics_export = now + self.config.get("metrics_interval", 15)
+            self.export_metrics()
+
+    def export_metrics(self):
+        if METRICS.enabled:
+            METRICS.write_textfile(metrics_path(self.config, APP_DIR), self.metrics_counters())
+
+    def on_launch_args(self, args):
+        self.setWindowState((self.windowState() & ~Qt.WindowMinimized) | Qt.WindowActive)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        if args.mode:
+            self.mode_combo.setCurrentText(args.mode)
+        if args.profile:
+            try:
+                self.switch_profile(args.profile)
+            except CommandError as e:
+                print(e)
+
+    def open_diagnostics(self):
+        if self._diagnostics is None:
+            self._diagnostics = DiagnosticsDialog(self, self.metrics_counters)
+        self._diagnostics.show()
+        self._diagnostics.raise_()
+        self._diagnostics.timer.start(1000)
+        self._diagnostics.stall_meter.start()
+
     def open_auto_config(self):
         # Backup current config for possible revert
         backup_config = [dict(x) for x in self.auto_fan_config]
-        dialog = AutoFanConfigDialog(self, config=[dict(x) for x in self.auto_fan_config])
+        backup_options = dict(self.auto_options)
+        dialog = AutoFanConfigDialog(self, config=[dict(x) for x in self.auto_fan_config],
+                                     options=backup_options)
         dialog.configChanged.connect(self.on_auto_config_live_update)
+        self._auto_config_dialog = dialog
         result = dialog.exec_()
+        self._auto_config_dialog = None
         if result:  # Save pressed
-            self.auto_fan_config = dialog.get_config()
-            self.config["auto_fan_config"] = self.auto_fan_config
-            save_config(self.config)
+            self.set_auto_fan_config(dialog.get_config(), dialog.get_options())
+            self.store_settings(auto_fan_config=self.auto_fan_config, **self.auto_options)
         else:  # Cancel or X pressed
-            self.auto_fan_config = backup_config
-            if self.current_mode == "Auto":
+            self.set_auto_fan_config(backup_config, backup_options)
+            if self.current_mode in CURVE_MODES:
                 self.apply_auto_fan_speeds()
 
+    def save_settings(self):
+        # Written by the first poll tick after the save delay
+        self.config_store.save()
+
+    def apply_config_file_changes(self):
+        # Applied like API commands so the widgets follow
+        commands = self.profiles.reload_commands(self.config, self.config_store.reload_if_changed())
+        for command in commands:
+            future = Future()
+            self.on_api_command(command, future)
+            if future.exception() is not None:
+                print(f"config.json change not applied: {future.exception()}")
+
     def on_auto_config_live_update(self, config):
-        self.auto_fan_config = config
-        if self.current_mode == "Auto":
+        dialog = getattr(self, "_auto_config_dialog", None)
+        self.set_auto_fan_config(config, dialog.get_options() if dialog else self.auto_options)
+        if self.current_mode in CURVE_MODES:
             self.apply_auto_fan_speeds()
 
     def closeEvent(self, event):
-        # Reload config from disk to discard unsaved in-memory changes
-        self.config = load_config()
-        self.auto_fan_config = self.config.get("auto_fan_config", DEFAULT_CONFIG["auto_fan_config"])
-        self.current_mode = self.config.get("mode", "Custom")
-        # Optionally, reset UI to match config (not strictly needed on close)
+        if hasattr(self, 'init_worker'):
+            self.init_worker.wait(5000)
         if hasattr(self, 'temp_worker'):
             self.temp_worker.stop()
             self.temp_worker.wait()
-        # Reset dropdown and sliders to config values
-        idx = self.mode_combo.findText(self.current_mode)
-        if idx != -1:
-            self.mode_combo.setCurrentIndex(idx)
-        self.cpu_fan_widget.slider.setValue(self.config.get("custom_cpu", 50))
-        self.gpu_fan_widget.slider.setValue(self.config.get("custom_gpu", 50))
+        self.readback_worker.stop()
+        self.readback_worker.wait()
+        self.write_timer.stop()
+        self.periodic_timer.stop()
+        self.config_store.flush(force=True)
+        self.flush_fan_writes(force=True)
+        # Lets the final writes go out before the pipe is closed
+        self.io.close(timeout=self.config.get("io_timeout", DEFAULT_CONFIG["io_timeout"]))
+        self.export_metrics()
+        if self.api:
+            self.api.stop()
+        if self.instance:
+            self.instance.stop()
+        self.profiles.stop()
+        self.backend.close()
+        if self.recorder:
+            self.recorder.close()
         event.accept()
 
+    def set_auto_fan_config(self, config, options):
+        self.controller.set_auto_fan_config(config, options)
+        self.auto_fan_config = config
+        self.auto_options = self.controller.auto_options
+        self.poller.set_breakpoints(self.controller.breakpoints())
+
     def get_auto_fan_speed(self, temp, config=None):
-        if temp is None:
-            return 50  # fallback if temp is not available
-        if config is None:
-            config = self.auto_fan_config
-        if not config:
-            return 50  # fallback
-        # First rule: match temp <= max
-        if temp <= config[0]["max"]:
-            return config[0]["speed"]
-        # Middle rules: min <= temp <= max
-        for entry in config[1:-1]:
-            if entry["min"] <= temp <= entry["max"]:
-                return entry["speed"]
-        # Last rule: match temp >= min
-        if temp >= config[-1]["min"]:
-            return config[-1]["speed"]
-        # Fallback (should never happen)
-        return 50
+        if config is None or config is self.auto_fan_config:
+            return self.controller.curve.lookup(temp)
+        return FanCurve(config, interpolate=self.controller.curve.interpolate).lookup(temp)
 
     def apply_auto_fan_speeds(self):
-        # Use the config for both CPU and GPU, or you can split if you want
-        cpu_speed = self.get_auto_fan_speed(self.cpu_temp, self.auto_fan_config)
-        gpu_speed = self.get_auto_fan_speed(self.gpu_temp, self.auto_fan_config)
-        self.cpu_fan_widget.apply_fan_speed_direct(cpu_speed)
-        self.gpu_fan_widget.apply_fan_speed_direct(gpu_speed)
+        # The curve in Auto mode, the curve plus the target loop in Target mode
+        speeds = self.controller.target_speeds(self.cpu_temp, self.gpu_temp, time.monotonic())
+        for fan_type, percent in speeds.items():
+            self.request_fan_write(fan_type, percent)
 
 def main():
-    app = QApplication(sys.argv)
-    ensure_lhm_dll(show_progress=True)
-    window = MainWindow()
+    args, qt_args = parse_args()
+    if not args.simulate:
+        from elevate import elevate
+        elevate()
+    instance = instance_server()
+    if instance is None:
+        # Lost a race with another launch, or the port belongs to another program
+        if hand_off(sys.argv[1:]):
+            sys.exit(0)
+        # A second control loop would fight the first over the fans
+        message = (f"instance_port {configured_port()} is taken, but no NitroSensual answered on it. "
+                   "Close the program holding it, or set instance_port in config.json to a free port.")
+        print(message)
+        app = QApplication(sys.argv[:1] + qt_args)
+        QMessageBox.critical(None, "NitroSensual", message)
+        sys.exit(1)
+    app = QApplication(sys.argv[:1] + qt_args)
+    config_store = ConfigStore()
+    config = config_store.data
+    fan_inputs = checked_fan_inputs(config.get("fan_inputs"))
+    if args.simulate:
+        backend = SimulatedBackend(fan_inputs=fan_inputs)
+    else:
+        # DLL download and .NET startup happen in BackendInitWorker after the window is shown
+        backend = WindowsBackend(os.path.join(APP_DIR, LHM_DLL_NAME),
+                                 lhm_sources=default_sources(config.get("lhm_source")),
+                                 lhm_sha256=config.get("lhm_dll_sha256"), fan_inputs=fan_inputs)
+    window = MainWindow(backend, instance, config_store)
+    if args.mode:
+        window.mode_combo.setCurrentText(args.mode)
+    if args.profile:
+        try:
+            window.switch_profile(args.profile)
+        except CommandError as e:
+            print(e)
     window.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,87 @@
+"""Target mode: closed-loop fan control towards a temperature.
+
+Each fan runs a PID loop on its smoothed temperature, on top of the Auto
+curve as feed-forward:
+
+    speed = feedforward * auto(smoothed) + max(0, kp * error + integral + kd * d(smoothed)/dt)
+
+where error = smoothed - target, positive when too hot. The curve (with its
+hysteresis and dwell) sets the baseline. The loop only adds cooling on top
+of it, so below the target Target mode runs the fans like Auto does.
+
+The smoothing is an exponential moving average with a `smoothing` second
+time constant, so sensor noise does not reach the output. The output moves
+at most `slew` percent per second. The commanded speed only changes once the
+output is `deadband` percent away from it, which keeps fan writes rare at
+steady state. The integral never goes below zero, and it stops growing while
+the output is pinned at 100 (anti-windup).
+"""
+import math
+
+STALE_AFTER = 30.0  # seconds without a sample (another mode, a gap) before a loop starts over
+
+
+class _FanLoop:
+    __slots__ = ("smoothed", "integral", "output", "commanded", "last")
+
+    def __init__(self, temp, now, output):
+        self.smoothed = temp
+        self.integral = 0.0
+        self.output = float(output)
+        self.commanded = int(round(output))
+        self.last = now
+
+
+class TargetFanController:
+    def __init__(self, auto, options):
+        self.auto = auto  # AutoFanController giving the feed-forward
+        self.targets = {"cpu": options["target_cpu"], "gpu": options["target_gpu"]}
+        self.kp = options["target_kp"]
+        self.ki = options["target_ki"]
+        self.kd = options["target_kd"]
+        self.feedforward = options["target_feedforward"]
+        self.smoothing = options["target_smoothing"]
+        self.slew = options["target_slew"]
+        self.deadband = options["target_deadband"]
+        self.state = {}  # fan_type -> _FanLoop
+
+    def update(self, fan_type, temp, now):
+        if temp is None:
+            # Same fallback as Auto while the sensor is missing
+            self.state.pop(fan_type, None)
+            return self.auto.update(fan_type, None, now)
+        loop = self.state.get(fan_type)
+        if loop is None or now - loop.last > STALE_AFTER:
+            # Start from the curve, so the first write is already close
+            self.auto.state.pop(fan_type, None)
+            speed = self.feedforward * self.auto.update(fan_type, temp, now)
+            loop = self.state[fan_type] = _FanLoop(temp, now, min(100.0, speed))
+            return loop.commanded
+        dt = now - loop.last
+        if dt <= 0:
+            return loop.commanded
+        loop.last = now
+        previous = loop.smoothed
+        if self.smoothing > 0:
+            loop.smoothed += (temp - loop.smoothed) * (1.0 - math.exp(-dt / self.smoothing))
+        else:
+            loop.smoothed = temp
+        error = loop.smoothed - self.targets[fan_type]
+        base = self.feedforward * self.auto.update(fan_type, loop.smoothed, now)
+        correction = self.kp * error + self.kd * (loop.smoothed - previous) / dt
+        integral = max(0.0, loop.integral + self.ki * error * dt)
+        if error < 0 or base + max(0.0, correction + integral) <= 100.0:
+            # Anti-windup: the integral does not grow while the fans are already at 100%
+            loop.integral = integral
+        wanted = min(100.0, base + max(0.0, correction + loop.integral))
+        step = self.slew * dt
+        loop.output += max(-step, min(step, wanted - loop.output))
+        speed = int(round(loop.output))
+        # 0 and 100 are always reached, even when closer than the deadband
+        if abs(speed - loop.commanded) >= self.deadband or (speed != loop.commanded and speed in (0, 100)):
+            loop.commanded = speed
+        return loop.commanded
+
+    def reset(self):
+        self.state.clear()
+        self.auto.reset()
@@ -0,0 +1,99 @@
+"""Adaptive temperature sampling.
+
+AdaptivePoller picks the delay until the next sample from the thermal state:
+the minimum interval while a temperature is rising fast, never longer than a
+rising temperature needs to reach the next fan-curve breakpoint, and a
+gradually longer one while everything is stable. The backoff stops at the
+latency target while a breakpoint lies above a sensor, because a load spike
+can cross it at any moment; only with nothing left to cross does it go on to
+the maximum. It also keeps the metrics used to tune it:
+wakeups per minute and how late a breakpoint crossing was noticed.
+"""
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+
+class AdaptivePoller:
+    def __init__(self, min_interval=0.5, max_interval=5.0, latency_target=2.0, rising_rate=0.3,
+                 stable_band=1.0, backoff=1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.latency_target = latency_target  # longest wait while a breakpoint can be crossed
+        self.rising_rate = rising_rate        # °C/s that counts as a fast rise
+        self.stable_band = stable_band        # °C of change between samples treated as noise
+        self.backoff = backoff
+        self.breakpoints = ()
+        self.interval = min_interval
+        self._prev = None
+        self._prev_time = None
+        self._wakeups = deque()
+        self.crossings = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def set_breakpoints(self, breakpoints):
+        self.breakpoints = tuple(sorted(breakpoints))
+
+    def _headroom(self, temp):
+        """°C from temp up to the next breakpoint, inf when none is above."""
+        bps = self.breakpoints
+        i = bisect_right(bps, temp)
+        return bps[i] - temp if i < len(bps) else float("inf")
+
+    def _record_crossings(self, prev, temp, prev_time, now):
+        # Estimate when an upward crossing happened by interpolating between samples
+        if temp <= prev:
+            return
+        bps = self.breakpoints
+        for bp in bps[bisect_left(bps, prev + 1e-9):bisect_left(bps, temp + 1e-9)]:
+            crossed_at = prev_time + (bp - prev) / (temp - prev) * (now - prev_time)
+            latency = now - crossed_at
+            self.crossings += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def next_interval(self, temps, now):
+        """Record a sample taken at `now` and return seconds until the next one."""
+        self._wakeups.append(now)
+        while self._wakeups and now - self._wakeups[0] > 60.0:
+            self._wakeups.popleft()
+
+        temps = list(temps)
+        hot = False
+        stable = self._prev is not None
+        reach = self.max_interval
+        if self._prev is not None:
+            dt = max(now - self._prev_time, 1e-6)
+            for prev, temp in zip(self._prev, temps):
+                if prev is None or temp is None:
+                    continue
+                self._record_crossings(prev, temp, self._prev_time, now)
+                change = temp - prev
+                if abs(change) > self.stable_band:
+                    stable = False
+                if change > self.stable_band and change / dt >= self.rising_rate:
+                    hot = True
+                elif change > 0:
+                    # However small the rise, sample again before it would reach the next breakpoint
+                    reach = min(reach, self._headroom(temp) / (change / dt))
+
+        if hot:
+            self.interval = self.min_interval
+        elif stable:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        # Slow or falling movement keeps the current pace
+        if any(temp is not None and self._headroom(temp) < float("inf") for temp in temps):
+            self.interval = min(self.interval, self.latency_target)
+        self.interval = max(self.min_interval, min(self.interval, reach))
+        self._prev = temps
+        self._prev_time = now
+        return self.interval
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "wakeups_per_min": len(self._wakeups),
+            "crossings": self.crossings,
+            "latency_mean": self.latency_total / self.crossings if self.crossings else 0.0,
+            "latency_max": self.latency_max,
+        }
@@ -0,0 +1,165 @@
+"""Named profiles: a mode, custom speeds, a curve and polling settings under one name.
+
+config.json holds them under "profiles", each a subset of the top-level keys
+plus an optional global hotkey:
+
+    "profiles": {
+        "quiet": {"mode": "Custom", "custom_cpu": 25, "custom_gpu": 15, "hotkey": "Ctrl+Alt+Q"},
+        "gaming": {"mode": "Target", "target_cpu": 75, "poll_min_interval": 0.25, "hotkey": "Ctrl+Alt+G"}
+    }
+
+Keys a profile leaves out take their defaults, so a profile means the same
+thing whatever the rest of config.json says. compile_profiles() checks and
+compiles every profile once, when config.json is loaded or its "profiles"
+change. Switching to a profile then only swaps in its FanController and
+polling intervals, and writes both fans in one batch; nothing is parsed,
+compiled or saved.
+
+The window and the daemon each keep a ProfileSet and switch through it:
+
+    controller = profiles.switch("quiet", poller, writer, temps, now)
+"""
+from api import CommandError, config_commands
+from config import AUTO_OPTION_KEYS, DEFAULT_CONFIG, TARGET_OPTION_KEYS, normalize_config
+from controller import CURVE_MODES, FanController
+from hotkeys import HotkeyListener, parse_hotkey
+
+PROFILE_KEYS = ("mode", "custom_cpu", "custom_gpu", "auto_fan_config", *AUTO_OPTION_KEYS,
+                *TARGET_OPTION_KEYS, "poll_min_interval", "poll_max_interval",
+                "poll_latency_target")
+
+
+class Profile:
+    __slots__ = ("name", "controller", "poll", "hotkey")
+
+    def __init__(self, name, settings, hotkey=None):
+        self.name = name  # None for the settings at the top of config.json
+        self.controller = FanController(settings)
+        # AdaptivePoller's min_interval, max_interval and latency_target
+        self.poll = tuple(settings.get(key, DEFAULT_CONFIG[key])
+                          for key in ("poll_min_interval", "poll_max_interval", "poll_latency_target"))
+        self.hotkey = hotkey  # (modifiers, virtual key) or None
+
+    def apply(self, poller, writer, temps, now):
+        """Make this profile live on poller and writer: both fans are requested at once.
+
+        Returns the speeds requested; the caller flushes writer to send them
+        as one batch.
+        """
+        poller.min_interval, poller.max_interval, poller.latency_target = self.poll
+        poller.set_breakpoints(self.controller.breakpoints())
+        # Loops left running since the profile was last active start over
+        self.controller.reset()
+        if temps == (None, None) and self.controller.mode in CURVE_MODES:
+            return {}  # no sample yet: the next one writes the curve's speeds
+        speeds = self.controller.target_speeds(temps[0], temps[1], now)
+        writer.invalidate()
+        for fan_type, percent in speeds.items():
+            writer.request(fan_type, percent, urgent=True)
+        return speeds
+
+
+def compile_profiles(config):
+    """{name: Profile} from config["profiles"]. Problems are reported and the profile left out."""
+    profiles = {}
+    for name, entry in config.get("profiles", {}).items():
+        if not isinstance(entry, dict):
+            print(f"config.json: profiles.{name} is not an object, ignored")
+            continue
+        unknown = sorted(set(entry) - set(PROFILE_KEYS) - {"hotkey"})
+        if unknown:
+            print(f"config.json: profiles.{name}: {', '.join(unknown)} cannot be set by a profile, ignored")
+        settings, problems = normalize_config({k: entry[k] for k in PROFILE_KEYS if k in entry})
+        for problem in problems:
+            print(f"config.json: profiles.{name}.{problem}")
+        hotkey = None
+        if entry.get("hotkey"):
+            try:
+                hotkey = parse_hotkey(entry["hotkey"])
+            except ValueError as e:
+                print(f"config.json: profiles.{name}.hotkey: {e}")
+        profiles[name] = Profile(name, settings, hotkey)
+    return profiles
+
+
+def hotkey_bindings(profiles):
+    """{(modifiers, virtual key): profile name} for the profiles that have a hotkey."""
+    return {profile.hotkey: name for name, profile in profiles.items() if profile.hotkey}
+
+
+class ProfileSet:
+    """The settings at the top of config.json, the named profiles and which one is live.
+
+    Iterating gives the profile names. `active` is the live profile's name,
+    None while the top-level settings are live.
+    """
+
+    def __init__(self, config):
+        self.base = Profile(None, config)
+        self.named = compile_profiles(config)
+        self.active = None
+        self._on_hotkey = None
+        self._hotkeys = None
+
+    def __iter__(self):
+        return iter(self.named)
+
+    def __contains__(self, name):
+        return name in self.named
+
+    def __len__(self):
+        return len(self.named)
+
+    def switch(self, name, poller, writer, temps, now):
+        """Make profile `name` live, or the top-level settings for None. Nothing is saved.
+
+        Returns the live FanController; the caller flushes writer. Raises
+        CommandError for a name that is not a profile.
+        """
+        if name is not None and name not in self.named:
+            raise CommandError(f"no profile named {name!r}")
+        profile = self.base if name is None else self.named[name]
+        self.active = name
+        profile.apply(poller, writer, temps, now)
+        return profile.controller
+
+    def hotkey_target(self, name):
+        """Where a press of profile `name`'s hotkey switches to."""
+        # A second press of the live profile's hotkey goes back to the config.json settings
+        return None if name == self.active else name
+
+    def load(self, profiles):
+        """Replace the named profiles with `profiles` from config.json and rebind the hotkeys.
+
+        Returns True when a profile is live: the caller switches to `active`
+        again, which is its new definition, or the top-level settings when it
+        was removed.
+        """
+        self.named = compile_profiles({"profiles": profiles})
+        if self._hotkeys is not None:
+            self.listen(self._on_hotkey)
+        if self.active is None:
+            return False
+        if self.active not in self.named:
+            self.active = None
+        return True
+
+    def reload_commands(self, config, changed):
+        """Commands that apply the `changed` keys of a reloaded config.json now."""
+        commands = config_commands(config, changed)
+        if commands and self.active is not None:
+            # The top-level settings wait for the profile to be left; only new profiles apply now
+            self.base = Profile(None, config)
+            commands = [command for command in commands if command["command"] == "profiles"]
+        return commands
+
+    def listen(self, on_hotkey):
+        """Register the profiles' hotkeys; on_hotkey(name) is called on the hotkey thread."""
+        self.stop()
+        self._on_hotkey = on_hotkey
+        self._hotkeys = HotkeyListener(hotkey_bindings(self.named), on_hotkey).start()
+
+    def stop(self):
+        if self._hotkeys is not None:
+            self._hotkeys.stop()
+            self._hotkeys = None
@@ -0,0 +1,185 @@
+"""Provisioning of LibreHardwareMonitorLib.dll.
+
+The DLL is taken from the first source that works: a local release zip, a
+mirror directory (holding the zip or the DLL itself) or a URL. Downloads are
+streamed to disk, the DLL is streamed straight out of the zip member, hashed
+on the way and only moved into place (atomically) once its SHA-256 matches.
+
+The DLL is loaded into an elevated process, so ensure_lhm_dll() checks its
+digest on every start, not only when it installs it, and refuses a DLL that
+does not match. No pinned digest ships yet (LHM_DLL_SHA256 is None). Until
+one is set, here or through the lhm_dll_sha256 config key, the digest of the
+first installed DLL is recorded next to it and every later start must match it.
+"""
+import hashlib
+import os
+import tempfile
+
+LHM_DLL_NAME = "LibreHardwareMonitorLib.dll"
+LHM_ZIP_NAME = "LibreHardwareMonitor-net472.zip"
+LHM_ZIP_URL = f"https://github.com/LibreHardwareMonitor/LibreHardwareMonitor/releases/download/v0.9.4/{LHM_ZIP_NAME}"
+# SHA-256 that LibreHardwareMonitorLib.dll from LHM_ZIP_URL must have. Not
+# pinned yet: until it is (or lhm_dll_sha256 is set), the first fetch is unverified
+LHM_DLL_SHA256 = None
+
+CHUNK_SIZE = 64 * 1024
+SOURCE_ENV = "NITROSENSUAL_LHM_SOURCE"
+
+
+class ProvisionError(Exception):
+    pass
+
+
+def _report(progress, message, done=None, total=None):
+    if progress:
+        progress(message, int(100 * done / total) if done is not None and total else -1)
+
+
+def pinned_digest(dll_path, sha256=None):
+    """The digest a provisioned DLL must have, None if nothing is pinned yet."""
+    if sha256:
+        return sha256.lower()
+    if LHM_DLL_SHA256:
+        return LHM_DLL_SHA256
+    try:
+        with open(dll_path + ".sha256") as f:
+            return f.read().split()[0].lower()
+    except (OSError, IndexError):
+        return None
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _record_digest(dll_path, digest):
+    # Trust on first use: every later start must find this DLL
+    print(f"WARNING: nothing to verify {LHM_DLL_NAME} against; set lhm_dll_sha256 in config.json "
+          "to the digest below after checking it")
+    with open(dll_path + ".sha256", "w") as f:
+        f.write(f"{digest}  {LHM_DLL_NAME}\n")
+
+
+def _install_stream(src, size, dll_path, expected, progress, label):
+    """Copy src to dll_path through a temp file in the same directory, verifying the digest."""
+    sha = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(prefix=".lhm-", suffix=".tmp", dir=os.path.dirname(dll_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            done = 0
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                sha.update(chunk)
+                dst.write(chunk)
+                done += len(chunk)
+                _report(progress, label, done, size)
+            dst.flush()
+            os.fsync(dst.fileno())
+        digest = sha.hexdigest()
+        if expected and digest != expected:
+            raise ProvisionError(f"{LHM_DLL_NAME} digest mismatch: got {digest}, expected {expected}")
+        os.replace(tmp_path, dll_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest
+
+
+def _extract_from_zip(zip_path, dll_path, expected, progress):
+    import zipfile
+    with zipfile.ZipFile(zip_path) as zf:
+        member = next((info for info in zf.infolist() if info.filename.endswith(LHM_DLL_NAME)), None)
+        if member is None:
+            raise ProvisionError(f"{LHM_DLL_NAME} not found in {zip_path}")
+        with zf.open(member) as src:
+            return _install_stream(src, member.file_size, dll_path, expected, progress,
+                                   f"Extracting {LHM_DLL_NAME}...")
+
+
+def _download(url, dest_dir, progress):
+    import urllib.request
+    fd, zip_path = tempfile.mkstemp(prefix=".lhm-", suffix=".zip", dir=dest_dir)
+    try:
+        with os.fdopen(fd, "wb") as dst, urllib.request.urlopen(url, timeout=30) as resp:
+            total = int(resp.headers.get("Content-Length") or 0)
+            done = 0
+            for chunk in iter(lambda: resp.read(CHUNK_SIZE), b""):
+                dst.write(chunk)
+                done += len(chunk)
+                _report(progress, "Downloading LibreHardwareMonitor...", done, total)
+    except BaseException:
+        os.remove(zip_path)
+        raise
+    return zip_path
+
+
+def _from_source(source, dll_path, expected, progress):
+    if source.startswith(("http://", "https://")):
+        print(f"Downloading {source} ...")
+        zip_path = _download(source, os.path.dirname(dll_path) or ".", progress)
+        try:
+            return _extract_from_zip(zip_path, dll_path, expected, progress)
+        finally:
+            os.remove(zip_path)
+    if os.path.isdir(source):
+        dll_candidate = os.path.join(source, LHM_DLL_NAME)
+        if os.path.isfile(dll_candidate):
+            with open(dll_candidate, "rb") as src:
+                return _install_stream(src, os.path.getsize(dll_candidate), dll_path, expected, progress,
+                                       f"Copying {LHM_DLL_NAME}...")
+        source = os.path.join(source, LHM_ZIP_NAME)
+    if os.path.isfile(source):
+        return _extract_from_zip(source, dll_path, expected, progress)
+    raise ProvisionError(f"no {LHM_DLL_NAME} or {LHM_ZIP_NAME} at {source}")
+
+
+def default_sources(configured=None):
+    sources = [os.environ.get(SOURCE_ENV), configured, LHM_ZIP_URL]
+    return [source for source in sources if source]
+
+
+def provision_lhm_dll(dll_path, sources=None, sha256=None, progress=None):
+    """Install the DLL at dll_path from the first working source.
+
+    progress(message, percent) is called as data moves; percent is -1 when
+    the total size is unknown.
+    """
+    expected = pinned_digest(dll_path, sha256)
+    errors = []
+    for source in sources or default_sources():
+        try:
+            digest = _from_source(source, dll_path, expected, progress)
+        except Exception as e:
+            print(f"LHM source {source} failed: {e}")
+            errors.append(f"{source}: {e}")
+            continue
+        if expected is None:
+            _record_digest(dll_path, digest)
+        print(f"Installed {LHM_DLL_NAME} from {source} (sha256 {digest}).")
+        return dll_path
+    raise ProvisionError("could not provision LibreHardwareMonitorLib.dll; " + "; ".join(errors))
+
+
+def ensure_lhm_dll(dll_path, sources=None, sha256=None, progress=None):
+    """dll_path once it holds a DLL with the pinned digest, provisioning it when missing.
+
+    Raises ProvisionError for a DLL that does not match, which is then never loaded.
+    """
+    if not os.path.exists(dll_path):
+        print("DLL not found, provisioning...")
+        return provision_lhm_dll(dll_path, sources, sha256, progress)
+    expected = pinned_digest(dll_path, sha256)
+    digest = file_digest(dll_path)
+    if expected is None:
+        print(f"{LHM_DLL_NAME} has sha256 {digest}.")
+        _record_digest(dll_path, digest)
+    elif digest != expected:
+        raise ProvisionError(f"{dll_path} does not match the expected digest (got {digest}, expected "
+                             f"{expected}); delete it to download it again")
+    return dll_path
@@ -0,0 +1,117 @@
+"""Temperature ranges edited in the Auto curve dialog.
+
+The rows of the curve editor cover LOWEST..HIGHEST°C without gaps. Each row
+is at least one degree wide (min == max is a one-degree range). The bounds
+and speeds live in flat arrays indexed by row, and an edit returns the span of
+rows it changed, so the dialog only touches those widgets:
+
+    first, last = model.set_high(3, 62)   # rows 3..last moved
+"""
+from array import array
+
+LOWEST, HIGHEST = 0, 100
+
+
+class RangeModel:
+    def __init__(self, rules):
+        self.lows = array('i', (r["min"] for r in rules))
+        self.highs = array('i', (r["max"] for r in rules))
+        self.speeds = array('i', (r["speed"] for r in rules))
+
+    def __len__(self):
+        return len(self.lows)
+
+    def full(self):
+        """True when no row can be added without going below one degree per row."""
+        return len(self) >= HIGHEST - LOWEST + 1
+
+    def set_high(self, i, value):
+        """Move row i's max and push the rows after it. Returns the (first, last) rows changed."""
+        lows, highs = self.lows, self.highs
+        n = len(lows)
+        # The last row always ends at HIGHEST; the rows after i need a degree each
+        value = HIGHEST if i == n - 1 else max(lows[i], min(value, HIGHEST - (n - 1 - i)))
+        if value == highs[i]:
+            return i, i - 1
+        highs[i] = value
+        j = i + 1
+        # Magnetic: the next row starts right after, pushing on only while rows get squeezed
+        while j < n and lows[j] != highs[j - 1] + 1:
+            lows[j] = highs[j - 1] + 1
+            if highs[j] >= lows[j]:
+                j += 1
+                break
+            highs[j] = lows[j]
+            j += 1
+        return i, j - 1
+
+    def set_low(self, i, value):
+        """Move row i's min and push the rows before it. Returns the (first, last) rows changed."""
+        lows, highs = self.lows, self.highs
+        value = LOWEST if i == 0 else min(highs[i], max(value, LOWEST + i))
+        if value == lows[i]:
+            return i, i - 1
+        lows[i] = value
+        j = i - 1
+        while j >= 0 and highs[j] != lows[j + 1] - 1:
+            highs[j] = lows[j + 1] - 1
+            if lows[j] <= highs[j]:
+                j -= 1
+                break
+            lows[j] = highs[j]
+            j -= 1
+        return j + 1, i
+
+    def set_speed(self, i, speed):
+        self.speeds[i] = speed
+
+    def append(self, speed=50):
+        """Add a row at the top, taking two degrees from the rows below. Returns the rows changed."""
+        if self.full():
+            raise ValueError("every row already covers a single degree")
+        # Placeholder min above the range, so set_low() always moves it into place
+        self.lows.append(HIGHEST + 1)
+        self.highs.append(HIGHEST)
+        self.speeds.append(speed)
+        return self.set_low(len(self) - 1, HIGHEST - 1)
+
+    def remove(self, i):
+        del self.lows[i]
+        del self.highs[i]
+        del self.speeds[i]
+        return self.renormalize()
+
+    def renormalize(self):
+        """Make the rows contiguous over LOWEST..HIGHEST, keeping their widths in proportion.
+
+        Every row keeps its one degree; the remaining degrees are shared out in
+        proportion to each row's extra width, by largest remainder. Returns the
+        (first, last) rows changed.
+        """
+        n = len(self)
+        if not n:
+            return 0, -1
+        extras = [max(high - low, 0) for low, high in zip(self.lows, self.highs)]
+        spare = HIGHEST - LOWEST + 1 - n
+        total = sum(extras)
+        if total == 0:
+            extras = [1] * n
+            total = n
+        shares = [e * spare / total for e in extras]
+        widths = [1 + int(share) for share in shares]
+        leftover = spare - (sum(widths) - n)
+        for k in sorted(range(n), key=lambda k: int(shares[k]) - shares[k])[:leftover]:
+            widths[k] += 1
+        first, last = n, -1
+        low = LOWEST
+        for k, width in enumerate(widths):
+            high = low + width - 1
+            if self.lows[k] != low or self.highs[k] != high:
+                self.lows[k], self.highs[k] = low, high
+                first, last = min(first, k), k
+            low = high + 1
+        return first, last
+
+    def rules(self):
+        return [{"min": low, "max": high, "speed": speed}
+                for low, high, speed in zip(self.lows, self.highs, self.speeds)]
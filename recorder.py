@@ -0,0 +1,298 @@
+"""On-disk telemetry log that survives restarts.
+
+Samples and fan commands are packed into fixed-width 18-byte records:
+
+    time     float64  wall clock (time.time())
+    kind     uint8    KIND_SAMPLE or KIND_COMMAND
+    (pad)
+    cpu/gpu temperature  int16  centi-°C, MISSING_TEMP when unknown
+    cpu/gpu command      int8   fan %, MISSING_FAN when not part of the record
+    cpu/gpu read-back    int8   fan %, MISSING_FAN when unknown
+
+TelemetryRecorder only packs the record on the caller's thread and appends
+it to an in-memory queue; a background thread writes the queue out in
+batches and rotates files by size, keeping the newest `max_files`.
+Each file starts with an 8-byte header (magic, version, record size).
+
+The reader memory-maps the files and bisects on the time column for range
+queries. Export to CSV from the command line:
+
+    python recorder.py export telemetry/ history.csv --since 2024-05-01T20:00
+"""
+import argparse
+import bisect
+import csv
+import glob
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+MAGIC = b"NSTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<dBxhhbbbb")
+KIND_SAMPLE = 0
+KIND_COMMAND = 1
+MISSING_TEMP = -32768
+MISSING_FAN = -1
+FILE_PATTERN = "telemetry-*.bin"
+CSV_COLUMNS = ("time", "kind", "cpu_temp", "gpu_temp", "cpu_cmd", "gpu_cmd", "cpu_read", "gpu_read")
+
+
+def _temp(value):
+    return MISSING_TEMP if value is None else max(-32767, min(32767, round(value * 100)))
+
+
+def _fan(value):
+    return MISSING_FAN if value is None or value < 0 else min(100, int(value))
+
+
+def pack_sample(t, cpu_temp=None, gpu_temp=None, cpu_cmd=None, gpu_cmd=None, cpu_read=None, gpu_read=None):
+    return RECORD.pack(t, KIND_SAMPLE, _temp(cpu_temp), _temp(gpu_temp),
+                       _fan(cpu_cmd), _fan(gpu_cmd), _fan(cpu_read), _fan(gpu_read))
+
+
+def pack_command(t, fan_type, percent):
+    cpu, gpu = (percent, None) if fan_type == "cpu" else (None, percent)
+    return RECORD.pack(t, KIND_COMMAND, MISSING_TEMP, MISSING_TEMP,
+                       _fan(cpu), _fan(gpu), MISSING_FAN, MISSING_FAN)
+
+
+def unpack(record):
+    t, kind, cpu_temp, gpu_temp, cpu_cmd, gpu_cmd, cpu_read, gpu_read = record
+    temps = [None if v == MISSING_TEMP else v / 100.0 for v in (cpu_temp, gpu_temp)]
+    fans = [None if v == MISSING_FAN else v for v in (cpu_cmd, gpu_cmd, cpu_read, gpu_read)]
+    return (t, "sample" if kind == KIND_SAMPLE else "command", *temps, *fans)
+
+
+class TelemetryRecorder:
+    BATCH = 4096  # queued records that wake the writer before flush_interval
+
+    def __init__(self, directory, max_bytes=4 * 1024 * 1024, max_files=8, flush_interval=2.0,
+                 max_pending=65536):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.dropped = 0
+        self.written = 0
+        self._file = None
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="telemetry-recorder", daemon=True)
+        self._thread.start()
+
+    def _put(self, record):
+        # deque.append is atomic; the hot loop never touches the file
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append(record)
+        if len(self.pending) == self.BATCH:
+            self._wake.set()
+
+    def record_sample(self, t, **values):
+        self._put(pack_sample(t, **values))
+
+    def record_command(self, t, fan_type, percent):
+        self._put(pack_command(t, fan_type, percent))
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        # The counter keeps names unique and sortable within one second; it
+        # continues past the newest file so a name freed by pruning is not reused
+        prefix = os.path.join(self.directory, f"telemetry-{stamp}-")
+        taken = [path for path in log_files(self.directory) if path.startswith(prefix)]
+        n = int(taken[-1][len(prefix):-4]) + 1 if taken else 0
+        path = f"{prefix}{n:03d}.bin"
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        for old in log_files(self.directory)[:-self.max_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _drain(self):
+        records = []
+        while self.pending:
+            records.append(self.pending.popleft())
+        if not records:
+            return
+        try:
+            while records:
+                if self._file is None or self._file.tell() + RECORD.size > self.max_bytes:
+                    if self._file is not None:
+                        self._file.close()
+                    self._open()
+                room = max(1, (self.max_bytes - self._file.tell()) // RECORD.size)
+                chunk, records = records[:room], records[room:]
+                self._file.write(b"".join(chunk))
+                self.written += len(chunk)
+            self._file.flush()
+        except OSError as e:
+            self.dropped += len(records)
+            print(f"Telemetry recording failed: {e}")
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+
+    def flush(self):
+        self._wake.set()
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+
+
+def recorder_from_config(config, app_dir):
+    """The recorder configured in config.json, None when recording is off."""
+    if not config.get("record_telemetry", True):
+        return None
+    directory = config.get("record_dir") or os.path.join(app_dir, "telemetry")
+    return TelemetryRecorder(directory,
+                             max_bytes=int(config.get("record_max_mb", 4) * 1024 * 1024),
+                             max_files=config.get("record_max_files", 8))
+
+
+def recorded(write_fans, recorder):
+    """write_fans(speeds) that also records each fan written successfully as a command."""
+    if recorder is None:
+        return write_fans
+
+    def write(speeds):
+        results = write_fans(speeds)
+        now = time.time()
+        for fan_type, (ok, _) in results.items():
+            if ok:
+                recorder.record_command(now, fan_type, speeds[fan_type])
+        return results
+    return write
+
+
+def log_files(directory):
+    # Timestamped names sort chronologically
+    return sorted(glob.glob(os.path.join(directory, FILE_PATTERN)))
+
+
+class TelemetryLog:
+    """Read-only, memory-mapped view of one recorder file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if len(self.map) < HEADER.size:
+            self.count = 0
+            return
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a telemetry log")
+        # A torn final record after a crash is ignored
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def time_at(self, i):
+        return struct.unpack_from("<d", self.map, HEADER.size + i * RECORD.size)[0]
+
+    def index(self, t):
+        """First record at or after t."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, start=None, end=None):
+        first = 0 if start is None else self.index(start)
+        last = self.count if end is None else self.index(end)
+        for i in range(first, last):
+            yield unpack(RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size))
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+
+def read_range(directory, start=None, end=None):
+    """Decoded records from every log in `directory` with start <= time < end."""
+    paths = log_files(directory)
+    logs = []
+    for path in paths:
+        try:
+            logs.append(TelemetryLog(path))
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+    try:
+        # Skip whole files outside the range using their first timestamps
+        firsts = [log.time_at(0) if len(log) else float("inf") for log in logs]
+        begin = max(bisect.bisect_right(firsts, start) - 1, 0) if start is not None else 0
+        for log in logs[begin:]:
+            if end is not None and len(log) and log.time_at(0) >= end:
+                break
+            yield from log.records(start, end)
+    finally:
+        for log in logs:
+            log.close()
+
+
+def export_csv(directory, out, start=None, end=None):
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+    for record in read_range(directory, start, end):
+        writer.writerow(["" if v is None else v for v in record])
+        count += 1
+    return count
+
+
+def _timestamp(text):
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NitroSensual telemetry log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write records as CSV")
+    export.add_argument("directory")
+    export.add_argument("output", nargs="?", help="CSV file (default: stdout)")
+    export.add_argument("--since", type=_timestamp, help="ISO date/time or Unix time")
+    export.add_argument("--until", type=_timestamp, help="ISO date/time or Unix time")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, "w", newline="") as out:
+            count = export_csv(args.directory, out, args.since, args.until)
+    else:
+        count = export_csv(args.directory, sys.stdout, args.since, args.until)
+    print(f"Exported {count} records in {time.perf_counter() - started:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
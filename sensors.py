@@ -0,0 +1,134 @@
+"""Per-fan temperature inputs aggregated over many sensors.
+
+Sensors are named "<kind>/<sensor name>" in lower case, for example
+"cpu/cpu package", "cpu/cpu core #3", "gpu/gpu hot spot" or
+"storage/composite temperature". Each fan's input in config.json selects
+sensors with "<kind>/<substring>" patterns ("*" matches any kind, an empty
+substring any name) and combines them:
+
+    "fan_inputs": {
+        "cpu": {"sensors": ["cpu/package"], "method": "max"},
+        "gpu": {"sensors": ["gpu/core", "gpu/hot spot"], "method": "mean", "weights": [3, 1]},
+    }
+
+method is "max", "mean" (optionally weighted per pattern) or "percentile"
+(with "percentile": 0-100). Patterns are resolved to sensor indices once per
+discovery; each poll then only gathers those slots from the sweep array, with
+one itemgetter call, and reduces them with the builtins. A sensor that did
+not report (NaN in the sweep) is left out, so a sleeping GPU only removes its
+own samples.
+"""
+import math
+import operator
+from array import array
+
+DEFAULT_FAN_INPUTS = {
+    "cpu": {"sensors": ["cpu/package"], "method": "max"},
+    "gpu": {"sensors": ["gpu/core"], "method": "max"},
+}
+METHODS = ("max", "mean", "percentile")
+
+
+def sensor_kind(hardware_type):
+    """Short kind for an LHM HardwareType name: GpuNvidia -> gpu, Storage -> storage."""
+    kind = str(hardware_type).lower()
+    return "gpu" if kind.startswith("gpu") else kind
+
+
+def matches(pattern, name):
+    kind, _, needle = pattern.lower().partition("/")
+    sensor_kind_, _, sensor_name = name.partition("/")
+    return kind in ("*", sensor_kind_) and needle in sensor_name
+
+
+def _gather(indices):
+    """f(values) -> tuple of values at indices, gathered in one C call."""
+    if len(indices) == 1:
+        i = indices[0]
+        return lambda values: (values[i],)
+    if not indices:
+        return lambda values: ()
+    return operator.itemgetter(*indices)
+
+
+class FanInput:
+    def __init__(self, spec):
+        self.patterns = list(spec.get("sensors") or [])
+        self.method = spec.get("method", "max")
+        if self.method not in METHODS:
+            raise ValueError(f"unknown aggregation {self.method!r}, expected one of {', '.join(METHODS)}")
+        weights = spec.get("weights")
+        self.pattern_weights = list(weights) if weights else [1.0] * len(self.patterns)
+        if len(self.pattern_weights) != len(self.patterns):
+            raise ValueError("weights must have one entry per sensor pattern")
+        self.percentile = float(spec.get("percentile", 90))
+        self.indices = array("i")
+        self.weights = array("d")
+        self._gather = _gather(self.indices)
+
+    def resolve(self, names):
+        """Map patterns to sensor slots; a sensor matched by several patterns counts once."""
+        self.indices = array("i")
+        self.weights = array("d")
+        for i, name in enumerate(names):
+            for pattern, weight in zip(self.patterns, self.pattern_weights):
+                if matches(pattern, name):
+                    self.indices.append(i)
+                    self.weights.append(weight)
+                    break
+        self._gather = _gather(self.indices)
+
+    def __call__(self, values):
+        samples = self._gather(values)
+        # NaN is the one value not equal to itself
+        temps = [t for t in samples if t == t]
+        if not temps:
+            return None
+        if self.method == "max":
+            return max(temps)
+        if self.method == "mean":
+            weights = self.weights
+            if len(temps) < len(samples):
+                weights = [w for t, w in zip(samples, weights) if t == t]
+            total = sum(weights)
+            return sum(map(operator.mul, temps, weights)) / total if total else None
+        temps.sort()
+        # Nearest rank
+        rank = max(1, math.ceil(self.percentile / 100.0 * len(temps)))
+        return temps[rank - 1]
+
+
+def checked_fan_inputs(fan_inputs):
+    """fan_inputs from config.json, or None (the defaults) when it does not compile."""
+    try:
+        SensorMap(fan_inputs)
+    except (ValueError, TypeError, AttributeError) as e:
+        print(f"Ignoring fan_inputs in config.json: {e}")
+        return None
+    return fan_inputs
+
+
+class SensorMap:
+    """Compiled fan_inputs for both fans."""
+
+    def __init__(self, fan_inputs=None):
+        specs = dict(DEFAULT_FAN_INPUTS, **(fan_inputs or {}))
+        self.inputs = {fan_type: FanInput(spec) for fan_type, spec in specs.items()}
+        self.names = []
+
+    def resolve(self, names):
+        self.names = list(names)
+        for fan_input in self.inputs.values():
+            fan_input.resolve(self.names)
+
+    def lost(self, values):
+        """True when every sensor behind some fan input stopped reporting."""
+        return any(fan_input.indices and not any(t == t for t in fan_input._gather(values))
+                   for fan_input in self.inputs.values())
+
+    def aggregate(self, values):
+        """(cpu_temp, gpu_temp) from one sweep."""
+        return self.inputs["cpu"](values), self.inputs["gpu"](values)
+
+    def selected(self, fan_type):
+        return [self.names[i] for i in self.inputs[fan_type].indices]
@@ -0,0 +1,233 @@
+"""Replay temperature traces through the fan control loop faster than real time.
+
+The same FanController and FanWriteScheduler the window and the daemon use
+decide and write fan speeds, on a virtual clock taken from the trace. A
+trace is either replayed as recorded (the fans do not change it) or
+produced in closed loop by the thermal model, sampled by the adaptive
+poller:
+
+    python simulate.py                               # 1 h synthetic trace
+    python simulate.py --trace history.csv           # CSV: time,cpu_temp,gpu_temp
+    python simulate.py --log telemetry/              # recorder logs
+    python simulate.py --model game --hours 100      # closed loop
+    python simulate.py --config tuned.json --json    # alternative curve, JSON report
+    python simulate.py --model game --mode Auto Target   # modes compared on the same trace
+
+--max-writes-per-hour and --max-peak turn the run into a check that exits
+with status 1, for CI.
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+
+from config import DEFAULT_CONFIG, load_config
+from controller import MODES, FanController
+from fanwriter import FanWriteScheduler
+from hardware import FAN_TYPES, ThermalModel, default_load
+from polling import AdaptivePoller
+
+
+def desktop_load(t):
+    # Mostly idle with a 30 second burst (build, page load) every 5 minutes
+    if t % 300.0 < 30.0:
+        return 0.8, 0.2
+    return 0.1, 0.05
+
+
+LOADS = {"game": default_load, "desktop": desktop_load}
+
+
+def synthetic_trace(seconds=3600, step=2.0, center=60.0, seed=1):
+    rng = random.Random(seed)
+    t = 0.0
+    while t < seconds:
+        wobble = 1.5 * math.sin(t / 20.0)
+        yield t, center + wobble + rng.gauss(0, 0.4), center - 5 + wobble + rng.gauss(0, 0.4)
+        t += step
+
+
+def read_trace(path):
+    """time,cpu_temp,gpu_temp rows; `recorder.py export` output works as is."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("kind", "sample") != "sample":
+                continue
+            yield (float(row["time"]),
+                   float(row["cpu_temp"]) if row["cpu_temp"] else None,
+                   float(row["gpu_temp"]) if row["gpu_temp"] else None)
+
+
+def read_log(directory, start=None, end=None):
+    from recorder import read_range
+    for t, kind, cpu_temp, gpu_temp, *_ in read_range(directory, start, end):
+        if kind == "sample":
+            yield t, cpu_temp, gpu_temp
+
+
+class ModelTrace:
+    """Closed-loop trace: ThermalModel temperatures sampled by an AdaptivePoller."""
+
+    def __init__(self, seconds, load=default_load, poller=None, seed=1):
+        self.seconds = seconds
+        self.model = ThermalModel(load=load, seed=seed)
+        self.poller = poller or AdaptivePoller()
+
+    def set_fan(self, fan_type, percent):
+        self.model.set_fan(fan_type, percent)
+
+    def __iter__(self):
+        t = 0.0
+        while t < self.seconds:
+            temps = self.model.read()
+            yield (t, *temps)
+            interval = self.poller.next_interval(temps, t)
+            self.model.advance(interval)
+            t += interval
+
+
+def simulate(trace, config):
+    """Drive the control loop over `trace` and return the report dict."""
+    controller = FanController(config)
+    if isinstance(trace, ModelTrace):
+        trace.poller.set_breakpoints(controller.breakpoints())
+    now = [0.0]
+    applied = {}
+
+    def write(speeds):
+        for fan_type, percent in speeds.items():
+            applied[fan_type] = percent
+            if isinstance(trace, ModelTrace):
+                trace.set_fan(fan_type, percent)
+        return {fan_type: (True, None) for fan_type in speeds}
+
+    writer = FanWriteScheduler(
+        write,
+        window=config.get("write_coalesce_ms", 200) / 1000.0,
+        min_interval=config.get("write_min_interval_ms", 500) / 1000.0,
+        clock=lambda: now[0],
+    )
+    time_at_speed = {fan_type: Counter() for fan_type in FAN_TYPES}
+    peaks = {fan_type: None for fan_type in FAN_TYPES}
+    decision_times = []
+    first = last = None
+    started = time.perf_counter()
+    for t, cpu_temp, gpu_temp in trace:
+        if last is not None:
+            for fan_type, percent in applied.items():
+                time_at_speed[fan_type][percent] += t - last
+        else:
+            first = t
+        now[0] = last = t
+        for fan_type, temp in (("cpu", cpu_temp), ("gpu", gpu_temp)):
+            if temp is not None and (peaks[fan_type] is None or temp > peaks[fan_type]):
+                peaks[fan_type] = temp
+        tick = time.perf_counter()
+        for fan_type, percent in controller.target_speeds(cpu_temp, gpu_temp, t).items():
+            writer.request(fan_type, percent)
+        writer.flush()
+        decision_times.append(time.perf_counter() - tick)
+    wall = time.perf_counter() - started
+
+    duration = (last - first) if decision_times else 0.0
+    hours = duration / 3600.0
+    decision_times.sort()
+    stats = writer.stats()
+    return {
+        "mode": controller.mode,
+        "samples": len(decision_times),
+        "simulated_hours": hours,
+        "wall_seconds": wall,
+        "speedup": duration / wall if wall else 0.0,
+        "writes": stats["written"],
+        "writes_per_hour": stats["written"] / hours if hours else 0.0,
+        "suppressed": stats["suppressed"],
+        "peak_temp": peaks,
+        "time_at_speed": {
+            fan_type: {str(speed): seconds / duration for speed, seconds in sorted(counter.items())}
+            for fan_type, counter in time_at_speed.items()
+        } if duration else {},
+        "decision_us_mean": 1e6 * sum(decision_times) / len(decision_times) if decision_times else 0.0,
+        "decision_us_p99": 1e6 * decision_times[int(0.99 * (len(decision_times) - 1))] if decision_times else 0.0,
+    }
+
+
+def format_report(report):
+    peak = {fan_type: f"{temp:.1f}°C" if temp is not None else "?" for fan_type, temp in report["peak_temp"].items()}
+    lines = [
+        f"{report['mode']} mode, {report['samples']} samples, {report['simulated_hours']:.1f} h simulated "
+        f"in {report['wall_seconds']:.2f} s ({report['speedup']:.0f}x real time)",
+        f"fan writes      {report['writes']} ({report['writes_per_hour']:.1f}/hour, "
+        f"{report['suppressed']} suppressed)",
+        f"peak temp       cpu {peak['cpu']}  gpu {peak['gpu']}",
+        f"decision time   {report['decision_us_mean']:.1f} µs mean, {report['decision_us_p99']:.1f} µs p99",
+    ]
+    for fan_type, shares in report["time_at_speed"].items():
+        spread = "  ".join(f"{speed}%:{100 * share:.0f}%" for speed, share in shares.items() if share >= 0.005)
+        lines.append(f"{fan_type} time at speed  {spread}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="CSV with time,cpu_temp,gpu_temp columns")
+    source.add_argument("--log", help="directory of recorder logs")
+    source.add_argument("--model", choices=LOADS, help="closed loop against the thermal model with this load")
+    parser.add_argument("--hours", type=float, default=1.0, help="length of synthetic and model traces")
+    parser.add_argument("--config", help="config.json to take the curve and options from (default: defaults)")
+    parser.add_argument("--current-config", action="store_true", help="use the app's own config.json")
+    parser.add_argument("--mode", choices=MODES, nargs="+", default=["Auto"],
+                        help="one or more modes, each run on the same trace")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-writes-per-hour", type=float, help="fail above this many fan writes per hour")
+    parser.add_argument("--max-peak", type=float, help="fail when a temperature peak exceeds this (°C)")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        with open(args.config) as f:
+            config = dict(DEFAULT_CONFIG, **json.load(f))
+    elif args.current_config:
+        config = load_config()
+    else:
+        config = dict(DEFAULT_CONFIG)
+
+    def make_trace():
+        if args.trace:
+            return read_trace(args.trace)
+        if args.log:
+            return read_log(args.log)
+        if args.model:
+            return ModelTrace(
+                args.hours * 3600.0, load=LOADS[args.model],
+                poller=AdaptivePoller(min_interval=config["poll_min_interval"],
+                                      max_interval=config["poll_max_interval"],
+                                      latency_target=config["poll_latency_target"]),
+            )
+        return synthetic_trace(seconds=args.hours * 3600.0)
+
+    reports = [simulate(make_trace(), dict(config, mode=mode)) for mode in args.mode]
+    if args.json:
+        print(json.dumps(reports[0] if len(reports) == 1 else reports, indent=2))
+    else:
+        print("\n\n".join(format_report(report) for report in reports))
+
+    failed = False
+    for report in reports:
+        if args.max_writes_per_hour is not None and report["writes_per_hour"] > args.max_writes_per_hour:
+            print(f"FAIL: {report['mode']}: {report['writes_per_hour']:.1f} writes/hour exceeds "
+                  f"{args.max_writes_per_hour:g}", file=sys.stderr)
+            failed = True
+        peaks = [temp for temp in report["peak_temp"].values() if temp is not None]
+        if args.max_peak is not None and peaks and max(peaks) > args.max_peak:
+            print(f"FAIL: {report['mode']}: peak {max(peaks):.1f}°C exceeds {args.max_peak:g}°C", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
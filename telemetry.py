@@ -0,0 +1,196 @@
+"""In-memory telemetry history.
+
+TelemetryBuffer is a fixed-capacity ring of preallocated `array('d')`
+columns: one for sample times and one per FIELDS entry. Appending overwrites
+slots in place, so recording never allocates and memory stays at
+capacity * 8 bytes per column however long the app runs. Missing readings
+are stored as NaN.
+
+Rolling statistics over the last N seconds find the window start with a
+bisect on the time column and reduce the (at most two) contiguous slices
+with C-level builtins, so they cost O(log n + window). Results are cached
+until the next append, so the controller and the UI can ask for the same
+numbers within a tick for free.
+
+DecimatedHistory feeds the window's chart. It keeps the min and max of each
+series per time bucket, for spans of up to a day.
+"""
+import math
+import operator
+from array import array
+
+FIELDS = ("cpu_temp", "gpu_temp", "cpu_cmd", "gpu_cmd", "cpu_read", "gpu_read")
+NAN = float("nan")
+
+
+def _value(value):
+    return NAN if value is None else float(value)
+
+
+class TelemetryBuffer:
+    def __init__(self, capacity=7200):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self.times = array("d", [NAN]) * capacity
+        self.columns = {field: array("d", [NAN]) * capacity for field in FIELDS}
+        self.head = 0   # slot the next sample goes to
+        self.count = 0
+        self._cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def append(self, now, **values):
+        """Record one sample taken at `now`; fields left out are stored as missing."""
+        if self.count and now < self.times[self.head - 1]:
+            raise ValueError("telemetry samples must be appended in time order")
+        head = self.head
+        self.times[head] = now
+        for field, column in self.columns.items():
+            column[head] = _value(values.get(field))
+        self.head = (head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self._cache.clear()
+
+    def _slot(self, i):
+        # Logical index 0 is the oldest sample still held
+        return (self.head - self.count + i) % self.capacity
+
+    def latest(self, field):
+        if not self.count:
+            return None
+        value = self.columns[field][self._slot(self.count - 1)]
+        return None if math.isnan(value) else value
+
+    def _first_since(self, since):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self._slot(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slices(self, column, start):
+        # Logical [start, count) as at most two contiguous physical slices
+        first = self._slot(start)
+        length = self.count - start
+        if first + length <= self.capacity:
+            return [column[first:first + length]]
+        return [column[first:], column[:first + length - self.capacity]]
+
+    def window(self, field, seconds):
+        """(times, values) arrays for the last `seconds` before the newest sample."""
+        if not self.count:
+            return array("d"), array("d")
+        start = self._first_since(self.times[self._slot(self.count - 1)] - seconds)
+        times = array("d")
+        values = array("d")
+        for chunk in self._slices(self.times, start):
+            times.extend(chunk)
+        for chunk in self._slices(self.columns[field], start):
+            values.extend(chunk)
+        return times, values
+
+    def stats(self, field, seconds, threshold=None):
+        """min, max, mean, slope (per second) and time above `threshold` over a window.
+
+        Samples are held until the next one when summing time above the
+        threshold. Values are None when the window has no valid samples.
+        """
+        key = (field, seconds, threshold)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        times, values = self.window(field, seconds)
+        valid = [(t, v) for t, v in zip(times, values) if v == v]
+        result = {"count": len(valid), "min": None, "max": None, "mean": None, "slope": None,
+                  "time_above": 0.0}
+        if valid:
+            ts, vs = zip(*valid)
+            n = len(vs)
+            result["min"] = min(vs)
+            result["max"] = max(vs)
+            result["mean"] = sum(vs) / n
+            if n > 1:
+                t_mean = sum(ts) / n
+                dts = [t - t_mean for t in ts]
+                denom = sum(map(operator.mul, dts, dts))
+                if denom > 0:
+                    result["slope"] = sum(map(operator.mul, dts, vs)) / denom
+            if threshold is not None:
+                result["time_above"] = sum(t1 - t0 for t0, t1, v in zip(ts, ts[1:], vs) if v > threshold)
+        self._cache[key] = result
+        return result
+
+
+CHART_FIELDS = ("cpu_temp", "gpu_temp", "cpu_cmd", "gpu_cmd")
+CHART_WINDOWS = {"1 min": 60, "10 min": 600, "1 h": 3600, "6 h": 6 * 3600, "24 h": 24 * 3600}
+CHART_COLUMNS = 360  # buckets per window, about one per pixel of the chart at the default size
+
+
+class _Buckets:
+    """A ring of `columns` time buckets holding the min and max of each field."""
+
+    def __init__(self, span, columns, fields):
+        self.span = span
+        self.columns = columns
+        self.newest = None  # bucket number (time // span) of the newest sample
+        self.mins = {field: array("d", [NAN]) * columns for field in fields}
+        self.maxs = {field: array("d", [NAN]) * columns for field in fields}
+
+    def add(self, now, values):
+        bucket = int(now // self.span)
+        if self.newest is None or bucket > self.newest:
+            # Empty the buckets skipped since the last sample, at most the whole ring
+            first = bucket - self.columns + 1 if self.newest is None else max(self.newest + 1, bucket - self.columns + 1)
+            for b in range(first, bucket + 1):
+                slot = b % self.columns
+                for column in self.mins.values():
+                    column[slot] = NAN
+                for column in self.maxs.values():
+                    column[slot] = NAN
+            self.newest = bucket
+        slot = self.newest % self.columns
+        for field, value in values.items():
+            if value != value:
+                continue
+            low = self.mins[field][slot]
+            if not value >= low:  # also true when low is NaN
+                self.mins[field][slot] = value
+            high = self.maxs[field][slot]
+            if not value <= high:
+                self.maxs[field][slot] = value
+
+    def get(self, field, bucket):
+        """(min, max) of `field` in a bucket, NaN when it holds no samples."""
+        if self.newest is None or not self.newest - self.columns < bucket <= self.newest:
+            return NAN, NAN
+        slot = bucket % self.columns
+        return self.mins[field][slot], self.maxs[field][slot]
+
+
+class DecimatedHistory:
+    """History for charts, already reduced to min/max per time bucket.
+
+    Every window in CHART_WINDOWS keeps CHART_COLUMNS buckets, so a sample
+    costs the same small, fixed amount of work, and so does drawing any
+    window. Both stay flat however long the app runs. Each bucket keeps the
+    min and max of each field. A chart that draws the span between them
+    keeps the spikes that averaging or picking every n-th sample would lose.
+    """
+
+    def __init__(self, windows=CHART_WINDOWS, columns=CHART_COLUMNS, fields=CHART_FIELDS):
+        self.fields = fields
+        self.columns = columns
+        self.windows = {name: _Buckets(seconds / columns, columns, fields) for name, seconds in windows.items()}
+
+    def append(self, now, **values):
+        picked = {field: _value(values.get(field)) for field in self.fields}
+        for buckets in self.windows.values():
+            buckets.add(now, picked)
+
+    def __getitem__(self, window):
+        return self.windows[window]
@@ -0,0 +1,110 @@
+"""The local API refuses requests a web page could make and checks command bodies."""
+import http.client
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import ApiServer, CommandError, validate_command  # noqa: E402
+
+
+class ApiRequestOriginTest(unittest.TestCase):
+    def setUp(self):
+        self.commands = []
+
+        def sink(command, future):
+            self.commands.append(command)
+            future.set_result({"ok": True})
+
+        self.server = ApiServer(sink, port=0).start()
+        self.port = self.server.address[1]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def post(self, path, body, headers):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.request("POST", path, json.dumps(body), headers)
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    def test_json_post_is_applied(self):
+        status = self.post("/mode", {"mode": "Max"}, {"Content-Type": "application/json"})
+        self.assertEqual(status, 200)
+        self.assertEqual(self.commands, [{"command": "mode", "mode": "Max"}])
+
+    def test_text_plain_post_is_refused(self):
+        # What a cross-site <form> or fetch() without preflight can send
+        status = self.post("/mode", {"mode": "Max"}, {"Content-Type": "text/plain"})
+        self.assertGreaterEqual(status, 400)
+        self.assertLess(status, 500)
+        self.assertEqual(self.commands, [])
+
+    def test_foreign_origin_is_refused(self):
+        status = self.post("/mode", {"mode": "Max"},
+                           {"Content-Type": "application/json", "Origin": "https://example.com"})
+        self.assertGreaterEqual(status, 400)
+        self.assertLess(status, 500)
+        self.assertEqual(self.commands, [])
+
+    def test_foreign_host_is_refused(self):
+        # DNS rebinding: the page's own host name resolving to 127.0.0.1
+        status = self.post("/mode", {"mode": "Max"},
+                           {"Content-Type": "application/json", "Host": f"attacker.example:{self.port}"})
+        self.assertGreaterEqual(status, 400)
+        self.assertLess(status, 500)
+        self.assertEqual(self.commands, [])
+
+    def test_malformed_content_length_is_a_bad_request(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.putrequest("POST", "/mode")
+            conn.putheader("Content-Type", "application/json")
+            conn.putheader("Content-Length", "abc")
+            conn.endheaders()
+            self.assertEqual(conn.getresponse().status, 400)
+        finally:
+            conn.close()
+        self.assertEqual(self.commands, [])
+
+
+class ValidateCommandTest(unittest.TestCase):
+    def test_fraction_for_whole_number_option_is_refused(self):
+        rules = [{"min": 0, "max": 100, "speed": 50}]
+        for key in ("auto_hysteresis", "auto_min_dwell"):
+            with self.assertRaises(CommandError):
+                validate_command("/curve", {"rules": rules, key: 1.5})
+        with self.assertRaises(CommandError):
+            validate_command("/target", {"target_deadband": 2.5})
+
+    def test_curve_as_the_editor_makes_it_passes(self):
+        rules = [{"min": 0, "max": 49, "speed": 20}, {"min": 50, "max": 100, "speed": 80}]
+        self.assertEqual(validate_command("/curve", {"rules": rules})["rules"], rules)
+
+    def test_malformed_curves_are_refused(self):
+        for rules in (
+            [{"min": 0, "max": 100.5, "speed": 50}],                                  # not an int
+            [{"min": "0", "max": 100, "speed": 50}],                                  # not an int
+            [{"min": 0, "max": 120, "speed": 50}],                                    # past 100
+            [{"min": -10, "max": 100, "speed": 50}],                                  # below 0
+            [{"min": 0, "max": 100, "speed": 150}],                                   # speed past 100
+            [{"min": 50, "max": 100, "speed": 80}, {"min": 0, "max": 49, "speed": 20}],  # unsorted
+            [{"min": 0, "max": 40, "speed": 20}, {"min": 50, "max": 100, "speed": 80}],  # gap
+            [{"min": 0, "max": 60, "speed": 20}, {"min": 50, "max": 100, "speed": 80}],  # overlap
+            [{"min": 0, "max": 90, "speed": 20}],                                     # stops short of 100
+            [{"min": 60, "max": 50, "speed": 20}],                                    # max below min
+        ):
+            with self.subTest(rules=rules), self.assertRaises(CommandError):
+                validate_command("/curve", {"rules": rules})
+
+    def test_options_of_the_right_type_pass(self):
+        command = validate_command("/target", {"target_cpu": 70, "target_kp": 3})
+        self.assertEqual(command["options"], {"target_cpu": 70, "target_kp": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""AutoFanController: hysteresis and minimum dwell time in Auto mode."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fancurve import FALLBACK_SPEED, AutoFanController, FanCurve  # noqa: E402
+
+RULES = [
+    {"min": 0, "max": 49, "speed": 20},
+    {"min": 50, "max": 59, "speed": 50},
+    {"min": 60, "max": 100, "speed": 80},
+]
+
+
+class AutoFanControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.auto = AutoFanController(FanCurve(RULES), hysteresis=3, min_dwell=5)
+
+    def test_speed_follows_a_rise_at_once(self):
+        self.assertEqual(self.auto.update("cpu", 45, 0.0), 20)
+        self.assertEqual(self.auto.update("cpu", 61, 0.5), 80)
+
+    def test_hovering_on_a_breakpoint_keeps_the_higher_speed(self):
+        self.auto.update("cpu", 50, 0.0)
+        for i, temp in enumerate((49.5, 50.2, 48.0, 49.9, 47.5)):
+            self.assertEqual(self.auto.update("cpu", temp, 10.0 + i), 50)
+
+    def test_speed_drops_once_clear_of_the_hysteresis_band(self):
+        self.auto.update("cpu", 50, 0.0)
+        self.assertEqual(self.auto.update("cpu", 46.9, 10.0), 20)
+
+    def test_drop_waits_for_the_minimum_dwell(self):
+        self.auto.update("cpu", 55, 0.0)
+        self.assertEqual(self.auto.update("cpu", 30, 4.9), 50)
+        self.assertEqual(self.auto.update("cpu", 30, 5.0), 20)
+
+    def test_a_rise_restarts_the_dwell(self):
+        self.auto.update("cpu", 55, 0.0)
+        self.auto.update("cpu", 65, 4.0)
+        self.assertEqual(self.auto.update("cpu", 30, 8.0), 80)
+        self.assertEqual(self.auto.update("cpu", 30, 9.0), 20)
+
+    def test_fans_are_independent(self):
+        self.auto.update("cpu", 65, 0.0)
+        self.assertEqual(self.auto.update("gpu", 30, 0.0), 20)
+
+    def test_missing_temperature_falls_back_and_forgets_the_state(self):
+        self.auto.update("cpu", 65, 0.0)
+        self.assertEqual(self.auto.update("cpu", None, 1.0), FALLBACK_SPEED)
+        self.assertEqual(self.auto.update("cpu", 30, 1.5), 20)
+
+    def test_reset_forgets_every_fan(self):
+        self.auto.update("cpu", 65, 0.0)
+        self.auto.reset()
+        self.assertEqual(self.auto.update("cpu", 30, 0.1), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
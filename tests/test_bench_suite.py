@@ -0,0 +1,47 @@
+"""benchmarks/run.py: every case runs, and regressions are caught."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import config  # noqa: E402
+import run  # noqa: E402
+
+
+class BenchSuiteTest(unittest.TestCase):
+    def test_every_case_builds_and_runs(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # The config cases point the app's config file into the directory
+        self.addCleanup(setattr, config, "CONFIG_FILE", config.CONFIG_FILE)
+        for name, factory in run.CASES.items():
+            with self.subTest(case=name):
+                try:
+                    op = factory(directory) if factory.__code__.co_argcount else factory()
+                except ImportError as e:
+                    self.skipTest(f"{name}: {e}")
+                op()
+
+    def test_baseline_covers_every_case(self):
+        with open(run.BASELINE) as f:
+            self.assertEqual(set(json.load(f)["results"]), set(run.CASES))
+
+    def test_compare_flags_slowdowns_beyond_the_tolerance(self):
+        baseline = {"results": {"fast": {"ns_per_op": 100.0}, "slow": {"ns_per_op": 100.0},
+                                "skipped": {"ns_per_op": 100.0}}}
+        report = {"results": {"fast": {"ns_per_op": 140.0}, "slow": {"ns_per_op": 160.0},
+                              "skipped": {"skipped": "No module named 'PyQt5'"}, "new": {"ns_per_op": 5.0}}}
+        self.assertEqual(run.compare(report, baseline, 0.5), [("slow", 1.6)])
+        self.assertAlmostEqual(report["results"]["fast"]["baseline_ratio"], 1.4)
+        self.assertNotIn("baseline_ratio", report["results"]["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
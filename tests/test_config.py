@@ -0,0 +1,113 @@
+"""config.json checking and ConfigStore."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEFAULT_CONFIG, ConfigStore, normalize_config  # noqa: E402
+
+
+class NormalizeConfigTest(unittest.TestCase):
+    def test_fraction_for_whole_number_setting_is_replaced(self):
+        # auto_hysteresis feeds a QSpinBox, which raises on 1.5
+        config, problems = normalize_config({"auto_hysteresis": 1.5, "auto_min_dwell": 2.0})
+        self.assertEqual(config["auto_hysteresis"], DEFAULT_CONFIG["auto_hysteresis"])
+        self.assertEqual(config["auto_min_dwell"], DEFAULT_CONFIG["auto_min_dwell"])
+        self.assertEqual(len(problems), 2)
+
+    def test_whole_number_for_fractional_setting_is_kept(self):
+        config, problems = normalize_config({"target_kp": 3, "poll_min_interval": 1})
+        self.assertEqual((config["target_kp"], config["poll_min_interval"]), (3, 1))
+        self.assertEqual(problems, [])
+
+    def test_bool_is_not_a_number(self):
+        config, problems = normalize_config({"auto_hysteresis": True, "target_kp": False})
+        self.assertEqual(config["auto_hysteresis"], DEFAULT_CONFIG["auto_hysteresis"])
+        self.assertEqual(config["target_kp"], DEFAULT_CONFIG["target_kp"])
+        self.assertEqual(len(problems), 2)
+
+
+class ConfigStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "config.json")
+        self.now = 0.0
+        self.store = ConfigStore(self.path, delay=1.0, clock=lambda: self.now)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def on_disk(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def edit(self, **changes):
+        # Written by another program; the mtime is moved so the edit shows up
+        # even on file systems with coarse timestamps
+        config = dict(self.on_disk(), **changes)
+        with open(self.path, "w") as f:
+            json.dump(config, f, indent=2)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    def test_missing_file_is_created_with_the_defaults(self):
+        self.assertEqual(self.on_disk(), DEFAULT_CONFIG)
+        self.assertEqual(self.store.data, DEFAULT_CONFIG)
+
+    def test_burst_of_saves_is_one_write_after_the_delay(self):
+        self.store.data["custom_cpu"] = 40
+        self.store.save()
+        self.now = 0.5
+        self.store.data["custom_cpu"] = 60
+        self.store.save()  # does not push the write back
+        self.assertEqual(self.store.next_due(), 1.0)
+        self.assertFalse(self.store.flush())
+        self.assertEqual(self.on_disk()["custom_cpu"], DEFAULT_CONFIG["custom_cpu"])
+        self.now = 1.0
+        self.assertTrue(self.store.flush())
+        self.assertEqual(self.on_disk()["custom_cpu"], 60)
+        self.assertIsNone(self.store.next_due())
+
+    def test_force_writes_before_the_delay(self):
+        self.store.data["mode"] = "Max"
+        self.store.save()
+        self.assertTrue(self.store.flush(force=True))
+        self.assertEqual(self.on_disk()["mode"], "Max")
+
+    def test_unchanged_config_is_not_written(self):
+        self.store.save()
+        self.assertFalse(self.store.flush(force=True))
+
+    def test_write_leaves_no_temporary_file(self):
+        self.store.data["custom_gpu"] = 70
+        self.store.save()
+        self.store.flush(force=True)
+        self.assertEqual(os.listdir(self.dir), ["config.json"])
+
+    def test_outside_edit_is_reloaded_in_place(self):
+        data = self.store.data
+        self.edit(mode="Max", custom_cpu=80)
+        self.assertEqual(sorted(self.store.reload_if_changed()), ["custom_cpu", "mode"])
+        self.assertIs(self.store.data, data)
+        self.assertEqual((data["mode"], data["custom_cpu"]), ("Max", 80))
+        self.assertEqual(self.store.reload_if_changed(), [])
+
+    def test_own_write_is_not_reported_as_an_edit(self):
+        self.store.data["custom_cpu"] = 40
+        self.store.save()
+        self.store.flush(force=True)
+        self.assertEqual(self.store.reload_if_changed(), [])
+
+    def test_unreadable_edit_is_ignored(self):
+        with open(self.path, "w") as f:
+            f.write("{ half written")
+        self.assertEqual(self.store.reload_if_changed(), [])
+        self.assertEqual(self.store.data, DEFAULT_CONFIG)
+
+
+if __name__ == "__main__":
+    unittest.main()
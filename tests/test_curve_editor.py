@@ -0,0 +1,35 @@
+"""The curve editor keeps up with a drag at one row per degree."""
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+try:
+    import PyQt5  # noqa: F401
+except ImportError:
+    PyQt5 = None
+
+ROWS = 100  # one per degree, the finest curve the editor allows
+
+
+@unittest.skipIf(PyQt5 is None, "PyQt5 is not installed")
+class CurveEditorDragTest(unittest.TestCase):
+    def test_drag_stays_within_budget(self):
+        from bench_curve_editor import BUDGET_MS, drag, percentile_99
+
+        times, rules = drag(ROWS, passes=1)
+        self.assertEqual(len(rules), ROWS)
+        # Pushed rows keep a degree each and still cover 0..100 without gaps
+        self.assertEqual((rules[0]["min"], rules[-1]["max"]), (0, 100))
+        for before, after in zip(rules, rules[1:]):
+            self.assertEqual(before["max"] + 1, after["min"])
+        p99_ms = percentile_99(sorted(times)) * 1000
+        self.assertLessEqual(p99_ms, BUDGET_MS, f"p99 drag event took {p99_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
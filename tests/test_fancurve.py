@@ -0,0 +1,74 @@
+"""FanCurve lookups at the range edges, with and without interpolation."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fancurve import FALLBACK_SPEED, FanCurve  # noqa: E402
+
+RULES = [
+    {"min": 0, "max": 39, "speed": 0},
+    {"min": 40, "max": 59, "speed": 20},
+    {"min": 60, "max": 100, "speed": 80},
+]
+
+
+class FanCurveStepTest(unittest.TestCase):
+    def setUp(self):
+        self.curve = FanCurve(RULES)
+
+    def test_each_range_starts_at_its_min(self):
+        self.assertEqual(self.curve(39), 0)
+        self.assertEqual(self.curve(40), 20)
+        self.assertEqual(self.curve(59), 20)
+        self.assertEqual(self.curve(60), 80)
+
+    def test_temperature_between_ranges_belongs_to_the_lower_one(self):
+        self.assertEqual(self.curve(39.5), 0)
+        self.assertEqual(self.curve(59.9), 20)
+
+    def test_outside_the_curve_takes_the_end_speeds(self):
+        self.assertEqual(self.curve(-5), 0)
+        self.assertEqual(self.curve(120), 80)
+
+    def test_missing_temperature_or_curve_falls_back(self):
+        self.assertEqual(self.curve(None), FALLBACK_SPEED)
+        self.assertEqual(FanCurve([])(50), FALLBACK_SPEED)
+
+    def test_rule_order_does_not_matter(self):
+        self.assertEqual(FanCurve(list(reversed(RULES)))(45), 20)
+
+    def test_breakpoints_are_the_range_starts(self):
+        self.assertEqual(self.curve.breakpoints(), [40, 60])
+
+    def test_evaluate_many_matches_lookup(self):
+        temps = [0, 39.5, 40, 59, 60, 99.9]
+        self.assertEqual(list(self.curve.evaluate_many(temps)), [self.curve(t) for t in temps])
+
+
+class FanCurveInterpolatedTest(unittest.TestCase):
+    def setUp(self):
+        self.curve = FanCurve(RULES, interpolate=True)
+
+    def test_first_range_holds_its_speed_up_to_its_max(self):
+        self.assertEqual(self.curve(0), 0)
+        self.assertEqual(self.curve(39), 0)
+
+    def test_speed_is_reached_at_each_range_min(self):
+        self.assertEqual(self.curve(40), 20)
+        self.assertEqual(self.curve(60), 80)
+
+    def test_speed_runs_linearly_between_points(self):
+        self.assertEqual(self.curve(39.5), 10)
+        self.assertEqual(self.curve(50), 50)
+
+    def test_above_the_last_point_holds_the_last_speed(self):
+        self.assertEqual(self.curve(100), 80)
+
+    def test_breakpoints_are_the_interpolation_points(self):
+        self.assertEqual(self.curve.breakpoints(), [39, 40, 60])
+
+
+if __name__ == "__main__":
+    unittest.main()
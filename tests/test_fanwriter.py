@@ -0,0 +1,98 @@
+"""FanWriteScheduler: coalescing, deduplication and the per-fan rate limit."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanwriter import FanWriteScheduler  # noqa: E402
+
+
+class FanWriteSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.writes = []
+        self.fail = False
+        self.writer = FanWriteScheduler(self.write, window=0.2, min_interval=0.5, clock=lambda: self.now)
+
+    def write(self, speeds):
+        self.writes.append(dict(speeds))
+        return {fan_type: (not self.fail, None) for fan_type in speeds}
+
+    def advance(self, seconds):
+        self.now += seconds
+        self.writer.flush()
+
+    def test_burst_is_coalesced_into_its_latest_value(self):
+        for percent in (30, 40, 50):
+            self.writer.request("cpu", percent)
+        self.advance(0.1)
+        self.assertEqual(self.writes, [])  # still inside the window
+        self.advance(0.1)
+        self.assertEqual(self.writes, [{"cpu": 50}])
+        self.assertEqual(self.writer.counters["coalesced"], 2)
+
+    def test_both_fans_due_together_share_a_batch(self):
+        self.writer.request("cpu", 30)
+        self.writer.request("gpu", 40)
+        self.advance(0.2)
+        self.assertEqual(self.writes, [{"cpu": 30, "gpu": 40}])
+
+    def test_acknowledged_value_is_not_written_again(self):
+        self.writer.request("cpu", 30)
+        self.advance(0.2)
+        self.writer.request("cpu", 30)
+        self.advance(1.0)
+        self.assertEqual(self.writes, [{"cpu": 30}])
+        self.assertEqual(self.writer.counters["duplicate"], 1)
+
+    def test_returning_to_the_acknowledged_value_cancels_the_pending_write(self):
+        self.writer.request("cpu", 30)
+        self.advance(0.2)
+        self.writer.request("cpu", 60)
+        self.writer.request("cpu", 30)
+        self.advance(1.0)
+        self.assertEqual(self.writes, [{"cpu": 30}])
+        self.assertIsNone(self.writer.next_due())
+
+    def test_writes_to_one_fan_are_rate_limited(self):
+        self.writer.request("cpu", 30)
+        self.advance(0.2)
+        self.writer.request("cpu", 40)
+        self.assertAlmostEqual(self.writer.next_due(), 0.7)  # last write + min_interval
+        self.advance(0.2)
+        self.assertEqual(len(self.writes), 1)
+        self.advance(0.3)
+        self.assertEqual(self.writes[-1], {"cpu": 40})
+
+    def test_urgent_request_skips_window_and_rate_limit(self):
+        self.writer.request("cpu", 30)
+        self.advance(0.2)
+        self.writer.request("cpu", 100, urgent=True)
+        self.writer.flush()
+        self.assertEqual(self.writes[-1], {"cpu": 100})
+
+    def test_failed_write_is_retried_by_the_next_equal_request(self):
+        self.fail = True
+        self.writer.request("cpu", 30)
+        self.advance(0.2)
+        self.fail = False
+        self.writer.request("cpu", 30)
+        self.advance(1.0)
+        self.assertEqual(self.writes, [{"cpu": 30}, {"cpu": 30}])
+        self.assertEqual((self.writer.counters["failed"], self.writer.counters["written"]), (1, 1))
+
+    def test_in_flight_value_counts_as_commanded(self):
+        self.writer.request("cpu", 30)
+        self.now += 0.2
+        batch = self.writer.take_due()
+        self.assertEqual(batch, {"cpu": 30})
+        self.assertEqual(self.writer.commanded("cpu"), 30)
+        self.writer.request("cpu", 30)  # equal to the value in flight
+        self.assertIsNone(self.writer.next_due())
+        self.writer.complete(batch, {"cpu": (True, None)})
+        self.assertEqual(self.writer.acked, {"cpu": 30})
+
+
+if __name__ == "__main__":
+    unittest.main()
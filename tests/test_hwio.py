@@ -0,0 +1,113 @@
+"""HardwareExecutor: submission order, timeouts and the bounded queue."""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hwio import HardwareExecutor, QueueFull  # noqa: E402
+
+
+class Outcomes:
+    """Collects done(result, error) calls and lets a test wait for them."""
+
+    def __init__(self):
+        self.items = []
+        self._cond = threading.Condition()
+
+    def done(self, tag):
+        def finish(result, error):
+            with self._cond:
+                self.items.append((tag, result, error))
+                self._cond.notify_all()
+        return finish
+
+    def wait(self, count, timeout=5.0):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.items) >= count, timeout)
+        return self.items
+
+
+class HardwareExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.outcomes = Outcomes()
+        self.release = threading.Event()
+
+    def executor(self, **options):
+        io = HardwareExecutor(**options)
+        self.addCleanup(io.close, 0.5)
+        self.addCleanup(self.release.set)
+        return io
+
+    def blocked(self):
+        self.release.wait(5.0)
+        return "late"
+
+    def test_jobs_run_in_submission_order(self):
+        io = self.executor()
+        ran = []
+        for i in range(10):
+            io.submit(lambda i=i: ran.append(i) or i, self.outcomes.done(i))
+        items = self.outcomes.wait(10)
+        self.assertEqual(ran, list(range(10)))
+        self.assertEqual([(tag, result) for tag, result, _ in items], [(i, i) for i in range(10)])
+        self.assertEqual(io.stats()["completed"], 10)
+
+    def test_error_is_reported_to_done(self):
+        io = self.executor()
+        io.submit(lambda: 1 / 0, self.outcomes.done("x"))
+        (_, result, error), = self.outcomes.wait(1)
+        self.assertIsNone(result)
+        self.assertIsInstance(error, ZeroDivisionError)
+        self.assertEqual(io.counters["failed"], 1)
+
+    def test_stuck_call_times_out_and_its_late_result_is_dropped(self):
+        io = self.executor(timeout=0.05)
+        io.submit(self.blocked, self.outcomes.done("stuck"))
+        (tag, _, error), = self.outcomes.wait(1)
+        self.assertEqual(tag, "stuck")
+        self.assertIsInstance(error, TimeoutError)
+        self.release.set()
+        io.submit(lambda: "next", self.outcomes.done("next"))
+        items = self.outcomes.wait(2)
+        self.assertEqual([(tag, result) for tag, result, _ in items[1:]], [("next", "next")])
+        self.assertEqual(io.counters["timed_out"], 1)
+
+    def test_queued_job_times_out_behind_a_stuck_call(self):
+        io = self.executor(timeout=5.0)
+        io.submit(self.blocked)
+        io.submit(lambda: "never", self.outcomes.done("queued"), timeout=0.05)
+        (tag, _, error), = self.outcomes.wait(1)
+        self.assertEqual(tag, "queued")
+        self.assertIsInstance(error, TimeoutError)
+        self.assertEqual(io.queued(), 0)
+
+    def test_full_queue_rejects_the_submission(self):
+        io = self.executor(maxsize=1)
+        started = threading.Event()
+        io.submit(lambda: started.set() or self.blocked())
+        started.wait(5.0)
+        io.submit(lambda: None)
+        io.submit(lambda: None, self.outcomes.done("rejected"))
+        (_, _, error), = self.outcomes.wait(1)
+        self.assertIsInstance(error, QueueFull)
+        self.assertEqual(io.counters["rejected"], 1)
+
+    def test_close_finishes_queued_jobs_and_refuses_new_ones(self):
+        io = self.executor()
+        for i in range(3):
+            io.submit(lambda i=i: i, self.outcomes.done(i))
+        io.close()
+        self.assertEqual(len(self.outcomes.items), 3)
+        io.submit(lambda: None, self.outcomes.done("late"))
+        self.assertIsInstance(self.outcomes.items[-1][2], RuntimeError)
+
+    def test_inline_runs_in_submit(self):
+        io = HardwareExecutor(inline=True)
+        io.submit(lambda: threading.current_thread(), self.outcomes.done("inline"))
+        self.assertIs(self.outcomes.items[0][1], threading.current_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()
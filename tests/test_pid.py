@@ -0,0 +1,91 @@
+"""TargetFanController: the PID loop on top of the Auto curve."""
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEFAULT_CONFIG, TARGET_OPTION_KEYS  # noqa: E402
+from fancurve import FALLBACK_SPEED, AutoFanController, FanCurve  # noqa: E402
+from pid import STALE_AFTER, TargetFanController  # noqa: E402
+
+
+def controller(speed=30, **options):
+    # A flat curve makes the feed-forward a constant
+    auto = AutoFanController(FanCurve([{"min": 0, "max": 100, "speed": speed}]))
+    settings = {key: DEFAULT_CONFIG[key] for key in TARGET_OPTION_KEYS}
+    settings.update(target_kp=0.0, target_ki=0.0, target_kd=0.0, target_smoothing=0.0,
+                    target_slew=1000.0, target_deadband=1)
+    settings.update(options)
+    return TargetFanController(auto, settings)
+
+
+class TargetFanControllerTest(unittest.TestCase):
+    def test_first_sample_starts_from_the_curve(self):
+        target = controller(target_kp=10.0, target_feedforward=0.5)
+        self.assertEqual(target.update("cpu", 90, 0.0), 15)
+
+    def test_below_target_runs_like_auto(self):
+        target = controller(target_kp=4.0, target_ki=1.0)
+        for t in range(10):
+            self.assertEqual(target.update("cpu", 50, float(t)), 30)
+        self.assertEqual(target.state["cpu"].integral, 0.0)
+
+    def test_proportional_term_adds_cooling_above_target(self):
+        target = controller(target_kp=2.0)
+        target.update("cpu", 65, 0.0)
+        self.assertEqual(target.update("cpu", 65, 1.0), 40)
+
+    def test_integral_grows_while_above_target(self):
+        target = controller(target_ki=1.0)
+        target.update("cpu", 65, 0.0)
+        self.assertEqual([target.update("cpu", 65, float(t)) for t in (1, 2, 3)], [35, 40, 45])
+
+    def test_integral_stops_growing_at_full_speed(self):
+        target = controller(speed=90, target_ki=1.0)
+        target.update("cpu", 70, 0.0)
+        for t in range(1, 20):
+            self.assertEqual(target.update("cpu", 70, float(t)), 100)
+        self.assertEqual(target.state["cpu"].integral, 10.0)
+        # Wound down in one step once cool again, not after 19 s of windup
+        self.assertEqual(target.update("cpu", 50, 20.0), 90)
+
+    def test_output_is_slew_limited(self):
+        target = controller(target_kp=10.0, target_slew=5.0)
+        target.update("cpu", 70, 0.0)
+        self.assertEqual([target.update("cpu", 70, float(t)) for t in (1, 2)], [35, 40])
+
+    def test_small_changes_stay_inside_the_deadband(self):
+        target = controller(target_kp=1.0, target_deadband=12)
+        target.update("cpu", 60, 0.0)
+        self.assertEqual(target.update("cpu", 70, 1.0), 30)
+        self.assertEqual(target.update("cpu", 72, 2.0), 42)
+
+    def test_full_speed_is_reached_inside_the_deadband(self):
+        target = controller(speed=95, target_kp=1.0, target_deadband=12)
+        target.update("cpu", 60, 0.0)
+        self.assertEqual(target.update("cpu", 70, 1.0), 100)
+
+    def test_temperature_is_smoothed(self):
+        target = controller(target_kp=1.0, target_smoothing=3.0)
+        target.update("cpu", 60, 0.0)
+        target.update("cpu", 90, 1.0)
+        self.assertAlmostEqual(target.state["cpu"].smoothed, 60 + 30 * (1 - math.exp(-1 / 3)))
+
+    def test_loop_starts_over_after_a_gap(self):
+        target = controller(target_ki=1.0)
+        target.update("cpu", 70, 0.0)
+        target.update("cpu", 70, 1.0)
+        self.assertEqual(target.update("cpu", 70, 2.0 + STALE_AFTER), 30)
+        self.assertEqual(target.state["cpu"].integral, 0.0)
+
+    def test_missing_sensor_falls_back(self):
+        target = controller(target_kp=2.0)
+        target.update("cpu", 65, 0.0)
+        self.assertEqual(target.update("cpu", None, 1.0), FALLBACK_SPEED)
+        self.assertNotIn("cpu", target.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""ProfileSet: the profile rules the window and the daemon share."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import CommandError  # noqa: E402
+from config import DEFAULT_CONFIG  # noqa: E402
+from fanwriter import FanWriteScheduler  # noqa: E402
+from polling import AdaptivePoller  # noqa: E402
+from profiles import ProfileSet  # noqa: E402
+
+PROFILES = {
+    "quiet": {"mode": "Custom", "custom_cpu": 20, "custom_gpu": 10, "hotkey": "Ctrl+Alt+Q"},
+    "gaming": {"mode": "Target", "target_cpu": 75, "poll_min_interval": 0.25},
+}
+
+
+class ProfileSetTest(unittest.TestCase):
+    def setUp(self):
+        self.config = dict(DEFAULT_CONFIG, profiles=PROFILES)
+        self.profiles = ProfileSet(self.config)
+        self.poller = AdaptivePoller()
+        self.writes = []
+        self.writer = FanWriteScheduler(self.write, window=0.0, min_interval=0.0)
+
+    def write(self, speeds):
+        self.writes.append(dict(speeds))
+        return {fan_type: (True, None) for fan_type in speeds}
+
+    def switch(self, name):
+        controller = self.profiles.switch(name, self.poller, self.writer, (50.0, 50.0), 0.0)
+        self.writer.flush(force=True)
+        return controller
+
+    def test_switch_writes_both_fans_in_one_batch(self):
+        controller = self.switch("quiet")
+        self.assertEqual(self.profiles.active, "quiet")
+        self.assertEqual(controller.mode, "Custom")
+        self.assertEqual(self.writes, [{"cpu": 20, "gpu": 10}])
+
+    def test_switch_sets_the_profile_polling(self):
+        self.switch("gaming")
+        self.assertEqual(self.poller.min_interval, 0.25)
+        self.switch(None)
+        self.assertEqual(self.poller.min_interval, DEFAULT_CONFIG["poll_min_interval"])
+
+    def test_unknown_profile_is_refused(self):
+        with self.assertRaises(CommandError):
+            self.switch("nope")
+        self.assertIsNone(self.profiles.active)
+
+    def test_second_hotkey_press_goes_back(self):
+        self.assertEqual(self.profiles.hotkey_target("quiet"), "quiet")
+        self.switch("quiet")
+        self.assertIsNone(self.profiles.hotkey_target("quiet"))
+        self.assertEqual(self.profiles.hotkey_target("gaming"), "gaming")
+
+    def test_load_leaves_a_removed_profile(self):
+        self.switch("quiet")
+        self.assertTrue(self.profiles.load({"gaming": PROFILES["gaming"]}))
+        self.assertIsNone(self.profiles.active)
+        self.assertEqual(list(self.profiles), ["gaming"])
+
+    def test_load_without_a_live_profile_needs_no_switch(self):
+        self.assertFalse(self.profiles.load({}))
+
+    def test_top_level_edits_wait_while_a_profile_is_live(self):
+        self.switch("quiet")
+        config = dict(self.config, mode="Max", custom_cpu=90)
+        commands = self.profiles.reload_commands(config, {"mode", "custom_cpu", "profiles"})
+        self.assertEqual([command["command"] for command in commands], ["profiles"])
+        self.assertEqual(self.profiles.base.controller.mode, "Max")
+
+    def test_top_level_edits_apply_without_a_profile(self):
+        commands = self.profiles.reload_commands(dict(self.config, mode="Max"), {"mode"})
+        self.assertEqual(commands, [{"command": "mode", "mode": "Max"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
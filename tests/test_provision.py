@@ -0,0 +1,59 @@
+"""LibreHardwareMonitorLib.dll is checked against its digest on every start."""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from provision import LHM_DLL_NAME, ProvisionError, ensure_lhm_dll  # noqa: E402
+
+DLL = b"MZ not really a DLL"
+DIGEST = hashlib.sha256(DLL).hexdigest()
+
+
+class EnsureLhmDllTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.mirror = os.path.join(self.dir, "mirror")
+        os.mkdir(self.mirror)
+        with open(os.path.join(self.mirror, LHM_DLL_NAME), "wb") as f:
+            f.write(DLL)
+        self.dll_path = os.path.join(self.dir, LHM_DLL_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def tamper(self):
+        with open(self.dll_path, "ab") as f:
+            f.write(b"!")
+
+    def test_installed_dll_with_pinned_digest_loads(self):
+        ensure_lhm_dll(self.dll_path, [self.mirror], sha256=DIGEST)
+        self.assertEqual(ensure_lhm_dll(self.dll_path, sha256=DIGEST), self.dll_path)
+
+    def test_install_refuses_a_mismatch(self):
+        with self.assertRaises(ProvisionError):
+            ensure_lhm_dll(self.dll_path, [self.mirror], sha256="0" * 64)
+        self.assertFalse(os.path.exists(self.dll_path))
+
+    def test_existing_dll_is_checked_against_the_pinned_digest(self):
+        ensure_lhm_dll(self.dll_path, [self.mirror], sha256=DIGEST)
+        self.tamper()
+        with self.assertRaises(ProvisionError):
+            ensure_lhm_dll(self.dll_path, sha256=DIGEST)
+
+    def test_existing_dll_is_checked_against_the_recorded_digest(self):
+        # Nothing pinned: the first install records its digest next to the DLL
+        ensure_lhm_dll(self.dll_path, [self.mirror])
+        self.assertTrue(os.path.exists(self.dll_path + ".sha256"))
+        ensure_lhm_dll(self.dll_path)
+        self.tamper()
+        with self.assertRaises(ProvisionError):
+            ensure_lhm_dll(self.dll_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
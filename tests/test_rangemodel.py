@@ -0,0 +1,90 @@
+"""RangeModel: the contiguous temperature rows of the Auto curve editor."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rangemodel import HIGHEST, LOWEST, RangeModel  # noqa: E402
+
+
+def model(*bounds):
+    return RangeModel([{"min": low, "max": high, "speed": 10 * i} for i, (low, high) in enumerate(bounds)])
+
+
+class RangeModelTest(unittest.TestCase):
+    def assertContiguous(self, m):
+        self.assertEqual(m.lows[0], LOWEST)
+        self.assertEqual(m.highs[-1], HIGHEST)
+        for low, high, next_low in zip(m.lows, m.highs, m.lows[1:]):
+            self.assertLessEqual(low, high)
+            self.assertEqual(high + 1, next_low)
+
+    def test_raising_a_max_moves_only_the_next_row(self):
+        m = model((0, 39), (40, 59), (60, 100))
+        self.assertEqual(m.set_high(0, 44), (0, 1))
+        self.assertEqual(m.rules()[:2], [{"min": 0, "max": 44, "speed": 0}, {"min": 45, "max": 59, "speed": 10}])
+        self.assertContiguous(m)
+
+    def test_raising_a_max_pushes_squeezed_rows(self):
+        m = model((0, 39), (40, 41), (42, 43), (44, 100))
+        self.assertEqual(m.set_high(0, 50), (0, 3))
+        self.assertEqual(list(m.lows), [0, 51, 52, 53])
+        self.assertEqual(list(m.highs), [50, 51, 52, 100])
+
+    def test_push_stops_with_a_degree_left_for_each_row(self):
+        m = model((0, 39), (40, 59), (60, 100))
+        m.set_high(0, 100)
+        self.assertEqual(list(m.highs), [98, 99, 100])
+        self.assertContiguous(m)
+
+    def test_lowering_a_min_pushes_the_rows_below(self):
+        m = model((0, 9), (10, 11), (12, 100))
+        self.assertEqual(m.set_low(2, 1), (0, 2))  # clamped to 2, a degree for each row below
+        self.assertEqual(list(m.lows), [0, 1, 2])
+        self.assertEqual(list(m.highs), [0, 1, 100])
+
+    def test_outer_bounds_are_fixed(self):
+        m = model((0, 49), (50, 100))
+        self.assertEqual(m.set_high(1, 80), (1, 0))  # nothing changed
+        self.assertEqual(m.set_low(0, 20), (0, -1))
+        self.assertContiguous(m)
+
+    def test_one_degree_rows_stay_valid(self):
+        m = model((0, 0), (1, 1), (2, 100))
+        m.set_high(1, 1)
+        self.assertEqual(m.rules()[:2], [{"min": 0, "max": 0, "speed": 0}, {"min": 1, "max": 1, "speed": 10}])
+        m.set_high(0, 5)
+        self.assertEqual(list(m.highs), [5, 6, 100])
+
+    def test_renormalize_keeps_widths_in_proportion(self):
+        m = model((0, 9), (10, 29))  # no longer reaching HIGHEST
+        self.assertEqual(m.renormalize(), (0, 1))
+        self.assertContiguous(m)
+        self.assertEqual(list(m.highs), [32, 100])  # widths 10:20 become 33:68
+
+    def test_renormalize_shares_out_single_degree_rows(self):
+        m = model((5, 5), (5, 5), (5, 5), (5, 5))
+        m.renormalize()
+        self.assertContiguous(m)
+        self.assertEqual([high - low + 1 for low, high in zip(m.lows, m.highs)], [26, 25, 25, 25])
+
+    def test_remove_closes_the_gap(self):
+        m = model((0, 29), (30, 69), (70, 100))
+        m.remove(1)
+        self.assertContiguous(m)
+        self.assertEqual(len(m), 2)
+
+    def test_append_until_full(self):
+        m = model((0, 100))
+        while not m.full():
+            m.append()
+            self.assertContiguous(m)
+        self.assertEqual(len(m), HIGHEST - LOWEST + 1)
+        self.assertTrue(all(low == high for low, high in zip(m.lows, m.highs)))
+        with self.assertRaises(ValueError):
+            m.append()
+
+
+if __name__ == "__main__":
+    unittest.main()
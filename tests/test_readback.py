@@ -0,0 +1,72 @@
+"""Fan readback watches: woken by a value being set, or polling as a fallback."""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hardware import PollingFanWatch, SimulatedBackend  # noqa: E402
+
+
+def later(seconds, fn, *args):
+    timer = threading.Timer(seconds, fn, args)
+    timer.start()
+    return timer
+
+
+class SimulatedFanWatchTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = SimulatedBackend()
+        self.watch = self.backend.fan_watch()
+
+    def test_wait_wakes_on_a_write(self):
+        self.assertEqual(self.watch.read(), {"cpu": 0, "gpu": 0})
+        timer = later(0.05, self.backend.write_fan, "cpu", 40)
+        started = time.monotonic()
+        self.assertTrue(self.watch.wait(5.0))
+        timer.join()
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(self.watch.read(), {"cpu": 40, "gpu": 0})
+
+    def test_write_before_wait_is_not_lost(self):
+        self.watch.read()
+        self.backend.write_fans({"cpu": 30, "gpu": 20})
+        started = time.monotonic()
+        self.assertTrue(self.watch.wait(5.0))
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(self.watch.read(), {"cpu": 30, "gpu": 20})
+
+    def test_stop_ends_the_wait(self):
+        self.watch.read()
+        timer = later(0.05, self.watch.stop)
+        self.assertFalse(self.watch.wait())
+        timer.join()
+
+
+class PollingFanWatchTest(unittest.TestCase):
+    def setUp(self):
+        self.reads = []
+        self.watch = PollingFanWatch(self.read_fan, interval=0.05)
+
+    def read_fan(self, fan_type):
+        self.reads.append(fan_type)
+        return 55 if fan_type == "cpu" else -1
+
+    def test_read_covers_every_fan(self):
+        self.assertEqual(self.watch.read(), {"cpu": 55, "gpu": -1})
+        self.assertEqual(sorted(self.reads), ["cpu", "gpu"])
+
+    def test_wait_returns_after_the_interval(self):
+        started = time.monotonic()
+        self.assertTrue(self.watch.wait(60.0))
+        self.assertLess(time.monotonic() - started, 2.0)
+
+    def test_stop_ends_the_wait(self):
+        self.watch.stop()
+        self.assertFalse(self.watch.wait())
+
+
+if __name__ == "__main__":
+    unittest.main()
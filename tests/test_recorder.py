@@ -0,0 +1,75 @@
+"""TelemetryRecorder files: rotation and reading them back through mmap."""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recorder import (HEADER, RECORD, TelemetryLog, TelemetryRecorder, export_csv,  # noqa: E402
+                      log_files, read_range)
+
+
+class RecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def record(self, count, **options):
+        recorder = TelemetryRecorder(self.dir, **options)
+        for i in range(count):
+            recorder.record_sample(1000.0 + i, cpu_temp=40 + i / 100, gpu_temp=None, cpu_cmd=30, cpu_read=29)
+        recorder.record_command(2000.0, "gpu", 55)
+        recorder.close()
+        return recorder
+
+    def test_records_read_back_as_written(self):
+        self.record(3)
+        records = list(read_range(self.dir))
+        self.assertEqual(records[0], (1000.0, "sample", 40.0, None, 30, None, 29, None))
+        self.assertEqual(records[2][2], 40.02)
+        self.assertEqual(records[-1], (2000.0, "command", None, None, None, 55, None, None))
+
+    def test_files_rotate_by_size_and_only_the_newest_are_kept(self):
+        per_file = 10
+        recorder = self.record(99, max_bytes=HEADER.size + per_file * RECORD.size, max_files=3)
+        files = log_files(self.dir)
+        self.assertEqual(len(files), 3)
+        for path in files:
+            self.assertLessEqual(os.path.getsize(path), HEADER.size + per_file * RECORD.size)
+        self.assertEqual(recorder.written, 100)
+        # 100 records over 10 files: the last three hold records 70..99
+        times = [record[0] for record in read_range(self.dir)]
+        self.assertEqual(times, [1000.0 + i for i in range(70, 99)] + [2000.0])
+
+    def test_range_query_bisects_on_time(self):
+        self.record(50, max_bytes=HEADER.size + 8 * RECORD.size, max_files=20)
+        times = [record[0] for record in read_range(self.dir, start=1010.0, end=1020.0)]
+        self.assertEqual(times, [1000.0 + i for i in range(10, 20)])
+
+    def test_torn_final_record_is_ignored(self):
+        self.record(5)
+        path = log_files(self.dir)[-1]
+        with open(path, "ab") as f:
+            f.write(b"\0" * (RECORD.size // 2))
+        log = TelemetryLog(path)
+        try:
+            self.assertEqual(len(log), 6)
+        finally:
+            log.close()
+
+    def test_export_csv(self):
+        self.record(2)
+        out = io.StringIO()
+        self.assertEqual(export_csv(self.dir, out), 3)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "time,kind,cpu_temp,gpu_temp,cpu_cmd,gpu_cmd,cpu_read,gpu_read")
+        self.assertEqual(lines[1], "1000.0,sample,40.0,,30,,29,")
+
+
+if __name__ == "__main__":
+    unittest.main()
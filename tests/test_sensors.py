@@ -0,0 +1,91 @@
+"""Fan input aggregation and LhmSession rediscovery."""
+import math
+import os
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hardware import REDISCOVER_MAX, REDISCOVER_MIN, LhmSession  # noqa: E402
+from sensors import SensorMap  # noqa: E402
+
+NAMES = ["cpu/cpu package", "cpu/cpu core #1", "gpu/gpu core", "gpu/gpu hot spot"]
+NAN = math.nan
+
+
+class SensorMapTest(unittest.TestCase):
+    def sensor_map(self, gpu):
+        sensor_map = SensorMap({"cpu": {"sensors": ["cpu/"], "method": "max"}, "gpu": gpu})
+        sensor_map.resolve(NAMES)
+        return sensor_map
+
+    def test_missing_samples_are_left_out(self):
+        sensor_map = self.sensor_map({"sensors": ["gpu/core", "gpu/hot spot"], "method": "mean", "weights": [3, 1]})
+        self.assertEqual(sensor_map.aggregate(array("d", [50, 60, 40, 80])), (60, 50))
+        self.assertEqual(sensor_map.aggregate(array("d", [NAN, 60, NAN, 80])), (60, 80))
+
+    def test_input_with_no_samples_is_none_and_lost(self):
+        sensor_map = self.sensor_map({"sensors": ["gpu/"], "method": "max"})
+        values = array("d", [50, 60, NAN, NAN])
+        self.assertEqual(sensor_map.aggregate(values), (60, None))
+        self.assertTrue(sensor_map.lost(values))
+        self.assertFalse(sensor_map.lost(array("d", [50, 60, NAN, 70])))
+
+    def test_percentile_is_nearest_rank(self):
+        sensor_map = SensorMap({"cpu": {"sensors": ["*/"], "method": "percentile", "percentile": 50}})
+        sensor_map.resolve(NAMES)
+        self.assertEqual(sensor_map.aggregate(array("d", [10, 40, 20, 30]))[0], 20)
+
+
+class _Sensor:
+    def __init__(self, value):
+        self.Value = value
+
+
+class _Session(LhmSession):
+    """LhmSession over fixed sensor handles, counting discoveries."""
+
+    def __init__(self, readings, clock):
+        super().__init__("unused.dll", clock=clock)
+        self.readings = readings
+        self.discoveries = 0
+
+    def discover(self):
+        self.discoveries += 1
+        self.sensors = [_Sensor(value) for value in self.readings]
+        self.values = array("d", [NAN]) * len(self.sensors)
+        self.sensor_map.resolve(NAMES[:1] + NAMES[2:3])
+        self._stale = False
+
+
+class RediscoveryTest(unittest.TestCase):
+    def test_sleeping_gpu_is_rediscovered_at_growing_intervals(self):
+        now = [0.0]
+        session = _Session([55.0, None], clock=lambda: now[0])
+        discovered_at = []
+        while now[0] < 60.0:
+            before = session.discoveries
+            session.sweep()
+            if session.discoveries > before:
+                discovered_at.append(now[0])
+            now[0] += 0.5
+        # The first sweep discovers, the first loss rediscovers right after,
+        # then 5, 10 and 20 s apart instead of every tick
+        self.assertEqual(discovered_at, [0.0, 0.5, 5.5, 15.5, 35.5])
+        self.assertEqual(session.sensor_map.aggregate(session.values), (55.0, None))
+
+    def test_backoff_is_capped_and_reset_by_a_reading(self):
+        now = [0.0]
+        session = _Session([55.0, None], clock=lambda: now[0])
+        for _ in range(20):
+            session.sweep()
+            now[0] += REDISCOVER_MAX
+        self.assertEqual(session._rediscover_delay, REDISCOVER_MAX)
+        session.readings[1] = session.sensors[1].Value = 60.0
+        session.sweep()
+        self.assertEqual(session._rediscover_delay, REDISCOVER_MIN)
+
+
+if __name__ == "__main__":
+    unittest.main()
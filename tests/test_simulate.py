@@ -0,0 +1,62 @@
+"""simulate.py: replaying traces through the control loop."""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEFAULT_CONFIG  # noqa: E402
+from hardware import default_load  # noqa: E402
+from simulate import ModelTrace, main, read_trace, simulate, synthetic_trace  # noqa: E402
+
+
+class SimulateTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_hysteresis_saves_writes_on_a_hovering_trace(self):
+        # The synthetic trace wobbles around the 60°C breakpoint
+        auto = dict(DEFAULT_CONFIG, mode="Auto")
+        plain = simulate(synthetic_trace(seconds=600), dict(auto, auto_hysteresis=0, auto_min_dwell=0))
+        damped = simulate(synthetic_trace(seconds=600), dict(auto, auto_hysteresis=3, auto_min_dwell=10))
+        self.assertEqual(plain["samples"], 300)
+        self.assertAlmostEqual(plain["simulated_hours"], 598 / 3600)
+        self.assertLess(damped["writes"], plain["writes"])
+        self.assertEqual(set(plain["time_at_speed"]["cpu"]), {"35", "50"})
+        self.assertEqual(set(damped["time_at_speed"]["cpu"]), {"50"})
+
+    def test_custom_mode_writes_each_fan_once(self):
+        report = simulate(synthetic_trace(seconds=600), dict(DEFAULT_CONFIG, mode="Custom"))
+        self.assertEqual(report["writes"], 2)
+        # The first sample interval runs before any write lands
+        self.assertAlmostEqual(report["time_at_speed"]["cpu"][str(DEFAULT_CONFIG["custom_cpu"])], 1.0, delta=0.01)
+
+    def test_csv_trace_skips_commands_and_blank_readings(self):
+        path = os.path.join(self.dir, "trace.csv")
+        with open(path, "w") as f:
+            f.write("time,kind,cpu_temp,gpu_temp\n0,sample,50.5,\n1,command,,\n2,sample,51,40\n")
+        self.assertEqual(list(read_trace(path)), [(0.0, 50.5, None), (2.0, 51.0, 40.0)])
+
+    def test_model_trace_is_closed_loop(self):
+        # Max mode keeps the model cooler than running the fans at 0%
+        still = dict(DEFAULT_CONFIG, mode="Custom", custom_cpu=0, custom_gpu=0)
+        hot = simulate(ModelTrace(600, load=default_load), still)
+        cool = simulate(ModelTrace(600, load=default_load), dict(DEFAULT_CONFIG, mode="Max"))
+        self.assertLess(cool["peak_temp"]["cpu"], hot["peak_temp"]["cpu"])
+
+    def test_limits_set_the_exit_status(self):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as err:
+            self.assertEqual(main(["--hours", "0.1", "--max-writes-per-hour", "1000"]), 0)
+            self.assertEqual(main(["--hours", "0.1", "--max-peak", "10"]), 1)
+        self.assertIn("FAIL", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
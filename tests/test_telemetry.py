@@ -0,0 +1,110 @@
+"""In-memory telemetry: the ring buffer and the chart's decimated history."""
+import math
+import os
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import DecimatedHistory, TelemetryBuffer  # noqa: E402
+
+
+class TelemetryBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = TelemetryBuffer(capacity=10)
+
+    def fill(self, count, start=0):
+        for t in range(start, start + count):
+            self.buffer.append(float(t), cpu_temp=50 + t, gpu_temp=None if t % 2 else 40)
+
+    def test_oldest_samples_are_overwritten(self):
+        self.fill(25)
+        self.assertEqual(len(self.buffer), 10)
+        times, values = self.buffer.window("cpu_temp", 100)
+        self.assertEqual(list(times), [float(t) for t in range(15, 25)])
+        self.assertEqual(list(values), [50.0 + t for t in range(15, 25)])
+
+    def test_window_wraps_around_the_ring(self):
+        self.fill(13)
+        times, _ = self.buffer.window("cpu_temp", 4)
+        self.assertEqual(list(times), [8.0, 9.0, 10.0, 11.0, 12.0])
+
+    def test_missing_readings(self):
+        self.fill(2)
+        self.assertIsNone(self.buffer.latest("gpu_temp"))
+        self.assertIsNone(self.buffer.latest("cpu_read"))  # never given
+        self.assertEqual(self.buffer.stats("gpu_temp", 10)["count"], 1)
+
+    def test_stats(self):
+        self.fill(13)
+        stats = self.buffer.stats("cpu_temp", 5, threshold=60)
+        self.assertEqual((stats["count"], stats["min"], stats["max"], stats["mean"]), (6, 57, 62, 59.5))
+        self.assertAlmostEqual(stats["slope"], 1.0)
+        self.assertEqual(stats["time_above"], 1.0)  # 61 held for a second; 62 is the newest sample
+        self.assertIs(self.buffer.stats("cpu_temp", 5, threshold=60), stats)
+        self.buffer.append(13.0, cpu_temp=70)
+        self.assertIsNot(self.buffer.stats("cpu_temp", 5, threshold=60), stats)
+
+    def test_empty_window(self):
+        self.assertEqual(self.buffer.stats("cpu_temp", 10)["min"], None)
+        self.assertEqual(self.buffer.window("cpu_temp", 10), (array("d"), array("d")))
+
+    def test_samples_must_be_in_time_order(self):
+        self.fill(2)
+        with self.assertRaises(ValueError):
+            self.buffer.append(0.5, cpu_temp=50)
+
+
+class DecimatedHistoryTest(unittest.TestCase):
+    def setUp(self):
+        # 10 s buckets in the short window, 100 s in the long one
+        self.history = DecimatedHistory(windows={"short": 100, "long": 1000}, columns=10,
+                                        fields=("cpu_temp", "gpu_temp"))
+
+    def assertEmpty(self, pair):
+        self.assertTrue(all(math.isnan(v) for v in pair), pair)
+
+    def test_bucket_keeps_min_and_max(self):
+        for t, temp in ((0, 50), (3, 90), (6, 40), (9, 60)):
+            self.history.append(float(t), cpu_temp=temp)
+        self.assertEqual(self.history["short"].get("cpu_temp", 0), (40, 90))
+        self.assertEqual(self.history["long"].get("cpu_temp", 0), (40, 90))
+
+    def test_spike_survives_in_every_window(self):
+        for t in range(1000):
+            self.history.append(float(t), cpu_temp=95 if t == 950 else 50)
+        self.assertEqual(self.history["short"].get("cpu_temp", 95), (50, 95))
+        self.assertEqual(self.history["long"].get("cpu_temp", 9), (50, 95))
+
+    def test_missing_values_leave_the_bucket_alone(self):
+        self.history.append(0.0, cpu_temp=50, gpu_temp=None)
+        self.history.append(1.0, cpu_temp=None, gpu_temp=None)
+        self.assertEqual(self.history["short"].get("cpu_temp", 0), (50, 50))
+        self.assertEmpty(self.history["short"].get("gpu_temp", 0))
+
+    def test_skipped_buckets_are_emptied(self):
+        for t in range(0, 100, 10):
+            self.history.append(float(t), cpu_temp=50)
+        self.history.append(35 * 10.0, cpu_temp=70)  # 25 buckets later: the old slots are reused
+        for bucket in range(26, 35):
+            self.assertEmpty(self.history["short"].get("cpu_temp", bucket))
+        self.assertEqual(self.history["short"].get("cpu_temp", 35), (70, 70))
+
+    def test_buckets_outside_the_ring_are_empty(self):
+        for t in range(0, 200, 10):
+            self.history.append(float(t), cpu_temp=50)
+        self.assertEmpty(self.history["short"].get("cpu_temp", 9))
+        self.assertEqual(self.history["short"].get("cpu_temp", 10), (50, 50))
+        self.assertEmpty(self.history["short"].get("cpu_temp", 20))
+
+    def test_memory_stays_fixed(self):
+        buckets = self.history["short"]
+        sizes = [len(column) for column in buckets.mins.values()]
+        for t in range(5000):
+            self.history.append(float(t), cpu_temp=50)
+        self.assertEqual([len(column) for column in buckets.mins.values()], sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()